@@ -7,6 +7,9 @@ import json                            # ← added
 from pathlib import Path              # ← added
 from utils.time_utils import format_cst, parse_cst_timestamp, time_ago, parse_iso_to_cst, CST
 from utils.uptime_utils import record_session_info
+from utils.http_client import close_session
+from utils.message_dispatch import get_message_dispatcher
+from utils.nickname_sync import get_nickname_sync
 from datetime import datetime, timedelta
 import asyncio
 from utils.discord_utils import (
@@ -58,6 +61,17 @@ def activateBot(discord_bot_token, config, bot_prefix, discord_application_id, s
             await self.tree.sync(guild=guild)
             #print(f"✅ Synced slash commands to guild {self.server_guild_id}")
 
+        async def on_message(self, message):
+            # One pass per message: the dispatcher builds the shared context,
+            # runs the cogs' registered handlers and processes commands once
+            await get_message_dispatcher().dispatch(self, message)
+
+        async def close(self):
+            await super().close()
+            # shared aiohttp session used by the image renderers / commands
+            await close_session()
+            await get_nickname_sync().stop()
+
     intents = discord.Intents.all()
     bot = MyBot(
         command_prefix=bot_prefix,
@@ -3,7 +3,7 @@ from discord.ext import commands
 import json
 import random
 import datetime
-from utils.users_utils import get_verified_users, save_verified_users
+from utils.users_utils import get_verified_users, mark_verified_user_dirty
 
 
 CONFIG_FILE = 'config.json'
@@ -111,7 +111,7 @@ class CoinflipCog(commands.Cog):
         embed.set_footer(text=f"©️ {ctx.guild.name} • {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", icon_url=ctx.guild.icon.url)
         await ctx.send(embed=embed)
 
-        save_verified_users(user_data)
+        mark_verified_user_dirty(user_id)
         
 
     @commands.hybrid_command(
@@ -187,7 +187,8 @@ class CoinflipCog(commands.Cog):
         embed.set_footer(text=f"©️ {ctx.guild.name}", icon_url=ctx.guild.icon.url)
         await ctx.send(embed=embed)
 
-        save_verified_users(user_data)
+        mark_verified_user_dirty(sender_id)
+        mark_verified_user_dirty(receiver_id)
 
 
 
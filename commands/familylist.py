@@ -2,7 +2,7 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import json
-from utils.users_utils import get_verified_users
+from utils.psid_index import get_user_id_by_psid
 
 FAMILY_FILE = "list_of_family_members.json"
 CONFIG_FILE = "config.json"
@@ -66,7 +66,6 @@ class FamilyList(commands.Cog):
         visibility_value = visibility.value if visibility else None
 
         family_data = load_family_data()
-        verified_data = get_verified_users()
 
 
         # Everyone can run only view public or just view with no param (default to public)
@@ -105,14 +104,14 @@ class FamilyList(commands.Cog):
                     members.append(entry)
 
             def format_field(index, psid, first, last, role):
-                # Verified check by matching psid in verified data
-                is_verified = any(d.get("general", {}).get("psid") == psid for d in verified_data.values())
+                # Verified check through the PSID -> Discord user index
+                user_id = get_user_id_by_psid(psid)
+                is_verified = user_id is not None
                 emoji = "🟢" if is_verified else "🔴"
                 # Show PSID only if private view
                 psid_str = f" - PSID: `{psid}`" if visibility_value == "private" else f" "
                 name = f"{emoji} | {index}. {first} {last}{psid_str}"
                 # Mention if verified, else "Not verified yet."
-                user_id = next((uid for uid, d in verified_data.items() if d.get("general", {}).get("psid") == psid), None)
                 mention = f"<@{user_id}>" if user_id else "Not verified yet."
                 return name, mention
 
@@ -1,6 +1,6 @@
 import discord
 from discord.ext import commands
-import aiohttp
+from utils.http_client import get_session
 import json
 import datetime
 
@@ -17,9 +17,8 @@ class Meme(commands.Cog):
   @commands.hybrid_command(aliases=["memes", "dm", "dank"], brief="meme",description="Displays a random meme", with_app_command=True)
   async def meme(self, ctx: commands.Context):
     try: 
-      async with aiohttp.ClientSession() as session:
-        async with session.get('https://meme-api.com/gimme') as response:
-          meme = await response.json()
+      async with get_session().get('https://meme-api.com/gimme') as response:
+        meme = await response.json()
 
       embed = discord.Embed(
         color=embed_color 
@@ -4,6 +4,7 @@ import json
 import discord.ui
 import os
 import sys
+from utils.user_store import user_store
 
 # Open the JSON file and read in the data
 with open('config.json') as json_file:
@@ -19,6 +20,8 @@ class Restart(commands.Cog):
     async def restart(self, ctx):
         try:
             await ctx.send("Client is now restarting, please wait about 10 seconds...")
+            # execv skips atexit/cog_unload, so persist pending user DB writes first
+            user_store.flush()
             # Use absolute path for executable and script
             executable = sys.executable
             script = os.path.abspath(sys.argv[0])
@@ -7,7 +7,8 @@ import json
 import os
 import datetime
 from utils.family_utils import is_family_member, get_family_role, get_total_verified_users
-from utils.users_utils import get_verified_users, save_verified_users, get_unverified_users, save_unverified_users
+from utils.users_utils import get_verified_users, save_verified_user, get_unverified_users, delete_unverified_user
+from utils.psid_index import is_psid_verified
 from utils.stats_utils import is_vsa_officer, get_family_members, get_family_total_points, count_total_family_members, get_pseudo_family_members
 
 
@@ -108,7 +109,7 @@ class VerificationModal(Modal, title='📋 | VSA Member Verification'):
             )
 
         # Check if PSID is already in use
-        if any(rec.get("psid") == psid for rec in verifications.values()):
+        if is_psid_verified(psid):
             return await interaction.response.send_message(
                 f"❌ That PSID is already linked to another user. Please open a <#{TICKET_CHANNEL_ID}> for support.",
                 ephemeral=True
@@ -279,11 +280,11 @@ class VerificationModal(Modal, title='📋 | VSA Member Verification'):
                             pass
 
                         # Save record
-                        verifs = get_verified_users()
                         formatted_birthday = datetime.datetime.strptime(
                             rec["birthday"], "%b %d, %Y"
                         ).strftime("%m/%d/%Y")
-                        verifs[str(user.id)] = {
+                        user_id_str = str(user.id)
+                        verified_record = {
                             "general": {
                                 "first_name": rec["first_name"],
                                 "last_name": rec["last_name"],
@@ -297,15 +298,13 @@ class VerificationModal(Modal, title='📋 | VSA Member Verification'):
                         
                         # Move from unverified to verified, keep discord_profile if exists
                         unverified = get_unverified_users()
-                        user_id_str = str(user.id)
                         if user_id_str in unverified:
                             discord_profile = unverified[user_id_str].get("discord_profile", {})
-                            verifs[user_id_str]["discord_profile"] = discord_profile
-                            del unverified[user_id_str]
-                            save_unverified_users(unverified)
+                            verified_record["discord_profile"] = discord_profile
+                            delete_unverified_user(user_id_str)
 
-                        # Save verified users file after update
-                        save_verified_users(verifs)
+                        # Save the verified user's record
+                        save_verified_user(user_id_str, verified_record)
 
 
                         # Send confirmation and close
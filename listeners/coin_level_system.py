@@ -1,10 +1,13 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import json
 import random
 import time
 import datetime
-from utils.users_utils import get_verified_users, save_verified_users
+from utils.users_utils import get_verified_users, mark_verified_user_dirty
+from utils.message_dispatch import MessageContext, get_message_dispatcher
+from utils.xp_accumulator import XPAccumulator
+from utils.nickname_sync import request_nickname
 
 
 # Load config once at startup
@@ -12,7 +15,6 @@ with open('config.json') as json_file:
     config_data = json.load(json_file)
 
 embed_color = int(config_data["general"]["embed_color"].strip("#"), 16)
-command_prefix = config_data["general"]["bot_prefix"]
 nickname_template = config_data.get("nickname_templates", {})
 nick_before = nickname_template.get("format_before_seperator", "")
 nick_separator = nickname_template.get("seperator_symbol", "|")
@@ -27,6 +29,8 @@ coin_level_config = config_data.get("features", {}).get("coin_level_system", {})
 coin_level_system_enabled = coin_level_config.get("enable_feature", False)
 non_linear_leveling = coin_level_config.get("non_linear_harder_level_up", False)
 blacklisted_channel_ids = set(coin_level_config.get("blacklisted_channels_id", []))
+# How often accumulated message counts / XP / coins are applied to the user store
+xp_flush_interval_seconds = max(5, coin_level_config.get("xp_flush_interval_seconds", 30))
 
 log_channel_id = int(config_data.get("text_channel_ids", {}).get("bot_logs", 0))
 
@@ -35,18 +39,41 @@ class LevelingCog(commands.Cog):
     def __init__(self, client):
         self.client = client
         self.load_user_data()
-        self.message_cooldown = {}
-        self.spam_tracker = {}
+        # Spam tracking, award cooldowns and pending deltas (committed by flush_loop)
+        self.xp = XPAccumulator()
         self.coin_level_system_enabled = coin_level_system_enabled
 
     def load_user_data(self):
-        try:
-            self.user_data = get_verified_users()
-        except FileNotFoundError:
-            self.user_data = {}
+        # Live view over the shared user store; no file read per call
+        self.user_data = get_verified_users()
+
+    def save_user_data(self, user_id: str):
+        # Write-behind: the UserStoreFlusher task persists dirty records in batches
+        mark_verified_user_dirty(user_id)
+
+    def commit_deltas(self, user_id: str, messages: int, exp: float, coins: int):
+        # Apply accumulated deltas to the live record (other cogs may have
+        # changed e.g. coins meanwhile, so add rather than overwrite)
+        user_record = self.user_data.get(user_id)
+        if user_record is None:
+            return  # no longer verified
+        stats = user_record.setdefault("stats", {})
+        stats["exp"] = stats.get("exp", 0) + exp
+        stats["coins"] = stats.get("coins", 0) + coins
+        stats["level"] = stats.get("level", 0)
+        stats["total_messages_sent"] = stats.get("total_messages_sent", 0) + messages
+        stats["coinflips_won"] = stats.get("coinflips_won", 0)
+        stats["coinflips_lost"] = stats.get("coinflips_lost", 0)
+        self.save_user_data(user_id)
+
+    def flush_xp(self):
+        for user_id, deltas in self.xp.drain().items():
+            self.commit_deltas(user_id, *deltas)
+        self.xp.evict_idle(time.monotonic())
 
-    def save_user_data(self):
-        save_verified_users(self.user_data)
+    @tasks.loop(seconds=xp_flush_interval_seconds)
+    async def flush_loop(self):
+        self.flush_xp()
 
     def build_progress_bar(self, exp, level):
         needed_exp = self.get_required_exp(level)
@@ -62,7 +89,7 @@ class LevelingCog(commands.Cog):
             return int(100 * (1.15 ** (level - 1)))
         return 100
 
-    async def update_nickname(self, member: discord.Member, level: int):
+    def update_nickname(self, member: discord.Member, level: int):
         # Load the nickname format settings
         fmt_before = config_data["nickname_templates"]["format_before_seperator"]
         separator = config_data["nickname_templates"]["seperator_symbol"]
@@ -78,53 +105,42 @@ class LevelingCog(commands.Cog):
         before_part = fmt_before.replace("{level}", str(level))
         after_part = fmt_after.replace("{first_name}", first_name).replace("{last_name}", last_name)
 
-        # Assemble full desired nickname
-        desired_nick = f"{before_part}{separator}{after_part}".strip()
-        if len(desired_nick) > 32:
-            desired_nick = desired_nick[:32]
-
-        # Determine current visible name (nick or username)
-        current_nick = member.nick or member.name
-
-        # Only update if it doesn't already match
-        if current_nick == desired_nick:
-            return
-
-        try:
-            await member.edit(nick=desired_nick)
-        except discord.Forbidden:
-            pass
-
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if (not self.coin_level_system_enabled
-            or message.author.bot
-            or message.content.startswith(command_prefix)
-            or str(message.channel.id) in blacklisted_channel_ids):
-            return
-
-        self.load_user_data()
-        user_id = str(message.author.id)
-        if user_id not in self.user_data:
-            return
-
-        user_record = self.user_data[user_id]
-        stats = user_record.setdefault("stats", {})
+        # Assemble full desired nickname; the sync service truncates it, skips
+        # it if it already matches and paces the edit
+        desired_nick = f"{before_part}{separator}{after_part}"
+        request_nickname(member, desired_nick, reason="Level up")
+
+    async def cog_load(self):
+        # Bots, commands, blacklisted channels and unverified authors are
+        # filtered out by the dispatcher before _on_message is called
+        if self.coin_level_system_enabled:
+            get_message_dispatcher().register(
+                "leveling", self._on_message,
+                exclude_channels=blacklisted_channel_ids, skip_commands=True, verified_only=True,
+            )
+            self.flush_loop.start()
+
+    def cog_unload(self):
+        get_message_dispatcher().unregister("leveling")
+        if self.flush_loop.is_running():
+            self.flush_loop.cancel()
+        # hand whatever is still pending to the user store (flushed at exit)
+        self.flush_xp()
+
+    async def _on_message(self, ctx: MessageContext):
+        message = ctx.message
+        user_id = str(ctx.author_id)
+        stats = ctx.user_record.get("stats", {})
 
         # ── Spam tracking ──
-        now = time.time()
-        timestamps = self.spam_tracker.get(user_id, [])
-        timestamps = [ts for ts in timestamps if now - ts < 10]
-        timestamps.append(now)
-        self.spam_tracker[user_id] = timestamps
-
-        if len(timestamps) > 5:
+        now = time.monotonic()
+        if not self.xp.record_message(user_id, now):
             log_channel = self.client.get_channel(log_channel_id)
             if log_channel:
                 embed = discord.Embed(
                     title=f"⚠️ Anti-Spam Triggered",
                     description=(f"User {message.author.mention} has triggered anti-spam protection.\n"
-                                 f"Messages in last 10s: {len(timestamps)}"),
+                                 f"Messages in last 10s: {self.xp.recent_messages(user_id, now)}"),
                     color=discord.Color.red()
                 )
                 embed.set_footer(text=f"User ID: {user_id}")
@@ -132,34 +148,21 @@ class LevelingCog(commands.Cog):
                 await log_channel.send(embed=embed)
             return
 
-        stats["exp"] = stats.get("exp", 0)
-        stats["coins"] = stats.get("coins", 0)
-        stats["level"] = stats.get("level", 0)
-        stats["total_messages_sent"] = stats.get("total_messages_sent", 0)
-        stats["coinflips_won"] = stats.get("coinflips_won", 0)
-        stats["coinflips_lost"] = stats.get("coinflips_lost", 0)
-
-        stats["total_messages_sent"] += 1
-
-        last_timestamp = self.message_cooldown.get(user_id, 0)
-        if now - last_timestamp < 5:
+        # ── XP / coins (applied to the user store by flush_loop) ──
+        if not self.xp.award(user_id, now, random.randint(1, 5) + 0.25, random.randint(1, 5)):
             return
-        self.message_cooldown[user_id] = now
 
-        stats["exp"] += random.randint(1, 5) + 0.25
-        stats["coins"] += random.randint(1, 5)
-
-        needed_exp = self.get_required_exp(stats["level"])
-        if stats["exp"] >= needed_exp:
-            stats["level"] += 1
+        level = stats.get("level", 0)
+        if stats.get("exp", 0) + self.xp.pending_exp(user_id) >= self.get_required_exp(level):
+            # Level-ups are committed right away so the new level is visible immediately
+            self.commit_deltas(user_id, *self.xp.take(user_id))
+            stats = ctx.user_record.setdefault("stats", {})
+            stats["level"] = stats.get("level", 0) + 1
             stats["exp"] = 0
+            self.save_user_data(user_id)
             await message.channel.send(f"🎉 {message.author.mention} leveled up to **Level {stats['level']}**!")
             # Only update nickname on level-up:
-            await self.update_nickname(message.author, stats["level"])
-
-        user_record["stats"] = stats
-        self.user_data[user_id] = user_record
-        self.save_user_data()
+            self.update_nickname(message.author, stats["level"])
 
 
 async def setup(client):
@@ -8,8 +8,8 @@ from io import BytesIO
 import requests
 import os
 from utils.pillow import create_welcome_image
-from utils.users_utils import get_verified_users, save_verified_users, get_unverified_users, save_unverified_users
-from utils.nickname_and_roles import rename_user, assign_roles
+from utils.users_utils import get_verified_users, mark_verified_user_dirty, get_unverified_users, mark_unverified_user_dirty
+from utils.nickname_and_roles import rename_user, reconcile_roles
 
 # Open the JSON file and read in the data
 with open('config.json') as json_file:
@@ -70,41 +70,18 @@ class joinleave(commands.Cog):
 
             # 1) Rename user if different nickname
             old_nick = member.display_name
-            await rename_user(member, user_id_str, users_curr_points, first_name, last_name)
-            new_nick = member.display_name  # might have changed after rename_user
-
-            # 2) Assign saved roles (only add)
-            await assign_roles(member, saved_roles)
-            # Remove roles that the user currently has but are NOT in saved roles (except @everyone)
-            current_roles = set(role.id for role in member.roles if role != member.guild.default_role)
-            saved_role_ids = set(int(rid) for rid in saved_roles)
-
-            roles_to_remove = [
-                member.guild.get_role(rid)
-                for rid in current_roles - saved_role_ids
-                if member.guild.get_role(rid)
-            ]
-
-            if roles_to_remove:
-                try:
-                    await member.remove_roles(*roles_to_remove, reason="Removing roles not in saved data on rejoin")
-                except discord.Forbidden:
-                    print(f"Missing permissions to remove some roles from {member.display_name}")
-                except Exception as e:
-                    print(f"Unexpected error removing roles from {member.display_name}: {e}")
-
-
-            # 3) Remove roles that user currently has but are NOT in saved roles (except @everyone)
-            current_roles = set(role.id for role in member.roles if role != member.guild.default_role)
-            saved_role_ids = set(int(rid) for rid in saved_roles)
-            roles_to_remove = [member.guild.get_role(rid) for rid in current_roles - saved_role_ids if member.guild.get_role(rid)]
-            if roles_to_remove:
-                try:
-                    await member.remove_roles(*roles_to_remove, reason="Removing roles not in saved data on rejoin")
-                except discord.Forbidden:
-                    pass
+            # queued on the nickname sync service; log the nickname it will set
+            new_nick = await rename_user(member, user_id_str, users_curr_points, first_name, last_name) or member.display_name
+
+            # Snapshot roles before the restore so the log shows old -> saved
+            current_roles = {r.id for r in member.roles if not r.is_default()}
+            saved_role_ids = {int(r) for r in saved_roles}
+
+            # 2) Restore saved roles: add missing ones and remove roles that are
+            #    NOT in saved data (except @everyone), in a single edit
+            await reconcile_roles(member, saved_roles, remove_extra=True, reason="Restoring saved roles on rejoin")
 
-            # 4) Prepare embed for bot logs channel
+            # 3) Prepare embed for bot logs channel
             now_time = datetime.datetime.now(datetime.timezone.utc)
 
             # Format time difference if first_join_time is known
@@ -121,7 +98,7 @@ class joinleave(commands.Cog):
             
             # Compare roles for embed field
             # old roles mentions
-            old_roles_mentions = [f"<@&{role.id}>" for role in member.roles if role.id in current_roles]
+            old_roles_mentions = [f"<@&{rid}>" for rid in current_roles]
 
             saved_roles_mentions = []
             for rid in saved_role_ids:
@@ -159,7 +136,7 @@ class joinleave(commands.Cog):
             member_count = len(member.guild.members)
 
             # Create the welcome image using your utility function
-            welcome_image_path = create_welcome_image(member, member_count, VSA_FAMILY_NAME)
+            welcome_image = await create_welcome_image(member, member_count, VSA_FAMILY_NAME)
 
             # Auto-role assignment
             role = member.guild.get_role(member_role_id)
@@ -167,12 +144,12 @@ class joinleave(commands.Cog):
 
             # Send to welcome channel
             channel = self.client.get_channel(welcome_channel_id)
-            file = discord.File(welcome_image_path)
+            file = discord.File(welcome_image, filename=welcome_image.name)
             embed = discord.Embed(
                 description=f"Welcome to {member.guild.name}, {member.mention}!",
                 colour=embed_color
             )
-            embed.set_image(url="attachment://welcome.png")
+            embed.set_image(url=f"attachment://{welcome_image.name}")
 
             # DM to new member
             title = join_dm_template["title"].format(
@@ -284,7 +261,7 @@ class joinleave(commands.Cog):
                         unverified_users[user_id_str]["discord_profile"]["nickname"] = member.nick
                         unverified_users[user_id_str]["discord_profile"]["discord_name"] = str(member)
 
-                save_unverified_users(unverified_users)
+                mark_unverified_user_dirty(user_id_str)
 
 
 
@@ -300,7 +277,7 @@ class joinleave(commands.Cog):
             verified_users[user_id_str]["discord_profile"]["user_left_timestamp"] = now_time
             verified_users[user_id_str]["discord_profile"]["still_in_server"] = False
             verified_users[user_id_str]["discord_profile"]["last_updated"] = now_time
-            save_verified_users(verified_users)
+            mark_verified_user_dirty(user_id_str)
 
             embed = discord.Embed(
                 title=f"🚪 | Verified User Left",
@@ -313,7 +290,7 @@ class joinleave(commands.Cog):
             unverified_users = get_unverified_users()
             if user_id_str in unverified_users:
                 unverified_users[user_id_str]["discord_profile"]["user_left_timestamp"] = now_time
-                save_unverified_users(unverified_users)
+                mark_unverified_user_dirty(user_id_str)
 
                 embed = discord.Embed(
                     title=f"🚪 | Unverified User Left",
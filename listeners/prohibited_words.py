@@ -3,7 +3,6 @@ import os
 import re
 import json
 import datetime
-import unicodedata
 import time
 from typing import List, Optional, Tuple
 from collections import defaultdict
@@ -11,6 +10,8 @@ from collections import defaultdict
 import discord
 from discord.ext import commands
 
+from utils.message_dispatch import STOP, MessageContext, build_message_context, get_message_dispatcher
+
 # Optional: load .env if python-dotenv is installed; otherwise os.getenv still works
 try:
     from dotenv import load_dotenv
@@ -31,8 +32,11 @@ CHAT FILTER (Local Blacklist, No API)
     * case-insensitive
     * leet variants: a/@/4, e/3, i/1/!, o/0, s/$/5, t/7, b/8, g/9
     * up to 2 non-alphanumerics allowed between letters of each phrase
-- Normalizes content (NFKD, strip diacritics, remove zero-width chars) before matching.
-- Skips DMs, webhooks, bots, and omitted channels. Enforces len <= MAX_CHECK_LEN.
+- Normalizes content (NFKD, strip diacritics, remove zero-width chars) before matching;
+  the normalized text comes from the shared MessageContext (utils/message_dispatch.py).
+- Runs as the dispatcher's gate handler: omitted channels are never routed here, and
+  a removed message stops the pipeline (no command processing, no XP).
+- Skips DMs, webhooks and bots. Enforces len <= MAX_CHECK_LEN.
 - Default blacklist ["fuck you"] if feature enabled and env is empty/missing.
 - Deletes offending messages, posts a concise channel warning (rate-limited),
   and DMs the user a private notice (rate-limited).
@@ -89,26 +93,6 @@ def _parse_env_blacklist(raw: Optional[str]) -> List[str]:
     return out
 
 
-def _remove_zero_width(s: str) -> str:
-    # Common zero-width characters attackers use to split words invisibly
-    ZW = {"\u200b", "\u200c", "\u200d", "\ufeff", "\u2060"}
-    return "".join(ch for ch in s if ch not in ZW)
-
-
-def _normalize_content(s: str) -> str:
-    """
-    Normalize input to catch obfuscations:
-      - Unicode NFKD
-      - strip diacritics (á -> a)
-      - remove zero-width chars
-    """
-    s = _remove_zero_width(s)
-    # Decompose accents and drop combining marks
-    nfkd = unicodedata.normalize("NFKD", s)
-    stripped = "".join(ch for ch in nfkd if not unicodedata.combining(ch))
-    return stripped
-
-
 def _leet_charclass(c: str) -> str:
     """
     For a single ASCII letter, return a character class covering simple leet variants.
@@ -221,7 +205,7 @@ class BadWordCheck(commands.Cog):
             .get("filtered_chat", {})
         )
         self._enabled = bool(fc.get("enable_feature", False))
-        self._omit_channels = set(str(cid) for cid in fc.get("omit_channels_id", []))
+        self._omit_channels = set(int(cid) for cid in fc.get("omit_channels_id", []) if str(cid).strip().isdigit())
         # Punishments mode flag
         self._punishments_mode = bool(fc.get("punishments_mode", False))
 
@@ -246,58 +230,54 @@ class BadWordCheck(commands.Cog):
 
     # --------------------------- Event Handlers ---------------------------
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        await self._handle_message_filter(message)
+    async def cog_load(self):
+        # New messages arrive through the dispatcher (which processes commands
+        # only if this gate lets the message through)
+        if self._enabled and self._regex:
+            get_message_dispatcher().register(
+                "chat_filter", self._handle_message_filter,
+                gate=True, exclude_channels=self._omit_channels, requires_content=True,
+            )
+
+    def cog_unload(self):
+        get_message_dispatcher().unregister("chat_filter")
 
     @commands.Cog.listener()
     async def on_message_edit(self, before: discord.Message, after: discord.Message):
         # Re-check edited messages for filter bypass
-        await self._handle_message_filter(after)
-
-    # --------------------------- Core Logic ---------------------------
-
-    async def _handle_message_filter(self, message: discord.Message):
-        # --- basic guards ---
-        if message.author.bot or message.webhook_id is not None:
-            return
-        if not isinstance(message.channel, (discord.TextChannel, discord.Thread)):  # skip DMs
+        ctx = build_message_context(after, self.client)
+        if ctx.is_bot or ctx.is_webhook or not ctx.in_guild_channel:  # skip DMs
             return
+        if await self._handle_message_filter(ctx) is not STOP:
+            await self.client.process_commands(after)
 
-        # Feature flag
-        if not self._enabled:
-            await self.client.process_commands(message)
-            return
+    # --------------------------- Core Logic ---------------------------
 
-        # Omit certain channels by ID (config stores strings)
-        if str(message.channel.id) in self._omit_channels:
-            await self.client.process_commands(message)
+    async def _handle_message_filter(self, ctx: MessageContext):
+        """Delete `ctx.message` if it matches the blacklist; returns STOP when it did."""
+        # Feature flag / omitted channels (edits bypass the routing table)
+        if not self._enabled or ctx.channel_id in self._omit_channels:
             return
 
-        content = message.content or ""
+        content = ctx.content
         if not content:
-            await self.client.process_commands(message)
             return
 
         # Length guard (performance)
         if len(content) > MAX_CHECK_LEN:
-            await self.client.process_commands(message)
             return
 
         # If no regex (empty env & feature off, or only blanks), skip
         if not self._regex:
-            await self.client.process_commands(message)
             return
 
-        # Normalize text for matching
-        normalized = _normalize_content(content)
-
-        # Try to find a match
-        m = self._regex.search(normalized)
+        # Try to find a match on the normalized text
+        m = self._regex.search(ctx.normalized)
         if not m:
-            await self.client.process_commands(message)
             return
 
+        message = ctx.message
+
         # --- action: delete first ---
         try:
             await message.delete()
@@ -370,7 +350,7 @@ class BadWordCheck(commands.Cog):
                     pass
 
         # IMPORTANT: do NOT process commands if content was filtered.
-        return
+        return STOP
 
 
 async def setup(client: commands.Bot):
@@ -0,0 +1,442 @@
+# bench_render.py
+#
+# Offline benchmark for the Pillow renderers. Uses synthetic members /
+# families and locally generated placeholder avatars (primed into
+# utils/http_client, so nothing touches the Discord CDN). Renderers run inside
+# a throwaway workspace holding a minimal bench config.json and, by default,
+# generated placeholder backgrounds / overlays plus Pillow's bundled font
+# (Pillow >= 10.1), so a clean checkout needs neither the deployment config
+# nor the (untracked) asset files. Run from the repo root:
+#
+#   python -m scripts.bench_render                      # all renderers, 20 runs each
+#   python -m scripts.bench_render -n 50 -r profile_card welcome
+#   python -m scripts.bench_render --update-goldens     # re-record reference hashes
+#   python -m scripts.bench_render --assets assets      # real assets (no goldens unless --goldens)
+#
+# For every renderer it reports p50 / p95 latency, peak RSS of the process
+# that ran it (each renderer runs in a fresh process) and Python-heap
+# allocations (tracemalloc, one extra run; Pillow's own C buffers are not
+# traced). It then compares a perceptual hash (64-bit dHash) of the output
+# against scripts/bench_goldens.json and exits non-zero if any renderer
+# drifted by more than --threshold bits, so rendering optimizations can be
+# checked for visual regressions. The committed goldens are for the
+# placeholder assets and the Pillow version's bundled font.
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import asyncio
+import argparse
+import tracemalloc
+import tempfile
+import multiprocessing
+from io import BytesIO
+from types import SimpleNamespace
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from PIL import Image, ImageDraw
+
+GOLDENS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_goldens.json")
+DEFAULT_RUNS = 20
+DEFAULT_THRESHOLD = 6  # Hamming distance (of 64 bits); the welcome banner draws the current time
+SEED = 1227
+
+ROLE_KEYS = ["fl", "dd", "nm", "officer", "ex-officer", ""]
+FAMILY_NAMES = ["Kuromi", "Cinnamoroll", "Pompompurin", "My Melody", "Keroppi", "Badtz-Maru", "Pochacco", "Hangyodon"]
+FIRST_NAMES = ["An", "Bao", "Chi", "Duc", "Hanh", "Khoa", "Linh", "Minh", "Ngoc", "Phuong", "Quan", "Thao", "Trinh", "Vy"]
+LAST_NAMES = ["Nguyen", "Tran", "Le", "Pham", "Hoang", "Vu", "Dang", "Bui", "Do", "Ho"]
+
+PILLOW_CONF = {
+    "random_background": False,
+    "title": "Points",
+    "footer": "© UH VSA | WWW.UHVSA.COM",
+}
+
+# Just the keys the renderers' imports read; everything else uses defaults
+BENCH_CONFIG = {
+    "file_paths": {"all_discord_user_member_database_json_path": os.path.join("data", "bench_users.json")},
+    "features": {"rendering": {}},
+}
+
+# Placeholder assets: relative path -> size (backgrounds / overlays / resources)
+PLACEHOLDER_IMAGES = {
+    "backgrounds/welcome_banner.png": (2000, 1000),
+    "backgrounds/810_670.png": (810, 670),
+    "backgrounds/860_538_1.png": (860, 538),
+    "backgrounds/863_548_1.png": (863, 548),
+    "backgrounds/650_470_1.png": (650, 470),
+    "overlays/leaderboards_overlay.png": (863, 548),
+    "overlays/leaderboards_family_overlay.png": (650, 470),
+    "overlays/profile_overlay.png": (860, 538),
+    "overlays/weekly_reports_overlay.png": (810, 670),
+    "overlays/qotd.png": (860, 538),
+    "overlays/family_info_overlay.png": (600, 240),
+    "resources/kuromi_logo_with_white_bg.png": (256, 256),
+}
+PLACEHOLDER_FONTS = ("fonts/Nexa-Heavy.ttf", "fonts/Nexa-ExtraLight.ttf", "fonts/georgiaref.ttf")
+
+
+# ---------- Synthetic inputs ----------
+def placeholder_avatar(seed: int, size: int = 512) -> bytes:
+    """Deterministic gradient + circle PNG standing in for a Discord avatar."""
+    rng = random.Random(seed)
+    c1 = tuple(rng.randrange(256) for _ in range(3))
+    c2 = tuple(rng.randrange(256) for _ in range(3))
+    img = Image.linear_gradient("L").resize((size, size))
+    img = Image.composite(Image.new("RGB", (size, size), c1), Image.new("RGB", (size, size), c2), img)
+    ImageDraw.Draw(img).ellipse((size // 4, size // 4, 3 * size // 4, 3 * size // 4), fill=c2)
+    buf = BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def placeholder_asset(rel_path: str, size: tuple[int, int]) -> Image.Image:
+    """Deterministic stand-in for a background / overlay (overlays are translucent)."""
+    rng = random.Random(f"{SEED}:{rel_path}")
+    w, h = size
+    c1 = tuple(rng.randrange(256) for _ in range(3))
+    c2 = tuple(rng.randrange(256) for _ in range(3))
+    img = Image.composite(Image.new("RGB", size, c1), Image.new("RGB", size, c2), Image.linear_gradient("L").resize(size))
+    img = img.convert("RGBA")
+    draw = ImageDraw.Draw(img)
+    for _ in range(6):
+        x, y = rng.randrange(w), rng.randrange(h)
+        r = rng.randrange(max(w, h) // 10, max(w, h) // 3)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rng.randrange(256) for _ in range(3)) + (255,))
+    if rel_path.startswith("overlays/"):
+        img.putalpha(160)
+    return img
+
+
+def prepare_workspace(root: str, assets_dir: str | None):
+    """Write the bench config.json and assets/ (copied from assets_dir, or placeholders) into root."""
+    with open(os.path.join(root, "config.json"), "w") as f:
+        json.dump(BENCH_CONFIG, f, indent=2)
+    os.makedirs(os.path.join(root, "data"), exist_ok=True)
+
+    target = os.path.join(root, "assets")
+    if assets_dir:
+        shutil.copytree(assets_dir, target)
+        return
+
+    from PIL import ImageFont
+    font_bytes = getattr(ImageFont.load_default(size=12), "font_bytes", None)
+    if not font_bytes:
+        raise RuntimeError("placeholder fonts need Pillow >= 10.1 with FreeType; pass --assets DIR instead")
+    for rel_path in PLACEHOLDER_FONTS:
+        path = os.path.join(target, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(font_bytes)
+    for rel_path, size in PLACEHOLDER_IMAGES.items():
+        path = os.path.join(target, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        placeholder_asset(rel_path, size).save(path, "PNG")
+
+
+def synthetic_members(count: int, rng: random.Random) -> list[dict]:
+    members = []
+    for i in range(count):
+        members.append({
+            "psid": str(1000000 + i),
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "role_key": rng.choice(ROLE_KEYS),
+            "family_name": rng.choice(FAMILY_NAMES),
+            "points": rng.randrange(0, 400),
+        })
+    members.sort(key=lambda m: m["points"], reverse=True)
+    return members
+
+
+def synthetic_families(rng: random.Random) -> list[dict]:
+    families = []
+    for name in FAMILY_NAMES:
+        count = rng.randrange(8, 40)
+        total = rng.randrange(200, 4000)
+        families.append({"family": name, "total_points": total, "member_count": count, "avg_points": total // count})
+    families.sort(key=lambda f: f["avg_points"], reverse=True)
+    return families
+
+
+def synthetic_family_conf(logo_url: str) -> dict:
+    return {name: {"short_name": name[:3].upper(), "logo_image_url": logo_url} for name in FAMILY_NAMES}
+
+
+# ---------- Renderers ----------
+# Each entry: name -> async callable(ctx) returning the rendered image buffer.
+async def bench_leaderboard_page(ctx):
+    from utils.image_generator import generate_leaderboard_image
+    return generate_leaderboard_image(ctx.members[:10], "points", PILLOW_CONF, ctx.family_conf, 1, 5)
+
+
+async def bench_family_leaderboard(ctx):
+    from utils.image_generator import generate_family_leaderboard_image
+    return await generate_family_leaderboard_image(ctx.families, PILLOW_CONF, ctx.family_conf)
+
+
+async def bench_profile_card(ctx):
+    # render path only: the result cache is bypassed (see profile_card_cached)
+    from utils.profile_utils import _render_profile_card
+    data, _ = await _render_profile_card(ctx.profile_stats, "Profile", PILLOW_CONF["footer"], ctx.avatar_url)
+    return BytesIO(data)
+
+
+async def bench_profile_card_cached(ctx):
+    from utils.profile_utils import generate_profile_image
+    return await generate_profile_image(ctx.profile_stats, "Profile", PILLOW_CONF["footer"], {}, ctx.interaction)
+
+
+async def bench_welcome(ctx):
+    from utils.pillow import create_welcome_image
+    return await create_welcome_image(ctx.member, 1234, "Kuromi")
+
+
+async def bench_weekly_report(ctx):
+    from utils.pillow import generate_fam_weekly_stats_report
+    top5 = [{"abbr": "KUR", "first_name": m["first_name"], "last_name": m["last_name"], "points": m["points"]}
+            for m in ctx.members[:5]]
+    end = date(2025, 1, 12)
+    image = generate_fam_weekly_stats_report(
+        start_date=end - timedelta(days=6), end_date=end,
+        weekly_points=812, weekly_contributors=37, total_family_members=52, weekly_pts_per_member=15.6,
+        weekly_points_rank=2, weekly_points_rank_total=9, weekly_contrib_rank=1, weekly_contrib_rank_total=9,
+        weekly_pts_per_member_rank=3, weekly_pts_per_member_rank_total=9, weekly_top5=top5,
+        overall_points=10422, overall_members=52, overall_pts_per_member=200.4,
+        overall_points_rank=1, overall_points_rank_total=9, overall_members_rank=2, overall_members_rank_total=9,
+        overall_pts_per_member_rank=1, overall_pts_per_member_rank_total=9, overall_top5=top5,
+    )
+    if image is None:
+        raise RuntimeError("generate_fam_weekly_stats_report returned None (see log above)")
+    return image
+
+
+RENDERERS = {
+    "leaderboard_page": bench_leaderboard_page,
+    "family_leaderboard": bench_family_leaderboard,
+    "profile_card": bench_profile_card,
+    "profile_card_cached": bench_profile_card_cached,
+    "welcome": bench_welcome,
+    "weekly_report": bench_weekly_report,
+}
+
+
+class BenchMember(SimpleNamespace):
+    """Stand-in for discord.Member: just what the renderers read."""
+    def __str__(self):
+        return "bench_user"
+
+
+def build_context():
+    from utils import http_client
+    from utils.profile_utils import PROFILE_STAT_COORDS
+
+    rng = random.Random(SEED)
+    avatar_url = "https://bench.invalid/avatars/placeholder.png"
+    logo_url = "https://bench.invalid/logos/placeholder.png"
+    http_client.prime(avatar_url, placeholder_avatar(SEED))
+    http_client.prime(logo_url, placeholder_avatar(SEED + 1, size=128))
+
+    asset = SimpleNamespace(url=avatar_url)
+    member = BenchMember(
+        avatar=asset, display_avatar=asset, default_avatar=asset,
+        guild=SimpleNamespace(icon=None),
+        created_at=datetime(2021, 8, 24, tzinfo=timezone.utc),
+    )
+    guild = SimpleNamespace(icon=None, get_member=lambda _id: member)
+
+    profile_stats = {field: rng.randrange(1, 60) for field in PROFILE_STAT_COORDS}
+    for field in ("Global Points Ranking", "Family Points Ranking", "Mem. Type Points Ranking"):
+        profile_stats[field] = (rng.randrange(1, 200), 200)
+    profile_stats.update({
+        "discord_user_id": 1,
+        "Family": "Kuromi", "Mem. Type": "Officer", "Birthday": "01/01/2004",
+        "Graduation Year": "Senior", "Verified On": "08/24/2024",
+    })
+
+    return SimpleNamespace(
+        members=synthetic_members(50, rng),
+        families=synthetic_families(rng),
+        family_conf=synthetic_family_conf(logo_url),
+        avatar_url=avatar_url,
+        member=member,
+        interaction=SimpleNamespace(guild=guild),
+        profile_stats=profile_stats,
+    )
+
+
+# ---------- Measurement ----------
+def dhash(image: Image.Image) -> str:
+    """64-bit difference hash, as 16 hex digits."""
+    small = image.convert("L").resize((9, 8), Image.LANCZOS)
+    px = small.tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return f"{bits:016x}"
+
+
+def hamming(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+
+
+def run_renderer(name: str, runs: int, workspace: str) -> dict:
+    """Benchmark one renderer in the current process (from inside `workspace`)."""
+    os.chdir(workspace)  # the renderers read config.json / assets/ relative to cwd
+    async def measure():
+        ctx = build_context()
+        render = RENDERERS[name]
+
+        output = await render(ctx)  # warm-up: fonts, templates, decoded avatars
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            output = await render(ctx)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        await render(ctx)
+        after = tracemalloc.take_snapshot()
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        allocs = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+        output.seek(0)
+        with Image.open(output) as img:
+            phash = dhash(img)
+        return {
+            "p50_ms": percentile(timings, 50),
+            "p95_ms": percentile(timings, 95),
+            "peak_rss_mb": peak_rss_mb(),
+            "py_peak_kb": traced_peak / 1024,
+            "py_allocs": allocs,
+            "dhash": phash,
+        }
+
+    return asyncio.run(measure())
+
+
+def _child(name: str, runs: int, workspace: str, queue):
+    try:
+        queue.put((name, run_renderer(name, runs, workspace), None))
+    except Exception as e:
+        queue.put((name, None, f"{type(e).__name__}: {e}"))
+
+
+def run_isolated(name: str, runs: int, workspace: str) -> tuple[dict | None, str | None]:
+    """Run one renderer in a fresh process so peak RSS is its own."""
+    mp = multiprocessing.get_context("spawn")
+    queue = mp.Queue()
+    proc = mp.Process(target=_child, args=(name, runs, workspace, queue))
+    proc.start()
+    _, result, error = queue.get()
+    proc.join()
+    return result, error
+
+
+# ---------- Main ----------
+def load_goldens(path: str | None) -> dict:
+    if not path:
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the image renderers offline.")
+    parser.add_argument("-n", "--runs", type=int, default=DEFAULT_RUNS, help="timed runs per renderer")
+    parser.add_argument("-r", "--renderers", nargs="+", choices=sorted(RENDERERS), help="subset to run")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD, help="max dHash bit difference vs golden")
+    parser.add_argument("--update-goldens", action="store_true", help="record current hashes as the goldens")
+    parser.add_argument("--in-process", action="store_true", help="don't spawn a process per renderer")
+    parser.add_argument("--assets", help="render with this assets/ directory instead of placeholders")
+    parser.add_argument("--goldens", help=f"golden hashes file (default: {os.path.basename(GOLDENS_PATH)}, "
+                                          "none with --assets)")
+    args = parser.parse_args()
+
+    goldens_path = args.goldens or (None if args.assets else GOLDENS_PATH)
+    if args.update_goldens and not goldens_path:
+        parser.error("--update-goldens with --assets needs an explicit --goldens file")
+
+    names = args.renderers or list(RENDERERS)
+    goldens = load_goldens(goldens_path)
+    failed = False
+
+    with tempfile.TemporaryDirectory(prefix="bench_render_") as workspace:
+        prepare_workspace(workspace, os.path.abspath(args.assets) if args.assets else None)
+        failed = run_all(args, names, goldens, workspace)
+
+    if args.update_goldens:
+        with open(goldens_path, "w") as f:
+            json.dump(goldens, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"[bench_render] Wrote {len(goldens)} golden hash(es) to {goldens_path}")
+
+    sys.exit(1 if failed else 0)
+
+
+def run_all(args, names: list[str], goldens: dict, workspace: str) -> bool:
+    """Run and report every renderer; returns True if any errored or drifted."""
+    failed = False
+
+    print(f"{'renderer':<22}{'p50 ms':>9}{'p95 ms':>9}{'RSS MB':>9}{'py KB':>9}{'allocs':>9}  golden")
+    for name in names:
+        if args.in_process:
+            try:
+                result, error = run_renderer(name, args.runs, workspace), None
+            except Exception as e:
+                result, error = None, f"{type(e).__name__}: {e}"
+        else:
+            result, error = run_isolated(name, args.runs, workspace)
+
+        if result is None:
+            failed = True
+            print(f"{name:<22}ERROR {error}")
+            continue
+
+        golden = goldens.get(name)
+        if args.update_goldens:
+            goldens[name] = result["dhash"]
+            verdict = "updated"
+        elif golden is None:
+            verdict = "no golden"
+        else:
+            dist = hamming(golden, result["dhash"])
+            verdict = f"ok ({dist})" if dist <= args.threshold else f"DRIFT ({dist} bits)"
+            failed |= dist > args.threshold
+
+        print(f"{name:<22}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['peak_rss_mb']:>9.1f}"
+              f"{result['py_peak_kb']:>9.0f}{result['py_allocs']:>9}  {verdict}")
+    return failed
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# migrate_user_db.py
+#
+# One-shot migration of the Discord user database between the JSON file and
+# the SQLite backend (see utils/user_backends.py). Run from the repo root:
+#
+#   python -m scripts.migrate_user_db              # JSON  -> SQLite
+#   python -m scripts.migrate_user_db --export     # SQLite -> JSON
+#
+# After importing, set config["features"]["user_store"]["backend"] = "sqlite"
+# and restart the bot. Stop the bot before running this so nothing writes
+# to either store while the migration runs.
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.user_backends import SqliteUserBackend
+from utils.user_store import USER_DATABASE_PATH, USER_DATABASE_SQLITE_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate the user database between JSON and SQLite.")
+    parser.add_argument("--json", default=USER_DATABASE_PATH, help="JSON database path")
+    parser.add_argument("--sqlite", default=USER_DATABASE_SQLITE_PATH, help="SQLite database path")
+    parser.add_argument("--export", action="store_true", help="Export SQLite -> JSON instead of importing")
+    args = parser.parse_args()
+
+    backend = SqliteUserBackend(args.sqlite)
+    try:
+        if args.export:
+            count = backend.export_json(args.json)
+            print(f"[migrate_user_db] Exported {count} user record(s): {args.sqlite} -> {args.json}")
+        else:
+            if not os.path.isfile(args.json):
+                print(f"[migrate_user_db] JSON database not found: {args.json}")
+                sys.exit(1)
+            count = backend.import_json(args.json)
+            print(f"[migrate_user_db] Imported {count} user record(s): {args.json} -> {args.sqlite}")
+            print('[migrate_user_db] Set features.user_store.backend = "sqlite" in config.json to use it.')
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    main()
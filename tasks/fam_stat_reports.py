@@ -7,6 +7,8 @@ import os
 
 from utils.pillow import generate_fam_weekly_stats_report  # <-- import your function
 from utils.stats_utils import *
+from utils import cache_utils, render_scheduler
+from utils.event_matrix import get_event_matrix
 
 CONFIG_PATH = "config.json"
 
@@ -32,12 +34,8 @@ class FamilyStats(commands.Cog):
             self.config = json.load(f)
 
     def load_vsa_db(self):
-        db_path = self.config["file_paths"]["parsed_vsa_member_data_and_events_info_file"]
-        if os.path.exists(db_path):
-            with open(db_path, "r") as f:
-                self.vsa_db = json.load(f)
-        else:
-            self.vsa_db = {"parsed_members": {}, "family_stats": {}, "events_info": {}, "leaderboards": {}}
+        # Memoized snapshot of the parsed sheet cache (refreshed by SheetsCacheUpdater)
+        self.vsa_db = cache_utils.load_parsed_cache()
 
     async def send_weekly_report(self, start_date: datetime, end_date: datetime):
         # Format the dates as MM/DD/YYYY
@@ -45,6 +43,7 @@ class FamilyStats(commands.Cog):
         formatted_end_date = end_date.strftime("%m/%d/%Y")
         
         """Generate and send the weekly report image."""
+        self.load_vsa_db()
         channel_id = int(self.config["text_channel_ids"]["family_stat_reports"])
         channel = self.bot.get_channel(channel_id)
         if not channel:
@@ -52,29 +51,16 @@ class FamilyStats(commands.Cog):
             return
 
         members = self.vsa_db.get("parsed_members", {})
-        events_info = list(self.vsa_db.get("events_info", {}).values())
         family_stats = self.vsa_db.get("family_stats", {})
         leaderboards = self.vsa_db.get("leaderboards", {})
 
-        # Determine weekly points for each member
-        weekly_member_points = {}
-        for psid, member in members.items():
-            weekly_points = 0
-            for idx, event in enumerate(events_info):
-                event_date = datetime.strptime(event["date"], "%m/%d/%Y").date()
-                if start_date.date() <= event_date <= end_date.date():
-                    weekly_points += member["event_points"][idx]
-            weekly_member_points[psid] = weekly_points
+        # Weekly points per member: one bisect on the event-date index plus a
+        # prefix-sum subtraction per member (see utils/event_matrix.py)
+        matrix = get_event_matrix(self.vsa_db)
+        weekly_member_points = dict(zip(matrix.psids, matrix.timeframe_points(start_date, end_date)))
 
         # Aggregate weekly stats per family
-        weekly_family_stats = {}
-        for psid, points in weekly_member_points.items():
-            member = members[psid]
-            fam_name = member.get("family_name") or "Not in a family"
-            if fam_name not in weekly_family_stats:
-                weekly_family_stats[fam_name] = {"total_points": 0, "member_count": 0}
-            weekly_family_stats[fam_name]["total_points"] += points
-            weekly_family_stats[fam_name]["member_count"] += 1
+        weekly_family_stats = matrix.family_timeframe_stats(start_date, end_date)
 
         # Compute weekly averages
         for fam_name, stats in weekly_family_stats.items():
@@ -131,11 +117,12 @@ class FamilyStats(commands.Cog):
 
         # Generate report image
         total_families_plus_not_in_fam = len(get_full_family_leaderboard())
-        output_path = "./assets/outputs/weekly_fam_report.png"
-        img_path = generate_fam_weekly_stats_report(
+        # drawn on a render slot, off the event loop
+        report_image = await render_scheduler.submit(
+            generate_fam_weekly_stats_report,
+            priority=render_scheduler.PRIORITY_SCHEDULED,
             start_date=start_date.date(),
             end_date=end_date.date(),
-            output_path=output_path,
             # Weekly stats
             weekly_points=total_weekly_points,
             weekly_contributors=len(get_family_contributors_in_timeframe(formatted_start_date, formatted_end_date)),
@@ -179,17 +166,14 @@ class FamilyStats(commands.Cog):
             overall_members_rank=get_family_size_rank(),
             overall_members_rank_total=total_families_plus_not_in_fam,
 
-            overall_pts_per_member_rank = next(
-                (i + 1 for i, f in enumerate(get_family_pts_per_member_ranking()) 
-                if f["family"] == config["general"]["google_sheets_fam_name"]),
-                None),
+            overall_pts_per_member_rank=get_family_rank(config["general"]["google_sheets_fam_name"], "pts_per_member"),
 
             overall_pts_per_member_rank_total=total_families_plus_not_in_fam
         )
 
 
-        if img_path and os.path.exists(img_path):
-            await channel.send(file=discord.File(img_path))
+        if report_image is not None:
+            await channel.send(file=discord.File(report_image, filename=report_image.name))
         else:
             await channel.send("⚠️ Failed to generate weekly report image.")
 
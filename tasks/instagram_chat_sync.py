@@ -9,6 +9,8 @@ from typing import Any, Dict, List, Optional, Tuple
 import discord
 from discord.ext import commands, tasks
 
+from utils.message_dispatch import MessageContext, get_message_dispatcher
+
 # Unofficial IG lib (⚠️ ToS risk; use at your own risk)
 from instagrapi import Client
 from instagrapi.exceptions import DirectThreadNotFound
@@ -304,19 +306,24 @@ class InstagramDMChatSync(commands.Cog):
         self._log("Instagram DM chat sync loop started.", important=True)
 
     # --------------- Discord → Instagram listener ---------------
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        # Only when enabled and dc->ig is true
-        if not self.enabled or not self.dc_to_ig:
-            return
-        if message.author.bot or message.webhook_id is not None:
-            return
-        if not isinstance(message.channel, discord.TextChannel):
-            return
-        if message.channel.id != self.sync_channel_id:
+    async def cog_load(self):
+        # Only when enabled and dc->ig is true; the dispatcher routes just the
+        # sync channel here and drops bot / webhook messages
+        if self.enabled and self.dc_to_ig and self.sync_channel_id:
+            get_message_dispatcher().register(
+                "instagram_chat_sync", self._on_message,
+                channels=[self.sync_channel_id], requires_content=True,
+            )
+
+    def cog_unload(self):
+        get_message_dispatcher().unregister("instagram_chat_sync")
+
+    async def _on_message(self, ctx: MessageContext):
+        if ctx.is_thread:
             return
+        message = ctx.message
 
-        content = (message.content or "").strip()
+        content = ctx.content.strip()
         if not content:
             return
 
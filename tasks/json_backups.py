@@ -20,6 +20,9 @@ import logging
 import shutil
 import re
 import os
+import asyncio
+
+from utils.user_store import user_store, USER_DATABASE_PATH
 
 logger = logging.getLogger("JSONBackup")
 
@@ -82,6 +85,12 @@ class JSONBackup(commands.Cog):
             }
 
 
+            # Make sure the resident user DB is on disk before it gets copied;
+            # non-JSON backends are exported to the JSON path so backups stay JSON
+            await user_store.flush_async()
+            if user_store.backend.name != "json":
+                await asyncio.to_thread(user_store.backend.export_json, USER_DATABASE_PATH)
+
             # Copy files into backups folder
             for rel_path, file_path in files_to_backup.items():
                 if not file_path.exists():
@@ -8,6 +8,10 @@ import json
 from collections import defaultdict
 from discord.ext import commands, tasks
 
+from utils import render_scheduler
+from utils.message_dispatch import get_message_dispatcher
+from utils.nickname_sync import get_nickname_sync
+
 # --- Load config once at import time ---
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
 with open(CONFIG_PATH, 'r') as f:
@@ -68,6 +72,10 @@ class MemoryMonitor(commands.Cog):
         for file, size in top_files:
             report_lines.append(f"- {file}: {size/1024/1024:.2f} MB")
 
+        report_lines.append(render_scheduler.get_render_scheduler().summary())
+        report_lines.append(get_message_dispatcher().summary())
+        report_lines.append(get_nickname_sync().summary())
+
         # --- Discord-safe output ---
         out = "\n".join(report_lines)
         if len(out) > 1900:
@@ -105,6 +113,10 @@ class MemoryMonitor(commands.Cog):
         for file, size in top_files:
             report.append(f"- {file}: {size/1024/1024:.2f} MB")
 
+        report.append(render_scheduler.get_render_scheduler().summary())
+        report.append(get_message_dispatcher().summary())
+        report.append(get_nickname_sync().summary())
+
         print("\n".join(report) + "\n")
 
 async def setup(bot):
@@ -12,8 +12,11 @@ import gspread
 from google.oauth2.service_account import Credentials
 
 from utils import stats_utils
-from utils.leaderboard_utils import regenerate_leaderboard_pages
+from utils.leaderboard_utils import regenerate_leaderboard_pages, shutdown_render_pool
 from utils import cache_utils
+from utils.event_matrix import get_event_matrix
+from utils import sheet_ingest
+from utils.sheet_ingest import SheetIngestor
 from utils import profile_utils
 
 # ── CONFIG & SHEETS CLIENT SETUP ─────────────────────────────────────────────
@@ -37,6 +40,9 @@ SERVICE_ACCOUNT_FILE  = config['file_paths']['vsa_google_service_account_file']
 SCOPES                = ['https://www.googleapis.com/auth/spreadsheets.readonly']
 
 # Build gspread client
+# gspread wraps the credentials in an AuthorizedSession, which refreshes the
+# access token on its own when it expires, so one client can live for the
+# whole process.
 def get_gspread_client():
     creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
     return gspread.authorize(creds)
@@ -52,6 +58,13 @@ class SheetsCacheUpdater(commands.Cog):
     """Fetches spreadsheet data every minute, caches raw & parsed data, and regenerates leaderboard images."""
     def __init__(self, client):
         self.client = client
+        self._spreadsheet = None  # long-lived gspread Spreadsheet handle (see _get_spreadsheet)
+        self._ingestor = SheetIngestor()
+
+    @property
+    def last_changed_at(self):
+        """UTC datetime of the last refresh that saw different sheet contents (None before the first)."""
+        return cache_utils.get_sheet_last_changed()
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -62,14 +75,66 @@ class SheetsCacheUpdater(commands.Cog):
 
     def cog_unload(self):
         self.update_cache.cancel()
+        sheet_ingest.unsubscribe(self._regenerate_leaderboards)
+        sheet_ingest.unsubscribe(self._sync_family_settings)
+        shutdown_render_pool()
+
+    async def cog_load(self):
+        sheet_ingest.subscribe(self._regenerate_leaderboards)
+        sheet_ingest.subscribe(self._sync_family_settings)
+
+    # ── CHANGE SET SUBSCRIBERS ────────────────────────────────────────────────
+
+    async def _regenerate_leaderboards(self, change_set, parsed_cache):
+        """Re-render only the leaderboard pages touched by this refresh."""
+        config = get_config()
+        pillow_conf = config["features"]["leaderboards"]["pillow_image_template"]["leaderboards"]
+        family_conf = config["family_settings"]
+        out_dir     = os.path.join("assets", "outputs", "leaderboards")
+        # use the first connected guild’s icon URL if available
+        guild   = next(iter(self.client.guilds), None)
+        fallback = guild.icon.url if guild and guild.icon else "assets/overlays/default_logo.png"
+
+        # pages are keyed by a hash of what they show, so only pages whose
+        # content actually changed get rendered (see leaderboard_utils)
+        leaderboards = parsed_cache["leaderboards"]
+        await regenerate_leaderboard_pages(
+            leaderboards["member_points"],
+            parsed_cache["parsed_members"],
+            leaderboards["families_pts_mem"],
+            parsed_cache["family_stats"],
+            pillow_conf,
+            family_conf,
+            out_dir,
+            fallback
+        )
+
+    def _sync_family_settings(self, change_set, parsed_cache):
+        """Families / leads in config.json only move when the roster or tracker does."""
+        if not (change_set.families_changed or change_set.roster_changed or change_set.full_rebuild):
+            return
+        updated_family_settings_in_config = cache_utils.sync_family_settings()
+        if updated_family_settings_in_config:
+            print(f"Updated Family Settings Config: {updated_family_settings_in_config}")
 
     @tasks.loop(minutes=5.0)
     async def update_cache(self):
-        config = get_config()
+        raw_member_data = psid_map = master_data_with_psid = None
+        parsed_family_stats_map = parsed_members_map = None
         try:
             # ── 1) FETCH RAW DATA ────────────────────────────────
-            family_stats_raw = await self._get_data(FAMILY_CELL_RANGE)  # "Family Tracker!B3:E9"
-            full_master_data = await self._get_data(MEMBER_CELL_RANGE)  # "Master Sheet!D1:DZ1000"
+            # one values.batchGet round trip for both ranges
+            family_stats_raw, full_master_data = await self._get_data(
+                FAMILY_CELL_RANGE,  # "Family Tracker!B3:E9"
+                MEMBER_CELL_RANGE,  # "Master Sheet!D1:DZ1000"
+            )
+
+            # Unchanged sheet -> nothing to parse, write, render or sync
+            fingerprint = cache_utils.sheet_fingerprint(family_stats_raw, full_master_data)
+            if fingerprint == cache_utils.get_sheet_fingerprint():
+                return
+            config = get_config()
+
             raw_member_data  = full_master_data[2:]
 
             #print("------------------\n\n")
@@ -116,6 +181,7 @@ class SheetsCacheUpdater(commands.Cog):
             }
             with open(RAW_CACHE_PATH, "w") as f:
                 json.dump(raw_cache, f, indent=2)
+            cache_utils.put_raw_cache(raw_cache)
 
             # ── 3) PARSE & STRUCTURE DATA ────────────────────────
             parsed_family_stats = stats_utils.parse_family_tracker_data(family_stats_raw)
@@ -127,8 +193,6 @@ class SheetsCacheUpdater(commands.Cog):
 
             old_parsed = self._parsed_cache_state or {}
             raw_old_events = old_parsed.get("events_info", {})
-            old_mem_psids  = old_parsed.get("leaderboards", {}).get("member_points", [])
-            old_fam_names  = old_parsed.get("leaderboards", {}).get("families_pts_mem", [])
 
 
             existing_events = []
@@ -179,37 +243,13 @@ class SheetsCacheUpdater(commands.Cog):
                     
             #print(parsed_events_map)
 
-            # c) Build parsed_members
-            parsed_members_list = []
-            for row in master_data_with_psid:
-                psid   = row[0].strip()
-                first  = row[1].strip() if len(row) > 1 else ""
-                last   = row[2].strip() if len(row) > 2 else ""
-                role   = row[3].strip() if len(row) > 3 else ""
-                family = row[4].strip() if len(row) > 4 else "No Family"
-                try:
-                    total_pts = int(row[5].strip())
-                except:
-                    total_pts = 0
-
-                raw_vals     = row[6:]
-                event_points = [
-                    int(raw_vals[i].strip()) if i < len(raw_vals) and raw_vals[i].strip().isdigit() else 0
-                    for i in range(len(valid_event_titles))
-                ]
-
-                parsed_members_list.append({
-                    "psid":         psid or "N/A",
-                    "first_name":   first or "N/A",
-                    "last_name":    last or "N/A",
-                    "role_key":     role or "N/A",
-                    "family_name":  family or "No Family",
-                    "points":       total_pts,
-                    "event_points": event_points
-                })
+            # c) Build parsed_members: only rows that changed since the last
+            #    refresh are re-parsed; the change set goes to subscribers below
+            parsed_members_map, change_set = self._ingestor.ingest(
+                master_data_with_psid, valid_event_titles, family_stats_raw
+            )
 
             parsed_family_stats_map = { fam["family"]: fam for fam in parsed_family_stats }
-            parsed_members_map      = { m["psid"]: m for m in parsed_members_list }
 
             # ── 4) PRE-COMPUTE LEADERBOARDS ───────────────────────
             member_leaderboard = sorted(
@@ -236,74 +276,71 @@ class SheetsCacheUpdater(commands.Cog):
                 "leaderboards": {
                     "member_points":    new_mem_psids,
                     "families_pts_mem": new_fam_names
-                }
+                },
+                # sorted orders + rank maps, so rank lookups never re-sort
+                "rankings": stats_utils.build_ranking_index(parsed_family_stats_map, parsed_members_map)
             }
             with open(PARSED_CACHE_PATH, "w") as f:
                 json.dump(parsed_cache, f, indent=2)
-                
+            # hand the fresh data to readers so they never re-parse the file,
+            # and build the members x events matrix for timeframe queries now
+            snapshot = cache_utils.put_parsed_cache(parsed_cache)
+            get_event_matrix(snapshot)
+
             # later, after writing parsed_cache:
             self._parsed_cache_state = parsed_cache
 
-            # ── 6) REGENERATE CHANGED PAGE IMAGES ─────────────────
-            pillow_conf = config["features"]["leaderboards"]["pillow_image_template"]["leaderboards"]
-            family_conf = config["family_settings"]
-            out_dir     = os.path.join("assets", "outputs", "leaderboards")
-            # use the first connected guild’s icon URL if available
-            guild   = next(iter(self.client.guilds), None)
-            fallback = guild.icon.url if guild and guild.icon else "assets/overlays/default_logo.png"
-
-
-            await regenerate_leaderboard_pages(
-                old_mem_psids,
-                new_mem_psids,
-                parsed_members_map,
-                old_fam_names,
-                new_fam_names,
-                parsed_family_stats_map,
-                pillow_conf,
-                family_conf,
-                out_dir,
-                fallback
-            )
-            
-            # ── 7) SYNC FAMILIES FROM GOOGLE SHEETS TO CONFIG.JSON ─────────────────
-            updated_family_settings_in_config = cache_utils.sync_family_settings()
-            if updated_family_settings_in_config:  
-                print(f"Updated Family Settings Config: {updated_family_settings_in_config}")
+            # ── 6) NOTIFY SUBSCRIBERS (leaderboard pages, family sync, ...) ─────
+            print(f"[update_cache] Sheet changed: {change_set.summary()}")
+            if not await sheet_ingest.publish(change_set, snapshot):
+                # retry next cycle as a full rebuild so nothing is missed
+                self._ingestor.reset()
+                return
+
+            # only now: a failed run above gets retried next cycle
+            cache_utils.record_sheet_fingerprint(fingerprint)
             
 
         except Exception as e:
             print(f"[{datetime.now()}] Failed to update spreadsheet cache: {e}")
             traceback.print_exc()
+            self._ingestor.reset()
             
         finally:
             del raw_member_data, psid_map, master_data_with_psid
-            del parsed_members_list, parsed_family_stats_map, parsed_members_map
-
-
-
-    async def _get_data(self, sheet_range: str):
-        """Return values for given range using gspread (non-blocking, thread offload)."""
-        try:
-            def fetch():
-                gc = get_gspread_client()
-                sh = gc.open_by_key(SPREADSHEET_ID)
-
-                # Split into sheet name + range if present
-                if "!" in sheet_range:
-                    sheet_name, cell_range = sheet_range.split("!", 1)
-                    ws = sh.worksheet(sheet_name.replace("'", "").strip())
-                    return ws.get(cell_range.strip())
-                else:
-                    # no explicit cell range, just return entire sheet
-                    ws = sh.worksheet(sheet_range.replace("'", "").strip())
-                    return ws.get_all_values()
-
-            return await asyncio.to_thread(fetch)
-
-        except Exception as e:
-            print(f"[get_data] Failed fetching {sheet_range}: {e}")
-            return []
+            del parsed_family_stats_map, parsed_members_map
+
+
+
+    def _get_spreadsheet(self):
+        """Authorize once and reuse the spreadsheet handle across cycles (runs in a worker thread)."""
+        if self._spreadsheet is None:
+            self._spreadsheet = get_gspread_client().open_by_key(SPREADSHEET_ID)
+        return self._spreadsheet
+
+    async def _get_data(self, *sheet_ranges: str):
+        """
+        Return a list of values (one list of rows per range) for the given
+        A1 ranges using a single batchGet (non-blocking, thread offload).
+        A bare sheet name returns the whole sheet. On failure every range
+        comes back as [].
+        """
+        def fetch():
+            resp = self._get_spreadsheet().values_batch_get(list(sheet_ranges))
+            value_ranges = resp.get("valueRanges", [])
+            return [vr.get("values", []) for vr in value_ranges]
+
+        for attempt in (1, 2):
+            try:
+                values = await asyncio.to_thread(fetch)
+                # pad in case the API dropped trailing empty ranges
+                return values + [[] for _ in sheet_ranges[len(values):]]
+            except Exception as e:
+                # drop the handle so the retry (or next cycle) re-authorizes
+                self._spreadsheet = None
+                if attempt == 2:
+                    print(f"[get_data] Failed fetching {', '.join(sheet_ranges)}: {e}")
+        return [[] for _ in sheet_ranges]
 
 async def setup(client):
     await client.add_cog(SheetsCacheUpdater(client))
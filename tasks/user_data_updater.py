@@ -1,15 +1,12 @@
 import discord
 from discord.ext import commands, tasks
 import json
-import asyncio
 import os
 from datetime import datetime
 
 from utils.nickname_and_roles import rename_user, assign_roles
-from utils.users_utils import get_verified_users, save_verified_users
+from utils.users_utils import get_verified_users, mark_verified_user_dirty
 
-import os
-import json
 from dotenv import load_dotenv
 
 CONFIG_FILE = "config.json"
@@ -17,19 +14,38 @@ CONFIG_FILE = "config.json"
 load_dotenv()
 guild_id = int(os.getenv("DISCORD_SERVER_GUILD_ID"))
 
+DEFAULT_RECONCILE_INTERVAL_SECONDS = 60 * 60
+
+
 class VerifiedUserDataUpdater(commands.Cog):
+    """
+    Keeps each verified user's discord_profile (nickname, roles, join date,
+    still_in_server) in sync with the server.
+
+    Driven by gateway events: on_member_update / on_member_join /
+    on_member_remove touch only that member's record. A low-frequency
+    reconcile pass (features.verified_user_data_updater.reconcile_interval_seconds,
+    falling back to the older update_time_intervals_seconds key, default 1h)
+    catches missed events, re-applies the nickname template and
+    restores roles for rejoins that weren't seen. A record is only marked
+    dirty when one of its fields actually changed.
+    """
     def __init__(self, bot):
         self.bot = bot
         self.config = None
         self.update_task = None
         self.load_config()
 
-        interval = self.config.get("features", {}) \
-            .get("verified_user_data_updater", {}) \
-            .get("update_time_intervals_seconds", 300)
+        feature_cfg = (self.config or {}).get("features", {}).get("verified_user_data_updater", {})
+        self.enabled = feature_cfg.get("enable_feature", False)
+        # update_time_intervals_seconds is the pre-event-driven key; still honoured
+        interval = feature_cfg.get(
+            "reconcile_interval_seconds",
+            feature_cfg.get("update_time_intervals_seconds", DEFAULT_RECONCILE_INTERVAL_SECONDS),
+        )
 
-        if self.config.get("features", {}).get("verified_user_data_updater", {}).get("enable_feature", False):
-            self.update_task = tasks.loop(seconds=interval)(self.update_verified_users)
+        if self.enabled:
+            self.update_task = tasks.loop(seconds=max(60, interval))(self.update_verified_users)
             self.update_task.start()
 
     def cog_unload(self):
@@ -49,7 +65,76 @@ class VerifiedUserDataUpdater(commands.Cog):
             print(f"[ERROR] Failed to load config: {e}")
             self.config = None
 
+    # ─── Record updates ───────────────────────────────────────
+    @staticmethod
+    def _apply_profile(user_id_str: str, user_info: dict, fields: dict) -> bool:
+        """Write the fields that differ into discord_profile; marks the record dirty only then."""
+        discord_profile = user_info.get("discord_profile")
+        if discord_profile is None:
+            discord_profile = user_info["discord_profile"] = {}
+
+        changed = {}
+        for key, value in fields.items():
+            current = discord_profile.get(key)
+            if key == "roles" and current is not None and set(current) == set(value):
+                continue  # same roles, possibly reordered by position
+            if current != value:
+                changed[key] = value
+        if not changed:
+            return False
+
+        discord_profile.update(changed)
+        discord_profile["last_updated"] = datetime.utcnow().isoformat()
+        mark_verified_user_dirty(user_id_str)
+        return True
+
+    @staticmethod
+    def _member_fields(member: discord.Member, discord_profile: dict) -> dict:
+        fields = {
+            "nickname": member.nick or member.name,
+            "roles": [str(role.id) for role in member.roles if not role.is_default()],
+            "still_in_server": True,
+        }
+        # keep the original join date; only fill it in when it's missing
+        if not discord_profile.get("first_time_joined") and member.joined_at:
+            fields["first_time_joined"] = member.joined_at.isoformat()
+        return fields
+
+    def _verified_record(self, member: discord.Member):
+        if not self.enabled or member.guild.id != guild_id:
+            return None, None
+        user_id_str = str(member.id)
+        return user_id_str, get_verified_users().get(user_id_str)
+
+    # ─── Gateway events ───────────────────────────────────────
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        # Fires for every profile change; only nickname / role changes reach the DB
+        if before.nick == after.nick and before.roles == after.roles:
+            return
+        user_id_str, user_info = self._verified_record(after)
+        if user_info is None:
+            return
+        self._apply_profile(user_id_str, user_info, self._member_fields(after, user_info.get("discord_profile", {})))
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        # Nickname / saved roles are restored by the rejoin handler in
+        # general_logs; the resulting on_member_update events record them.
+        # Roles aren't written here so that handler still sees the saved ones.
+        user_id_str, user_info = self._verified_record(member)
+        if user_info is None:
+            return
+        self._apply_profile(user_id_str, user_info, {"still_in_server": True})
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        user_id_str, user_info = self._verified_record(member)
+        if user_info is None:
+            return
+        self._apply_profile(user_id_str, user_info, {"still_in_server": False})
 
+    # ─── Reconcile pass ───────────────────────────────────────
     async def update_verified_users(self):
         await self.bot.wait_until_ready()
         self.load_config()
@@ -60,69 +145,40 @@ class VerifiedUserDataUpdater(commands.Cog):
         if not feature_cfg.get("enable_feature", False):
             return
 
-
         guild = self.bot.get_guild(guild_id)
         if guild is None:
             print(f"[ERROR] Bot is not in guild with ID {guild_id}")
             return
 
+        restore_roles = feature_cfg.get("restore_roles_on_rejoin", True)
 
-        # Use helper to load only verified users
+        # Snapshot: the awaits below let events change the dict meanwhile
         verified_data = get_verified_users()
-        now_iso = datetime.utcnow().isoformat()
-        updated = False
-
-        for user_id_str, user_info in verified_data.items():
+        for user_id_str, user_info in list(verified_data.items()):
             try:
                 user_id = int(user_id_str)
             except ValueError:
                 continue
 
             member = guild.get_member(user_id)
-            still_in_server = member is not None
             discord_profile = user_info.get("discord_profile", {})
 
-            if still_in_server:
-                # Gather extra data for renaming
-                points = user_info.get("points", 0)
-                first_name = user_info.get("first_name", "")
-                last_name = user_info.get("last_name", "")
-
-                # Rename the user using helper with all required args
-                await rename_user(member, user_id_str, points, first_name, last_name)
-                  
-                # Assign roles if restoring is enabled
-                restore_roles = feature_cfg.get("restore_roles_on_rejoin", True)
-                if restore_roles:
-                    role_ids = discord_profile.get("roles", [])
-                    # <-- pass the Member object, not the int ID
-                    await assign_roles(member, role_ids)
-
-                # Update info
-                discord_profile.update({
-                    "nickname": member.nick or member.name,
-                    "roles": [str(role.id) for role in member.roles if role.id != guild.id],
-                    "first_time_joined": member.joined_at.isoformat() if member.joined_at else None,
-                    "last_updated": now_iso,
-                    "still_in_server": True
-                })
-
-            else:
-                discord_profile.update({
-                    "still_in_server": False,
-                    "last_updated": now_iso
-                })
-
-            user_info["discord_profile"] = discord_profile
-            verified_data[user_id_str] = user_info
-            updated = True
-
-        if updated:
-            try:
-                save_verified_users(verified_data)
-                #print("[INFO] Verified user data updated and saved.")
-            except Exception as e:
-                print(f"[ERROR] Could not save verified user data: {e}")
+            if member is None:
+                self._apply_profile(user_id_str, user_info, {"still_in_server": False})
+                continue
+
+            # Queued on the nickname sync service; skipped if it already matches
+            points = user_info.get("points", 0)
+            first_name = user_info.get("first_name", "")
+            last_name = user_info.get("last_name", "")
+            await rename_user(member, user_id_str, points, first_name, last_name)
+
+            # A rejoin we missed: put the saved roles back (no-op if nothing drifted)
+            if restore_roles and discord_profile.get("still_in_server") is False:
+                await assign_roles(member, discord_profile.get("roles", []))
+
+            self._apply_profile(user_id_str, user_info, self._member_fields(member, discord_profile))
+
 
 async def setup(bot):
     await bot.add_cog(VerifiedUserDataUpdater(bot))
@@ -0,0 +1,45 @@
+import json
+import os
+from datetime import datetime
+
+from discord.ext import commands, tasks
+
+from utils.user_store import user_store
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+
+with open(CONFIG_PATH, 'r') as f:
+    CONFIG = json.load(f)
+
+DEFAULT_FLUSH_INTERVAL_SECONDS = 30
+
+
+class UserStoreFlusher(commands.Cog):
+    """Writes dirty user DB records to disk in batches."""
+    def __init__(self, bot):
+        self.bot = bot
+
+        feature_conf = CONFIG.get("features", {}).get("user_store", {})
+        interval = max(5, feature_conf.get("flush_interval_seconds", DEFAULT_FLUSH_INTERVAL_SECONDS))
+        self.flush_loop.change_interval(seconds=interval)
+        self.flush_loop.start()
+
+    def cog_unload(self):
+        # Runs on bot.close() as well, so this doubles as the shutdown flush.
+        if self.flush_loop.is_running():
+            self.flush_loop.cancel()
+        try:
+            user_store.flush()
+        except Exception as e:
+            print(f"[UserStore] Failed to flush user database on unload: {e}")
+
+    @tasks.loop(seconds=DEFAULT_FLUSH_INTERVAL_SECONDS)
+    async def flush_loop(self):
+        try:
+            await user_store.flush_async()
+        except Exception as e:
+            print(f"[{datetime.now()}] [UserStore] Failed to flush user database: {e}")
+
+
+async def setup(bot):
+    await bot.add_cog(UserStoreFlusher(bot))
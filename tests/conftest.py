@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the bot runs from the repo root; make its packages importable from tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,126 @@
+import asyncio
+import importlib
+import json
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+discord = pytest.importorskip("discord")
+
+
+CONFIG = {
+    "general": {"family_name": "VSA", "bot_prefix": "!", "embed_color": "#ffffff"},
+    "embed_templates": {"join_dm_message": {}},
+    "role_ids": {"unverified_vsa_member": "1"},
+    "text_channel_ids": {"welcome": "2", "bot_logs": "3", "verification": "4"},
+}
+
+
+class FakeRole:
+    def __init__(self, role_id, default=False):
+        self.id = role_id
+        self._default = default
+
+    def is_default(self):
+        return self._default
+
+
+class FakeGuild:
+    def __init__(self, roles):
+        self._roles = {r.id: r for r in roles}
+        self.default_role = next(r for r in roles if r.is_default())
+
+    def get_role(self, role_id):
+        return self._roles.get(role_id)
+
+
+class FakeMember:
+    def __init__(self, member_id, roles, guild):
+        self.id = member_id
+        self.roles = roles
+        self.guild = guild
+        self.display_name = "old nick"
+        self.mention = f"<@{member_id}>"
+
+    def __str__(self):
+        return "member#0001"
+
+
+class FakeChannel:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, embed=None, **kwargs):
+        self.sent.append(embed)
+
+
+class FakeClient:
+    def __init__(self, channel):
+        self.channel = channel
+
+    def get_channel(self, channel_id):
+        return self.channel
+
+
+@pytest.fixture
+def general_logs(tmp_path, monkeypatch):
+    (tmp_path / "config.json").write_text(json.dumps(CONFIG))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(Path(__file__).resolve().parents[1]))
+
+    # Keep the Pillow/user-store modules out of the import; the rejoin
+    # branch only touches the names patched onto the listener below.
+    stubs = {
+        "utils.pillow": {"create_welcome_image": None},
+        "utils.users_utils": {
+            "get_verified_users": None,
+            "mark_verified_user_dirty": None,
+            "get_unverified_users": None,
+            "mark_unverified_user_dirty": None,
+        },
+        "utils.nickname_and_roles": {"rename_user": None, "reconcile_roles": None},
+    }
+    for name, attrs in stubs.items():
+        monkeypatch.setitem(sys.modules, name, types.SimpleNamespace(**attrs))
+    monkeypatch.delitem(sys.modules, "listeners.general_logs", raising=False)
+    return importlib.import_module("listeners.general_logs")
+
+
+def test_rejoin_restores_roles_and_logs_embed(general_logs, monkeypatch):
+    everyone, kept, extra, saved = FakeRole(10, default=True), FakeRole(11), FakeRole(12), FakeRole(13)
+    guild = FakeGuild([everyone, kept, extra, saved])
+    member = FakeMember(42, [everyone, kept, extra], guild)
+
+    verified = {
+        "42": {
+            "discord_profile": {"roles": ["11", "13"], "first_time_joined": "2024-01-01T00:00:00Z"},
+            "general": {"first_name": "Ada", "last_name": "L"},
+        }
+    }
+    reconciled = []
+
+    async def fake_rename(*args):
+        return "Ada L"
+
+    async def fake_reconcile(m, role_ids, **kwargs):
+        reconciled.append(list(role_ids))
+        # Mirror discord.py: the restore changes the member's roles
+        m.roles = [everyone, kept, saved]
+
+    monkeypatch.setattr(general_logs, "get_verified_users", lambda: verified)
+    monkeypatch.setattr(general_logs, "rename_user", fake_rename)
+    monkeypatch.setattr(general_logs, "reconcile_roles", fake_reconcile)
+
+    channel = FakeChannel()
+    cog = general_logs.joinleave(FakeClient(channel))
+    asyncio.run(cog.on_member_join(member))
+
+    assert reconciled == [["11", "13"]]
+    assert len(channel.sent) == 1
+    fields = {f.name: f.value for f in channel.sent[0].fields}
+    old, new = fields["Roles"].split(" → ")
+    assert set(old.split(", ")) == {"<@&11>", "<@&12>"}
+    assert set(new.split(", ")) == {"<@&11>", "<@&13>"}
+    assert fields["Nickname"] == "old nick → Ada L"
@@ -0,0 +1,36 @@
+import pytest
+from PIL import Image
+
+from utils import http_client
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(http_client, "MAX_CACHED_IMAGE_BYTES", 3 * 10 * 10 * 4)
+    http_client.clear()
+    yield
+    http_client.clear()
+
+
+def rgba(size):
+    return Image.new("RGBA", (size, size))
+
+
+def test_image_cache_is_bounded_by_decoded_bytes():
+    for url in ("a", "b", "c", "d"):
+        http_client._store_image(url, rgba(10))
+
+    assert list(http_client._images) == ["b", "c", "d"]
+    assert http_client._images_total == 3 * 400
+
+
+def test_replacing_an_image_updates_the_running_total():
+    http_client._store_image("a", rgba(10))
+    http_client._store_image("a", rgba(5))
+    assert http_client._images_total == 5 * 5 * 4
+
+
+def test_image_larger_than_the_cache_is_not_stored():
+    http_client._store_image("big", rgba(20))
+    assert "big" not in http_client._images
+    assert http_client._images_total == 0
@@ -0,0 +1,34 @@
+import asyncio
+import os
+
+import pytest
+
+from utils import leaderboard_utils
+
+
+def test_stale_member_pages_are_removed_even_if_the_family_page_fails(tmp_path, monkeypatch):
+    out_dir = tmp_path / "leaderboards"
+    out_dir.mkdir()
+    for page in (1, 2, 3):
+        (out_dir / f"member_points_page_{page}.png").write_bytes(b"old")
+
+    async def fake_member_page(page_members, pillow_conf, family_conf, start, total_pages, out_path):
+        with open(out_path, "wb") as f:
+            f.write(b"new")
+
+    async def failing_family_page(*args, **kwargs):
+        raise RuntimeError("logo server down")
+
+    monkeypatch.setattr(leaderboard_utils, "_render_member_page", fake_member_page)
+    monkeypatch.setattr(leaderboard_utils, "generate_family_leaderboard_image", failing_family_page)
+
+    psids = [str(i) for i in range(leaderboard_utils.MEMBERS_PER_PAGE + 1)]  # two pages now
+    members = {psid: {"psid": psid, "first_name": psid, "points": 1} for psid in psids}
+    with pytest.raises(RuntimeError, match="logo server down"):
+        asyncio.run(leaderboard_utils.regenerate_leaderboard_pages(
+            psids, members, [], {}, {}, {}, str(out_dir)))
+
+    assert sorted(n for n in os.listdir(out_dir) if n.endswith(".png")) == [
+        "member_points_page_1.png",
+        "member_points_page_2.png",
+    ]
@@ -0,0 +1,137 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+discord = pytest.importorskip("discord")
+
+from utils import nickname_sync
+from utils.nickname_sync import NicknameSyncService
+
+
+class FakeGuild:
+    def __init__(self):
+        self.id = 1
+        self.members = {}
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+
+class FakeMember:
+    def __init__(self, guild, member_id, nick=None, forbidden=False):
+        self.guild = guild
+        self.id = member_id
+        self.name = f"user{member_id}"
+        self.nick = nick
+        self.forbidden = forbidden
+        self.edits = []
+        guild.members[member_id] = self
+
+    async def edit(self, nick=None, reason=None):
+        self.edits.append(nick)
+        if self.forbidden:
+            raise discord.Forbidden(SimpleNamespace(status=403, reason="Forbidden"), "Missing Permissions")
+        self.nick = nick
+
+
+async def settle(service):
+    for _ in range(50):
+        if not service.queue_depth:
+            break
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)  # let the last edit finish
+    await service.stop()
+
+
+def run(coro_fn):
+    async def main():
+        service = NicknameSyncService(min_interval=0)
+        await coro_fn(service)
+        await settle(service)
+        return service
+    return asyncio.run(main())
+
+
+def test_pending_request_is_replaced_not_queued_twice():
+    member = FakeMember(FakeGuild(), 7)
+
+    async def scenario(service):
+        assert service.request(member, "First")
+        assert service.request(member, "Second")
+        assert service.queue_depth == 1
+
+    service = run(scenario)
+    assert member.edits == ["Second"]
+    assert service.coalesced == 1
+    assert service.applied == 1
+
+
+def test_matching_nickname_is_skipped_and_drops_a_stale_pending_edit():
+    member = FakeMember(FakeGuild(), 7, nick="Same")
+
+    async def scenario(service):
+        assert service.request(member, "Same") is False
+        assert service.request(member, "Other")
+        assert service.request(member, "Same") is False  # back to current: nothing to send
+        assert service.queue_depth == 0
+
+    service = run(scenario)
+    assert member.edits == []
+    assert service.skipped == 2
+
+
+def test_refused_nickname_is_not_retried_until_a_different_one_is_wanted():
+    member = FakeMember(FakeGuild(), 7, forbidden=True)
+
+    async def scenario(service):
+        service.request(member, "Nope")
+        await settle(service)
+        assert service._forbidden == {(1, 7): "Nope"}
+
+        assert service.request(member, "Nope") is False
+        assert service.request(member, "Else")  # different nickname: memo dropped
+        assert (1, 7) not in service._forbidden
+
+    service = run(scenario)
+    assert member.edits == ["Nope", "Else"]
+
+
+def test_forbidden_memo_is_lru_bounded(monkeypatch):
+    monkeypatch.setattr(nickname_sync, "MAX_FORBIDDEN_ENTRIES", 2)
+    guild = FakeGuild()
+    members = [FakeMember(guild, i, forbidden=True) for i in range(3)]
+
+    async def scenario(service):
+        for member in members:
+            service.request(member, "Nope")
+
+    service = run(scenario)
+    assert list(service._forbidden) == [(1, 1), (1, 2)]
+
+
+def test_edits_are_paced_by_min_interval(monkeypatch):
+    clock = [100.0]
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay):
+        if delay:
+            sleeps.append(delay)
+            clock[0] += delay
+        await real_sleep(0)
+
+    monkeypatch.setattr(nickname_sync.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    guild = FakeGuild()
+    members = [FakeMember(guild, i) for i in range(3)]
+
+    async def main():
+        service = NicknameSyncService(min_interval=2.0)
+        for member in members:
+            service.request(member, "Paced")
+        await settle(service)
+
+    asyncio.run(main())
+    assert [m.nick for m in members] == ["Paced"] * 3
+    assert sleeps == [2.0, 2.0]
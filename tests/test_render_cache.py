@@ -0,0 +1,51 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from utils.render_cache import RenderCache, render_key_digest
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RenderCache(str(tmp_path / "cache"), max_memory_bytes=1024, max_disk_bytes=250, ext=".img")
+
+
+def test_disk_tier_round_trip_and_memory_promotion(cache):
+    asyncio.run(cache.put("a", b"x" * 100))
+    cache.clear()  # memory only: the next get must come from disk
+    assert asyncio.run(cache.get("a")) == b"x" * 100
+    assert cache._memory_get(render_key_digest("a")) == b"x" * 100
+    assert asyncio.run(cache.get("missing")) is None
+
+
+def test_disk_evicts_least_recently_used_with_a_running_total(cache, monkeypatch):
+    for key in ("a", "b"):
+        asyncio.run(cache.put(key, b"x" * 100))
+    asyncio.run(cache.get("a"))  # memory hit; disk order still a, b
+
+    cache.clear()
+    asyncio.run(cache.get("a"))  # disk hit: a becomes most recently used
+
+    # no rescans once the index is built
+    monkeypatch.setattr(os, "scandir", lambda *_: pytest.fail("rescanned cache dir"))
+    asyncio.run(cache.put("c", b"x" * 100))
+
+    names = {Path(p).stem for p in os.listdir(cache.disk_dir)}
+    assert names == {render_key_digest("a"), render_key_digest("c")}
+    assert cache._disk_total == 200
+
+
+def test_existing_files_are_indexed_on_first_access(tmp_path):
+    disk_dir = tmp_path / "cache"
+    disk_dir.mkdir()
+    old = disk_dir / (render_key_digest("old") + ".img")
+    old.write_bytes(b"y" * 200)
+    os.utime(old, (1, 1))
+
+    cache = RenderCache(str(disk_dir), max_memory_bytes=1024, max_disk_bytes=250, ext=".img")
+    asyncio.run(cache.put("new", b"x" * 100))
+
+    assert not old.exists()
+    assert cache._disk_total == 100
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils.render_scheduler import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, RenderScheduler
+
+
+async def until(predicate):
+    for _ in range(500):
+        if predicate():
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError("condition never became true")
+
+
+def blocking_job():
+    """A render that runs until release.set() is called."""
+    release = threading.Event()
+    return release, lambda: release.wait(5)
+
+
+def test_waiting_renders_start_in_priority_order():
+    async def main():
+        scheduler = RenderScheduler(1)
+        release, blocker = blocking_job()
+        order = []
+
+        running = asyncio.ensure_future(scheduler.submit(blocker))
+        await until(lambda: scheduler.running == 1)
+        background = asyncio.ensure_future(
+            scheduler.submit(order.append, "background", priority=PRIORITY_BACKGROUND))
+        interactive = asyncio.ensure_future(
+            scheduler.submit(order.append, "interactive", priority=PRIORITY_INTERACTIVE))
+        await until(lambda: scheduler.queue_depth == 2)
+
+        release.set()
+        await asyncio.gather(running, background, interactive)
+        return order
+
+    assert asyncio.run(main()) == ["interactive", "background"]
+
+
+def test_concurrency_is_capped():
+    async def main():
+        scheduler = RenderScheduler(2)
+        lock = threading.Lock()
+        active, peak = [0], [0]
+        release = threading.Event()
+
+        def job():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            release.wait(5)
+            with lock:
+                active[0] -= 1
+
+        jobs = [asyncio.ensure_future(scheduler.submit(job)) for _ in range(5)]
+        await until(lambda: scheduler.running == 2 and scheduler.queue_depth == 3)
+        release.set()
+        await asyncio.gather(*jobs)
+        return scheduler, peak[0]
+
+    scheduler, peak = asyncio.run(main())
+    assert peak == 2
+    assert scheduler.completed == 5
+    assert scheduler.running == 0
+
+
+def test_same_key_shares_one_render():
+    calls = []
+
+    def render():
+        calls.append(1)
+        return b"card"
+
+    async def main():
+        scheduler = RenderScheduler(1)
+        release, blocker = blocking_job()
+        first = asyncio.ensure_future(scheduler.submit(blocker))
+        await until(lambda: scheduler.running == 1)
+        shared = [asyncio.ensure_future(scheduler.submit(render, key="card")) for _ in range(3)]
+        await until(lambda: scheduler.coalesced == 2)
+        release.set()
+        await first
+        return scheduler, await asyncio.gather(*shared)
+
+    scheduler, results = asyncio.run(main())
+    assert results == [b"card"] * 3
+    assert calls == [1]
+    assert scheduler.coalesced == 2
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    ran = []
+
+    async def main():
+        scheduler = RenderScheduler(1)
+        release, blocker = blocking_job()
+        running = asyncio.ensure_future(scheduler.submit(blocker))
+        await until(lambda: scheduler.running == 1)
+
+        waiter = asyncio.ensure_future(scheduler.submit(ran.append, "cancelled"))
+        await until(lambda: scheduler.queue_depth == 1)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert scheduler.queue_depth == 0
+
+        release.set()
+        await running
+        await scheduler.submit(ran.append, "after")
+        return scheduler
+
+    scheduler = asyncio.run(main())
+    assert ran == ["after"]
+    assert scheduler.running == 0
+
+
+def test_coroutine_jobs_are_rejected():
+    async def fetch_and_render():
+        pass
+
+    async def main():
+        with pytest.raises(TypeError):
+            await RenderScheduler(1).submit(fetch_and_render)
+
+    asyncio.run(main())
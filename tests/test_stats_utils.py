@@ -0,0 +1,49 @@
+import importlib
+import json
+import sys
+import types
+
+import pytest
+
+
+PARSED = {
+    "parsed_members": {
+        "1": {"psid": "1", "first_name": "An", "last_name": "Le", "points": 10, "events": 4},
+        "2": {"psid": "2", "first_name": "Bao", "last_name": "Vu", "points": 30, "events": 1},
+        "3": {"psid": "3", "first_name": "Chi", "last_name": "Do", "points": 20, "events": 9},
+    },
+    "family_stats": {},
+}
+
+
+@pytest.fixture
+def stats_utils(tmp_path, monkeypatch):
+    (tmp_path / "config.json").write_text(json.dumps({
+        "file_paths": {
+            "parsed_vsa_member_data_and_events_info_file": "parsed.json",
+        },
+    }))
+    monkeypatch.chdir(tmp_path)
+    # the parsed cache and user store are served from memory for these tests
+    stubs = {
+        "utils.cache_utils": types.SimpleNamespace(load_parsed_cache=lambda: PARSED),
+        "utils.psid_index": types.SimpleNamespace(get_verified_record_by_psid=None),
+        "utils.event_matrix": types.SimpleNamespace(get_event_matrix=None),
+    }
+    for name, module in stubs.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.setattr(importlib.import_module("utils"), "cache_utils", stubs["utils.cache_utils"], raising=False)
+    monkeypatch.delitem(sys.modules, "utils.stats_utils", raising=False)
+    return importlib.import_module("utils.stats_utils")
+
+
+def test_indexed_member_rank(stats_utils):
+    assert stats_utils.get_member_rank(None, "chi", "DO") == 2
+    assert stats_utils.get_member_rank_by_psid(2) == 1
+
+
+def test_unindexed_sort_key_falls_back_to_sorting(stats_utils):
+    assert stats_utils.get_member_rank(None, "Chi", "Do", sort_key="events") == 1
+    assert stats_utils.get_member_rank(None, "Bao", "Vu", sort_key="events") == 3
+    assert stats_utils.get_member_rank_by_psid("1", sort_key="events") == 2
+    assert stats_utils.get_member_rank_by_psid("404", sort_key="events") is None
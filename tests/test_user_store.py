@@ -0,0 +1,97 @@
+import asyncio
+import importlib
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+
+class RecordingBackend:
+    """Per-record backend (like SQLite): a payload holds only the ids it was given."""
+    name = "fake"
+
+    def __init__(self, data=None):
+        self.data = data or {"verified_users": {}, "unverified_users": {}}
+        self.commits = []
+        self.gate = None  # threading.Event that commit() waits on, when set
+
+    def load_all(self):
+        return json.loads(json.dumps(self.data))
+
+    def prepare(self, data, dirty):
+        return {section: {uid: dict(data[section][uid]) for uid in ids} for section, ids in dirty.items() if ids}
+
+    def commit(self, payload):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.commits.append(payload)
+
+
+@pytest.fixture
+def user_store_module(tmp_path, monkeypatch):
+    config = {"file_paths": {"all_discord_user_member_database_json_path": str(tmp_path / "users.json")}}
+    (tmp_path / "config.json").write_text(json.dumps(config))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(Path(__file__).resolve().parents[1]))
+    monkeypatch.delitem(sys.modules, "utils.user_store", raising=False)
+    return importlib.import_module("utils.user_store")
+
+
+@pytest.fixture
+def store(user_store_module):
+    backend = RecordingBackend({"verified_users": {"1": {"xp": 0}, "2": {"xp": 0}}, "unverified_users": {}})
+    return user_store_module.UserStore(backend)
+
+
+def test_older_payload_is_skipped_once_a_newer_one_landed(store):
+    store.section("verified_users")["1"]["xp"] = 5
+    store.mark_dirty("verified_users", "1")
+    seq1, _, payload1 = store._prepare()
+
+    store.section("verified_users")["2"]["xp"] = 7
+    store.mark_dirty("verified_users", "2")
+    assert store.flush() == 1
+
+    # the newer payload covered the record still in flight
+    assert store.backend.commits == [{"verified_users": {"1": {"xp": 5}, "2": {"xp": 7}}}]
+    assert store._commit(seq1, payload1) is False
+    assert len(store.backend.commits) == 1
+
+
+def test_flush_takes_over_a_cancelled_async_flush(store):
+    store.backend.gate = threading.Event()
+    store.section("verified_users")["1"]["xp"] = 3
+    store.mark_dirty("verified_users", "1")
+
+    async def cancel_mid_commit_then_flush():
+        task = asyncio.ensure_future(store.flush_async())
+        await asyncio.sleep(0.05)  # commit thread is now blocked on the gate
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert not store.is_dirty
+
+        # nothing is dirty, but the in-flight record still has to be written;
+        # flush() waits on the commit lock behind the stuck thread
+        store.section("verified_users")["1"]["xp"] = 4
+        threading.Timer(0.05, store.backend.gate.set).start()
+        store.flush()
+
+    asyncio.run(cancel_mid_commit_then_flush())
+    assert store.backend.commits[-1] == {"verified_users": {"1": {"xp": 4}}}
+    assert store._in_flight == {}
+
+
+def test_failed_commit_restores_dirty_records(store):
+    def boom(payload):
+        raise OSError("disk full")
+
+    store.backend.commit = boom
+    store.section("verified_users")
+    store.mark_dirty("verified_users", "2")
+    with pytest.raises(OSError):
+        store.flush()
+    assert store._dirty["verified_users"] == {"2"}
+    assert store._in_flight == {}
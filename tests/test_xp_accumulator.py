@@ -0,0 +1,58 @@
+from utils.xp_accumulator import (
+    AWARD_COOLDOWN_SECONDS,
+    IDLE_EVICT_SECONDS,
+    SPAM_WINDOW_SECONDS,
+    XPAccumulator,
+)
+
+
+def test_sixth_message_inside_the_window_is_spam():
+    acc = XPAccumulator()
+    assert all(acc.record_message("u", t) for t in range(5))
+    assert acc.record_message("u", 5) is False
+    assert acc.recent_messages("u", 5) == 6
+    assert acc.take("u")[0] == 5  # the spam message isn't counted
+
+
+def test_old_messages_age_out_of_the_window():
+    acc = XPAccumulator()
+    for t in range(5):
+        acc.record_message("u", t)
+    # the first message is now SPAM_WINDOW_SECONDS old
+    assert acc.record_message("u", SPAM_WINDOW_SECONDS) is True
+    assert acc.recent_messages("u", SPAM_WINDOW_SECONDS) == 5
+
+
+def test_award_cooldown():
+    acc = XPAccumulator()
+    assert acc.award("u", 100.0, 2.5, 1)
+    assert not acc.award("u", 100.0 + AWARD_COOLDOWN_SECONDS - 0.1, 2.5, 1)
+    assert acc.award("u", 100.0 + AWARD_COOLDOWN_SECONDS, 2.5, 1)
+    assert acc.pending_exp("u") == 5.0
+
+
+def test_take_and_drain_reset_pending_deltas():
+    acc = XPAccumulator()
+    acc.record_message("a", 0)
+    acc.award("a", 0, 3.0, 2)
+    acc.record_message("b", 0)
+
+    assert acc.take("a") == (1, 3.0, 2)
+    assert acc.take("a") == (0, 0.0, 0)
+    assert acc.take("missing") == (0, 0, 0)
+
+    acc.award("a", 10, 1.0, 1)
+    assert acc.drain() == {"a": (0, 1.0, 1), "b": (1, 0.0, 0)}
+    assert acc.drain() == {}
+
+
+def test_evict_idle_keeps_users_with_pending_deltas():
+    acc = XPAccumulator()
+    acc.record_message("idle", 0)
+    acc.take("idle")
+    acc.record_message("pending", 0)
+    acc.record_message("active", IDLE_EVICT_SECONDS)
+
+    assert acc.evict_idle(IDLE_EVICT_SECONDS + 1) == 1
+    assert len(acc) == 2
+    assert acc.recent_messages("idle", 0) == 0
@@ -0,0 +1,117 @@
+"""
+asset_cache.py
+
+Process-wide cache of Pillow assets shared by every renderer
+(image_generator.py, pillow.py, profile_utils.py):
+
+ - fonts:  LRU of ImageFont.truetype(path, size), keyed by (path, size)
+ - images: LRU of decoded, RGBA-converted backgrounds / overlays, optionally
+           with their alpha pre-scaled (e.g. overlays drawn at 65% opacity)
+ - layers: pre-composited template layers (background + overlay + static
+           headers / footer chrome) baked once per config/asset version
+
+Entries remember the file's mtime/size and are re-read when it changes, so
+swapping an asset on disk takes effect on the next render without a restart.
+Images are handed out as copies; fonts are shared (they are never mutated).
+Each render worker process keeps its own cache.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageFont
+
+FONT_CACHE_SIZE = 64
+IMAGE_CACHE_SIZE = 32
+LAYER_CACHE_SIZE = 16
+
+_fonts: "OrderedDict[tuple, tuple]" = OrderedDict()
+_images: "OrderedDict[tuple, tuple]" = OrderedDict()
+_layers: "OrderedDict[tuple, tuple]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _file_version(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _lookup(cache: OrderedDict, key, version):
+    with _lock:
+        entry = cache.get(key)
+        if entry is not None and entry[0] == version:
+            cache.move_to_end(key)
+            return entry[1]
+    return None
+
+
+def _store(cache: OrderedDict, key, version, value, max_size: int):
+    with _lock:
+        cache[key] = (version, value)
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+
+
+def get_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """Cached ImageFont.truetype(path, size)."""
+    if not path:
+        return ImageFont.truetype(path, size)  # same error as before for a missing font
+    key = (os.path.abspath(path), size)
+    version = _file_version(key[0])
+    font = _lookup(_fonts, key, version)
+    if font is None:
+        font = ImageFont.truetype(path, size)
+        _store(_fonts, key, version, font, FONT_CACHE_SIZE)
+    return font
+
+
+def load_image(path: str, opacity: float | None = None, size: tuple[int, int] | None = None) -> Image.Image:
+    """
+    Return a fresh RGBA copy of the image at `path`, decoding it only the
+    first time (or after the file changes). `size` resizes it first; with
+    `opacity`, the alpha channel is then scaled by that factor, as the
+    overlays do.
+    """
+    key = (os.path.abspath(path), opacity, size)
+    version = _file_version(key[0])
+    img = _lookup(_images, key, version)
+    if img is None:
+        with Image.open(path) as src:
+            img = src.convert("RGBA")
+        if size is not None:
+            img = img.resize(size)
+        if opacity is not None:
+            img.putalpha(img.split()[3].point(lambda p: int(p * opacity)))
+        _store(_images, key, version, img, IMAGE_CACHE_SIZE)
+    return img.copy()
+
+
+def get_layer(key: tuple, build, deps=()) -> Image.Image:
+    """
+    Return a copy of a baked template layer. `build()` renders it the first
+    time; `key` must cover every config value it reads, and `deps` lists the
+    asset files it was built from, so editing one of them re-bakes the layer.
+    """
+    version = asset_versions(*deps)
+    layer = _lookup(_layers, key, version)
+    if layer is None:
+        layer = build()
+        _store(_layers, key, version, layer, LAYER_CACHE_SIZE)
+    return layer.copy()
+
+
+def asset_versions(*paths) -> tuple:
+    """(mtime, size) of each asset file, for keying caches of rendered output."""
+    return tuple(_file_version(os.path.abspath(p)) if p else None for p in paths)
+
+
+def clear():
+    """Drop every cached font, image and template layer."""
+    with _lock:
+        _fonts.clear()
+        _images.clear()
+        _layers.clear()
@@ -1,7 +1,11 @@
 import os
 import json
+import hashlib
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from utils.json_cache import load_json_snapshot, put_json_snapshot
 
 # === CONFIG & CACHE PATHS ===
 BASE_DIR   = os.path.dirname(__file__)
@@ -18,19 +22,50 @@ RAW_CACHE_PATH    = os.path.join(ROOT_DIR, _CFG_TEMPLATE['file_paths']['vsa_goog
 PARSED_CACHE_PATH = os.path.join(ROOT_DIR, _CFG_TEMPLATE['file_paths'][PARSED_KEY])
 
 # --- Cache Loaders ---
+# Both return read-only snapshots (see utils/json_cache.py); the file is only
+# re-parsed when its mtime/size changes.
 def load_raw_cache() -> dict:
     """Return raw spreadsheet JSON (or empty dict on failure)."""
-    try:
-        return json.loads(Path(RAW_CACHE_PATH).read_text())
-    except Exception:
-        return {}
+    return load_json_snapshot(RAW_CACHE_PATH)
 
 def load_parsed_cache() -> dict:
     """Return parsed spreadsheet JSON (or empty dict on failure)."""
-    try:
-        return json.loads(Path(PARSED_CACHE_PATH).read_text())
-    except Exception:
-        return {}
+    return load_json_snapshot(PARSED_CACHE_PATH)
+
+# --- Cache Writers' hooks ---
+def put_raw_cache(raw_cache: dict) -> dict:
+    """Seed the snapshot cache right after the raw cache file was written."""
+    return put_json_snapshot(RAW_CACHE_PATH, raw_cache)
+
+def put_parsed_cache(parsed_cache: dict) -> dict:
+    """Seed the snapshot cache right after the parsed cache file was written."""
+    return put_json_snapshot(PARSED_CACHE_PATH, parsed_cache)
+
+# --- Sheet change tracking ---
+# SheetsCacheUpdater fingerprints every fetch; other cogs can compare
+# get_sheet_last_changed() against their own last run to skip work.
+_sheet_state = {"fingerprint": None, "last_changed": None}
+
+def sheet_fingerprint(*ranges) -> str:
+    """Stable hash of fetched sheet ranges (lists of rows)."""
+    payload = json.dumps(ranges, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get_sheet_fingerprint() -> Optional[str]:
+    """Fingerprint of the sheet contents behind the current caches (None until the first refresh)."""
+    return _sheet_state["fingerprint"]
+
+def get_sheet_last_changed() -> Optional[datetime]:
+    """When the sheet contents last changed (None until the first refresh)."""
+    return _sheet_state["last_changed"]
+
+def record_sheet_fingerprint(fingerprint: str) -> bool:
+    """Remember the fingerprint of a fully processed fetch. True if it differs from the last one."""
+    if fingerprint == _sheet_state["fingerprint"]:
+        return False
+    _sheet_state["fingerprint"] = fingerprint
+    _sheet_state["last_changed"] = datetime.now(timezone.utc)
+    return True
 
 # --- Legacy raw getters ---
 def get_family_stats_raw() -> list:
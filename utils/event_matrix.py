@@ -0,0 +1,131 @@
+"""
+event_matrix.py
+
+Columnar view of the parsed sheet cache's per-member event points.
+
+ - members x events integer matrix (stdlib array, row-major), with the event
+   columns re-ordered by date and stored as per-member prefix sums
+ - sorted event-date index (date ordinals) for bisecting a timeframe
+
+A timeframe query is then two bisects plus one subtraction per member:
+    points(member, start..end) = prefix[member][hi] - prefix[member][lo]
+
+Built once per parsed-cache snapshot (utils/json_cache.py) and memoized;
+SheetsCacheUpdater warms it right after each refresh.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+from utils import cache_utils
+
+DATE_FORMAT = "%m/%d/%Y"
+
+
+def to_ordinal(value) -> int:
+    """Accept "MM/DD/YYYY", date or datetime; return the proleptic date ordinal."""
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return datetime.strptime(value, DATE_FORMAT).date().toordinal()
+
+
+class EventMatrix:
+    def __init__(self, parsed_cache: dict):
+        members = parsed_cache.get("parsed_members", {}) or {}
+        events_info = parsed_cache.get("events_info", {}) or {}
+
+        # ── Event columns, sorted by date ──
+        # event_points[i] belongs to the i-th sheet title, i.e. event_number - 1
+        # (older caches without event_number fall back to dict order).
+        dated_columns = []
+        for fallback_idx, event in enumerate(events_info.values()):
+            try:
+                ordinal = to_ordinal(event["date"])
+            except (KeyError, ValueError, TypeError):
+                continue
+            column = event.get("event_number", fallback_idx + 1) - 1
+            dated_columns.append((ordinal, column))
+        dated_columns.sort()
+
+        self.event_dates = array("i", (ordinal for ordinal, _ in dated_columns))
+        self.event_columns = array("i", (column for _, column in dated_columns))
+        self.n_events = len(dated_columns)
+
+        # ── Member rows ──
+        self.psids = tuple(members.keys())
+        self.members = tuple(members.values())
+        self.families = tuple((m.get("family_name") or "Not in a family") for m in self.members)
+        self.total_points = array("q", (int(m.get("points", 0) or 0) for m in self.members))
+        self.row_index = {psid: i for i, psid in enumerate(self.psids)}
+
+        # prefix[i * stride + k] = member i's points over the first k date-sorted events
+        stride = self.n_events + 1
+        self._stride = stride
+        prefix = array("q", bytes(8 * stride * len(self.members)))
+        columns = self.event_columns
+        for i, member in enumerate(self.members):
+            points = member.get("event_points", ()) or ()
+            n_points = len(points)
+            base = i * stride
+            running = 0
+            for k in range(self.n_events):
+                col = columns[k]
+                if col < n_points:
+                    running += points[col]
+                prefix[base + k + 1] = running
+        self._prefix = prefix
+
+    # --- Range helpers ---
+    def event_range(self, start, end) -> tuple[int, int]:
+        """Half-open [lo, hi) slice of the date-sorted events inside start..end (inclusive)."""
+        return bisect_left(self.event_dates, to_ordinal(start)), bisect_right(self.event_dates, to_ordinal(end))
+
+    def timeframe_points(self, start, end) -> array:
+        """Per-member points earned between start and end (aligned with self.psids)."""
+        lo, hi = self.event_range(start, end)
+        prefix, stride = self._prefix, self._stride
+        if lo >= hi:
+            return array("q", bytes(8 * len(self.members)))
+        return array("q", (prefix[base + hi] - prefix[base + lo]
+                           for base in range(0, stride * len(self.members), stride)))
+
+    def contributor_rows(self, start, end) -> list[int]:
+        """Row indices of members with > 0 points in the timeframe."""
+        return [i for i, pts in enumerate(self.timeframe_points(start, end)) if pts > 0]
+
+    def contributors(self, start, end) -> list[dict]:
+        """Member dicts of everyone who earned points in the timeframe."""
+        return [self.members[i] for i in self.contributor_rows(start, end)]
+
+    def family_timeframe_stats(self, start, end) -> dict[str, dict]:
+        """
+        family_name -> {"total_points", "contributors", "member_count"} for the timeframe.
+        member_count counts every parsed member of the family, contributing or not.
+        """
+        stats: dict[str, dict] = {}
+        for fam, pts in zip(self.families, self.timeframe_points(start, end)):
+            entry = stats.get(fam)
+            if entry is None:
+                entry = stats[fam] = {"total_points": 0, "contributors": 0, "member_count": 0}
+            entry["member_count"] += 1
+            if pts > 0:
+                entry["total_points"] += pts
+                entry["contributors"] += 1
+        return stats
+
+
+_cached_snapshot = None
+_cached_matrix: EventMatrix | None = None
+
+
+def get_event_matrix(parsed_cache: dict | None = None) -> EventMatrix:
+    """Matrix for the current parsed-cache snapshot, rebuilt only when the snapshot changes."""
+    global _cached_snapshot, _cached_matrix
+    if parsed_cache is None:
+        parsed_cache = cache_utils.load_parsed_cache()
+    if _cached_matrix is None or parsed_cache is not _cached_snapshot:
+        _cached_matrix = EventMatrix(parsed_cache)
+        _cached_snapshot = parsed_cache
+    return _cached_matrix
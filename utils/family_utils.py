@@ -1,4 +1,5 @@
 import json
+from utils.users_utils import get_verified_users, get_unverified_users
 
 # Load config.json
 with open("config.json") as f:
@@ -6,7 +7,6 @@ with open("config.json") as f:
 
 # Global variable for easy filename change
 FAMILY_MEMBERS_JSON = cfg['file_paths']["vsa_family_db"]
-ALL_VERIFIED_DISCORD_MEMBERS_JSON = cfg['file_paths']['all_discord_user_member_database_json_path']
 ALL_INSTAGRAM_USERS_IN_GROUPCHAT_THREAD = cfg['file_paths']['instagram_db']
 
 # --- add this helper (right below your other load_* helpers) ---
@@ -105,13 +105,10 @@ def get_family_role(psid: str, instagram_username: str | None = None) -> str | N
 
 def get_total_verified_users() -> int:
     """
-    Loads the verified users JSON and returns the total number of verified users.
+    Returns the total number of verified users (from the shared user store).
     """
     try:
-        with open(ALL_VERIFIED_DISCORD_MEMBERS_JSON, "r") as f:
-            data = json.load(f)
-        verified_users = data.get("verified_users", {})
-        return len(verified_users)
+        return len(get_verified_users())
     except Exception as e:
         print(f"Error reading verified users: {e}")
         return 0
@@ -119,13 +116,10 @@ def get_total_verified_users() -> int:
 
 def get_total_unverified_users() -> int:
     """
-    Loads the verified users JSON and returns the total number of unverified users.
+    Returns the total number of unverified users (from the shared user store).
     """
     try:
-        with open(ALL_VERIFIED_DISCORD_MEMBERS_JSON, "r") as f:
-            data = json.load(f)
-        unverified_users = data.get("unverified_users", {})
-        return len(unverified_users)
+        return len(get_unverified_users())
     except Exception as e:
         print(f"Error reading unverified users: {e}")
         return 0
\ No newline at end of file
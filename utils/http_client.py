@@ -0,0 +1,193 @@
+"""
+http_client.py
+
+One bot-wide aiohttp session plus a URL-keyed download cache.
+
+ - get_session(): shared ClientSession (pooled keep-alive connections, DNS
+   cache, default timeout), created lazily on the running loop and closed by
+   close_session() when the bot shuts down
+ - fetch_bytes(url): response body, cached in a byte-bounded LRU with a TTL
+ - fetch_image(url): decoded RGBA image, cached in an LRU bounded by decoded
+   size (w * h * bands) with the same TTL; callers get a copy they are free
+   to resize / close
+
+Meant for Discord avatars, guild icons and family logos: their URLs are
+content-addressed (or rarely change), so the same profile or leaderboard
+rendered twice doesn't download anything the second time. Concurrent
+requests for the same URL share a single download.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+import aiohttp
+from PIL import Image
+
+# ─── Session ─────────────────────────────────────────────
+CONNECTION_LIMIT = 20
+DNS_CACHE_SECONDS = 300
+KEEPALIVE_SECONDS = 30
+DEFAULT_TIMEOUT_SECONDS = 10
+
+# ─── Cache bounds ────────────────────────────────────────
+CACHE_TTL_SECONDS = 60 * 60
+MAX_CACHED_BYTES = 32 * 1024 * 1024
+MAX_CACHED_IMAGE_BYTES = 64 * 1024 * 1024
+
+_session: aiohttp.ClientSession | None = None
+_session_loop = None
+
+_bytes: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+_bytes_total = 0
+_images: "OrderedDict[str, tuple[float, Image.Image]]" = OrderedDict()
+_images_total = 0
+_inflight: dict[str, asyncio.Future] = {}
+_lock = threading.Lock()
+
+
+def get_session() -> aiohttp.ClientSession:
+    """The shared session; (re)created if missing, closed, or bound to another loop."""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTION_LIMIT,
+            ttl_dns_cache=DNS_CACHE_SECONDS,
+            keepalive_timeout=KEEPALIVE_SECONDS,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT_SECONDS),
+        )
+        _session_loop = loop
+    return _session
+
+
+async def close_session():
+    """Close the shared session (MyBot.close calls this on shutdown)."""
+    global _session, _session_loop
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_loop = None
+
+
+# ─── Cache helpers ───────────────────────────────────────
+def _get_fresh(cache: OrderedDict, url: str):
+    with _lock:
+        entry = cache.get(url)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > CACHE_TTL_SECONDS:
+            _drop(cache, url)
+            return None
+        cache.move_to_end(url)
+        return entry[1]
+
+
+def _image_size(img: Image.Image) -> int:
+    return img.width * img.height * len(img.getbands())
+
+
+def _drop(cache: OrderedDict, url: str):
+    # caller holds _lock
+    global _bytes_total, _images_total
+    entry = cache.pop(url, None)
+    if entry is None:
+        return
+    if cache is _bytes:
+        _bytes_total -= len(entry[1])
+    elif cache is _images:
+        _images_total -= _image_size(entry[1])
+
+
+def _store_bytes(url: str, data: bytes):
+    global _bytes_total
+    if len(data) > MAX_CACHED_BYTES:
+        return
+    with _lock:
+        _drop(_bytes, url)
+        _bytes[url] = (time.monotonic(), data)
+        _bytes_total += len(data)
+        while _bytes_total > MAX_CACHED_BYTES:
+            _, (_, old) = _bytes.popitem(last=False)
+            _bytes_total -= len(old)
+
+
+def _store_image(url: str, img: Image.Image):
+    global _images_total
+    size = _image_size(img)
+    if size > MAX_CACHED_IMAGE_BYTES:
+        return
+    with _lock:
+        _drop(_images, url)
+        _images[url] = (time.monotonic(), img)
+        _images_total += size
+        while _images_total > MAX_CACHED_IMAGE_BYTES:
+            _, (_, old) = _images.popitem(last=False)
+            _images_total -= _image_size(old)
+
+
+async def _download(url: str, timeout: float | None) -> bytes:
+    session = get_session()
+    kwargs = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+    async with session.get(url, **kwargs) as resp:
+        resp.raise_for_status()
+        return await resp.read()
+
+
+# ─── Public API ──────────────────────────────────────────
+async def fetch_bytes(url: str, timeout: float | None = None, use_cache: bool = True) -> bytes:
+    """
+    GET `url` through the shared session and return the body. Raises on
+    HTTP errors / timeouts; failures are never cached.
+    """
+    if use_cache:
+        data = _get_fresh(_bytes, url)
+        if data is not None:
+            return data
+
+        pending = _inflight.get(url)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+    task = asyncio.ensure_future(_download(url, timeout))
+    if use_cache:
+        _inflight[url] = task
+    try:
+        data = await asyncio.shield(task)
+    finally:
+        if use_cache and _inflight.get(url) is task:
+            del _inflight[url]
+
+    if use_cache:
+        _store_bytes(url, data)
+    return data
+
+
+async def fetch_image(url: str, timeout: float | None = None) -> Image.Image:
+    """Download (or reuse) `url` as a decoded RGBA image; returns a private copy."""
+    img = _get_fresh(_images, url)
+    if img is None:
+        data = await fetch_bytes(url, timeout=timeout)
+        with Image.open(BytesIO(data)) as src:
+            img = src.convert("RGBA")
+        _store_image(url, img)
+    return img.copy()
+
+
+def prime(url: str, data: bytes):
+    """Pre-load `url`'s body into the cache (e.g. local placeholders in benchmarks)."""
+    _store_bytes(url, data)
+
+
+def clear():
+    """Drop every cached download and decoded image."""
+    global _bytes_total, _images_total
+    with _lock:
+        _bytes.clear()
+        _images.clear()
+        _bytes_total = 0
+        _images_total = 0
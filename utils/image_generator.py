@@ -1,19 +1,15 @@
 import os
 import re
+import math
 import random
-import requests
+import asyncio
 from datetime import date
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
-
-import aiohttp
 from io import BytesIO
+from PIL import Image, ImageDraw, ImageFont, ImageFilter
 
-async def fetch_image(session, url: str) -> Image.Image:
-    async with session.get(url) as resp:
-        resp.raise_for_status()
-        data = await resp.read()
-        img = Image.open(BytesIO(data)).convert("RGBA")
-        return img
+from utils import asset_cache, http_client, render_scheduler
+from utils.image_output import encode_image
+from utils.text_metrics import text_size, wrap_text
 
 def get_font_path(font_name_ttf: str):
     base_path = os.path.join("assets", "fonts")
@@ -23,10 +19,31 @@ def get_font_path(font_name_ttf: str):
     return None
 
 def center_text_x(draw: ImageDraw.Draw, text: str, font: ImageFont.FreeTypeFont, center_x: int) -> int:
-    text_width, _ = draw.textsize(text, font=font)
+    text_width, _ = text_size(text, font)
     return center_x - (text_width // 2)
 
 
+def composite_blurred_shadow(image: Image.Image, box, paint, radius: float):
+    """
+    Blur a shadow only where it can reach instead of across the whole canvas.
+
+    box: (left, top, right, bottom) extent of the unblurred shadow on `image`
+    paint(draw, ox, oy): draws the shadow on a small layer whose top-left is
+        (ox, oy) in image coordinates, i.e. subtract (ox, oy) from positions
+    """
+    pad = int(math.ceil(radius * 3)) + 2
+    left = max(0, int(box[0]) - pad)
+    top = max(0, int(box[1]) - pad)
+    right = min(image.width, int(math.ceil(box[2])) + pad)
+    bottom = min(image.height, int(math.ceil(box[3])) + pad)
+    if right <= left or bottom <= top:
+        return
+    layer = Image.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+    paint(ImageDraw.Draw(layer), left, top)
+    layer = layer.filter(ImageFilter.GaussianBlur(radius))
+    image.alpha_composite(layer, dest=(left, top))
+
+
 def draw_text_with_blurred_shadow(
     image: Image.Image,
     position: tuple[int,int],
@@ -51,14 +68,15 @@ def draw_text_with_blurred_shadow(
     draw = ImageDraw.Draw(image)
     x, y = position
 
-    # 1) Shadow
-    shadow = Image.new("RGBA", image.size, (0,0,0,0))
-    sdraw = ImageDraw.Draw(shadow)
-    for dx in (-1,0,1):
-        for dy in (-1,0,1):
-            sdraw.text((x+dx, y+dy), text, font=font, fill=shadow_color)
-    shadow = shadow.filter(ImageFilter.GaussianBlur(1.5))
-    image.alpha_composite(shadow)
+    # 1) Shadow (3x3 offsets, blurred within the text's bounding box)
+    left, top, right, bottom = draw.textbbox((x, y), text, font=font)
+
+    def paint_shadow(sdraw, ox, oy):
+        for dx in (-1,0,1):
+            for dy in (-1,0,1):
+                sdraw.text((x+dx-ox, y+dy-oy), text, font=font, fill=shadow_color)
+
+    composite_blurred_shadow(image, (left-1, top-1, right+1, bottom+1), paint_shadow, 1.5)
 
     # 2) Text
     if stroke_width > 0:
@@ -81,21 +99,6 @@ def draw_text_with_blurred_shadow(
         draw.text((x, y), text, font=font, fill=fill)
 
         
-def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[str]:
-    words = text.split()
-    lines, cur = [], ""
-    for w in words:
-        test = (cur + " " + w).strip()
-        if font.getsize(test)[0] <= max_width:
-            cur = test
-        else:
-            if cur:
-                lines.append(cur)
-            cur = w
-    if cur:
-        lines.append(cur)
-    return lines
-
 def pick_background(prefix: str, randomize: bool) -> str:
     """
     prefix e.g. '860_538'; looks for files like '860_538_1.png', ..., returns full path.
@@ -115,11 +118,10 @@ def pick_background(prefix: str, randomize: bool) -> str:
 
 
 async def paste_image_from_url(background_path: str, overlay_url: str, position=(0, 0), size=None) -> Image.Image:
-    """Fetch an image from URL and paste onto background using aiohttp."""
-    bg = Image.open(background_path).convert("RGBA")
+    """Fetch an image from URL (shared session + download cache) and paste onto background."""
+    bg = asset_cache.load_image(background_path)
 
-    async with aiohttp.ClientSession() as session:
-        ov = await fetch_image(session, overlay_url)
+    ov = await http_client.fetch_image(overlay_url)
 
     if size:
         ov = ov.resize(size, Image.LANCZOS)
@@ -131,7 +133,11 @@ async def paste_image_from_url(background_path: str, overlay_url: str, position=
     return bg
 
 
-def generate_leaderboard_image(members, leaderboard="Leaderboards", config_pillow=None, config_family=None, start_pos=1, total_page_count=1):
+def generate_leaderboard_image(members, leaderboard="Leaderboards", config_pillow=None, config_family=None, start_pos=1, total_page_count=1, output_path=None):
+    """
+    Render one member leaderboard page and return it as a PNG BytesIO. Pass
+    output_path to also persist it (each page / render worker its own file).
+    """
     
     role_map = {
         "fl": "Fam Lead",
@@ -162,23 +168,20 @@ def generate_leaderboard_image(members, leaderboard="Leaderboards", config_pillo
     font_path = get_font_path(font_name)  # heavy font path
 
     # Heavy fonts for title, footer, and headers
-    font_title = ImageFont.truetype(font_path, 45)  
-    font_footer = ImageFont.truetype(font_path, 12)
-    font_header = ImageFont.truetype(font_path, 20)
+    font_title = asset_cache.get_font(font_path, 45)  
+    font_footer = asset_cache.get_font(font_path, 12)
+    font_header = asset_cache.get_font(font_path, 20)
 
     # Light fonts for the values and position numbers
-    font_pos_num = ImageFont.truetype(font_light_path, 18)
-    font_names = ImageFont.truetype(font_light_path, 16)
-    font_role = ImageFont.truetype(font_light_path, 16)
-    font_points = ImageFont.truetype(font_light_path, 16)
-    font_family = ImageFont.truetype(font_light_path, 16)
+    font_pos_num = asset_cache.get_font(font_light_path, 18)
+    font_names = asset_cache.get_font(font_light_path, 16)
+    font_role = asset_cache.get_font(font_light_path, 16)
+    font_points = asset_cache.get_font(font_light_path, 16)
+    font_family = asset_cache.get_font(font_light_path, 16)
 
 
     backgrounds_dir = os.path.join("assets", "backgrounds")
     overlays_dir = os.path.join("assets", "overlays")
-    output_dir = os.path.join("assets", "outputs")
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, "leaderboard.png")
 
     available_bgs = [f for f in os.listdir(backgrounds_dir) if f.startswith("863_548_") and f.endswith(".png")]
 
@@ -195,22 +198,46 @@ def generate_leaderboard_image(members, leaderboard="Leaderboards", config_pillo
 
     bg_path = os.path.join(backgrounds_dir, bg_file)
 
-    # Open background safely
-    with Image.open(bg_path).convert("RGBA") as bg:
-        background = bg.copy()  # copy keeps image in memory, closes file handle
-
-    # Apply overlay safely if exists
     overlay_path = os.path.join(overlays_dir, "leaderboards_overlay.png")
-    if os.path.isfile(overlay_path):
-        with Image.open(overlay_path).convert("RGBA") as ov:
-            alpha = ov.split()[3].point(lambda p: int(p * 0.65))  # 65% opacity
-            ov.putalpha(alpha)
-            background = Image.alpha_composite(background, ov)
 
+    # --- Headers with updated shifts ---
+    x_pos_title = 36  # POS +8 px from original
+    x_member_title = 251  # +15 px more
+    x_points_title = 525 + 3   # +3 px more
+    x_family_title = 637 + 10  # +10 px more (instead of previous +4)
+    x_role_title = 758 + 15  # moved 6 more pixels right
+    y_headers = 99
+    y_footer = 521
 
+    def bake_template():
+        # Static chrome, rendered once per background/overlay/font/footer version:
+        # background + 65% overlay + footer + column headers (all with shadows)
+        layer = asset_cache.load_image(bg_path)
+        if os.path.isfile(overlay_path):
+            ov = asset_cache.load_image(overlay_path, opacity=0.65)  # 65% opacity
+            layer = Image.alpha_composite(layer, ov)
+
+        # --- Footer with blurred shadow ---
+        x_footer = center_text_x(ImageDraw.Draw(layer), footer_text, font_footer, layer.width // 2)
+        draw_text_with_blurred_shadow(layer, (x_footer, y_footer), footer_text, font_footer, shadow_color=(255, 255, 255, 100),  # subtle white glow
+        fill=(255, 255, 255, 255))
+
+        # Draw headers with shadow
+        draw_text_with_blurred_shadow(layer, (x_pos_title, y_headers), "Pos", font_header, shadow_color=(255, 255, 255, 100))
+        draw_text_with_blurred_shadow(layer, (x_member_title, y_headers), "Member", font_header, shadow_color=(255, 255, 255, 100))
+        draw_text_with_blurred_shadow(layer, (x_points_title, y_headers), "Points", font_header, shadow_color=(255, 255, 255, 100))
+        draw_text_with_blurred_shadow(layer, (x_family_title, y_headers), "Family", font_header, shadow_color=(255, 255, 255, 100))
+        draw_text_with_blurred_shadow(layer, (x_role_title, y_headers), "Role", font_header, shadow_color=(255, 255, 255, 100))
+        return layer
+
+    background = asset_cache.get_layer(
+        ("member_leaderboard", bg_path, font_path, footer_text),
+        bake_template,
+        deps=(bg_path, overlay_path, font_path),
+    )
     width, height = background.size
 
-    # --- Title ---
+    # --- Title (page number changes per page) ---
     title_text = title_template.replace("{category}", f"{leaderboard.capitalize()}")
     #print(title_text)
     x_title_centered = center_text_x(ImageDraw.Draw(background), title_text, font_title, width // 2)
@@ -218,37 +245,14 @@ def generate_leaderboard_image(members, leaderboard="Leaderboards", config_pillo
     draw_text_with_blurred_shadow(background, (x_title_centered, y_title), title_text, font_title, shadow_color=(255, 255, 255, 100),  # subtle white glow
     fill=(255, 255, 255, 255))
 
-    # --- Footer with blurred shadow ---
-    y_footer = 521
-    x_footer_centered = width // 2
-    x_footer = center_text_x(ImageDraw.Draw(background), footer_text, font_footer, x_footer_centered)
-    draw_text_with_blurred_shadow(background, (x_footer, y_footer), footer_text, font_footer, shadow_color=(255, 255, 255, 100),  # subtle white glow
-    fill=(255, 255, 255, 255))
-
     draw = ImageDraw.Draw(background)
 
-    # --- Headers with updated shifts ---
-    x_pos_title = 36  # POS +8 px from original
-    x_member_title = 251  # +15 px more
-    x_points_title = 525 + 3   # +3 px more
-    x_family_title = 637 + 10  # +10 px more (instead of previous +4)
-    x_role_title = 758 + 15  # moved 6 more pixels right
-    y_headers = 99
-
     # Calculate centers of each title text for precise centering of values below
-    draw_temp = ImageDraw.Draw(background)
-    pos_center_x = x_pos_title + (draw_temp.textsize("Pos", font=font_header)[0] // 2)
+    pos_center_x = x_pos_title + (text_size("Pos", font_header)[0] // 2)
     member_start_x = 103  # fixed left x for member names
-    points_center_x = x_points_title + (draw_temp.textsize("Points", font=font_header)[0] // 2)
-    family_center_x = x_family_title + (draw_temp.textsize("Family", font=font_header)[0] // 2)
-    role_center_x = x_role_title + (draw_temp.textsize("Role", font=font_header)[0] // 2)
-
-    # Draw headers with shadow
-    draw_text_with_blurred_shadow(background, (x_pos_title, y_headers), "Pos", font_header, shadow_color=(255, 255, 255, 100))
-    draw_text_with_blurred_shadow(background, (x_member_title, y_headers), "Member", font_header, shadow_color=(255, 255, 255, 100))
-    draw_text_with_blurred_shadow(background, (x_points_title, y_headers), "Points", font_header, shadow_color=(255, 255, 255, 100))
-    draw_text_with_blurred_shadow(background, (x_family_title, y_headers), "Family", font_header, shadow_color=(255, 255, 255, 100))
-    draw_text_with_blurred_shadow(background, (x_role_title, y_headers), "Role", font_header, shadow_color=(255, 255, 255, 100))
+    points_center_x = x_points_title + (text_size("Points", font_header)[0] // 2)
+    family_center_x = x_family_title + (text_size("Family", font_header)[0] // 2)
+    role_center_x = x_role_title + (text_size("Role", font_header)[0] // 2)
 
     # --- Draw Rows ---
     start_y_pos = 134 + 5  # y lowered 5 px
@@ -260,7 +264,7 @@ def generate_leaderboard_image(members, leaderboard="Leaderboards", config_pillo
         # POS number, centered with POS title
         pos_number = start_pos + idx + 1  # ✅ start at 1
         pos_text = f"#{pos_number}"
-        pos_width = draw.textsize(pos_text, font=font_pos_num)[0]
+        pos_width = text_size(pos_text, font_pos_num)[0]
         pos_x = pos_center_x - (pos_width // 2)
         draw_text_with_blurred_shadow(background, (pos_x, y_row), pos_text, font_pos_num,
     shadow_color=(255, 255, 255, 30),  # subtle white glow
@@ -276,7 +280,7 @@ def generate_leaderboard_image(members, leaderboard="Leaderboards", config_pillo
 
         # Points value, centered with Points title
         points_str = str(member.get("points", "0"))
-        points_width = draw.textsize(points_str, font=font_points)[0]
+        points_width = text_size(points_str, font_points)[0]
         points_x = points_center_x - (points_width // 2)
         draw_text_with_blurred_shadow(background, (points_x, y_row), points_str, font=font_points,
     shadow_color=(255,255,255,100), fill=(255,255,255,255), bold=True
@@ -293,7 +297,7 @@ def generate_leaderboard_image(members, leaderboard="Leaderboards", config_pillo
         # Always coerce to string and give fallback
         use_name = str(fam_name if len(fam_name) <= 10 else short_name) or "No Family"
 
-        fam_width = draw.textsize(use_name, font=font_family)[0]
+        fam_width = text_size(use_name, font_family)[0]
         fam_x = family_center_x - (fam_width // 2)
         draw_text_with_blurred_shadow(
             background,
@@ -309,19 +313,18 @@ def generate_leaderboard_image(members, leaderboard="Leaderboards", config_pillo
         # Role value, centered with Role title
         role_key = member.get("role_key", "")
         role_text = get_role_display(role_key)
-        role_width = draw.textsize(role_text, font=font_role)[0]
+        role_width = text_size(role_text, font_role)[0]
         role_x = role_center_x - (role_width // 2)
         draw_text_with_blurred_shadow(background, (role_x, y_row), role_text, font_role,
     shadow_color=(255,255,255,100), fill=(255,255,255,255), bold=True
 )
 
-    background.save(output_path, "PNG")
-    return output_path
+    return encode_image(background, "leaderboard", fmt="png", save_to=output_path)
 
 
-def generate_qotd_image(question: str, pillow_conf: dict) -> str:
+def generate_qotd_image(question: str, pillow_conf: dict) -> BytesIO:
     """
-    Creates ~/assets/outputs/qotd.png:
+    Renders the question of the day and returns it as an encoded buffer (qotd.png / .webp):
      - background from assets/backgrounds/860_538_{n}.png
      - overlay assets/overlays/qotd.png @55% opacity
      - centered title at y=24, font Nexa-Heavy.ttf size 30
@@ -332,28 +335,42 @@ def generate_qotd_image(question: str, pillow_conf: dict) -> str:
     prefix = pillow_conf.get("background_prefix", "860_538")
     bg_path = pick_background(prefix, pillow_conf.get("random_background", False))
 
-    # 2) load bg + overlay
-    bg = Image.open(bg_path).convert("RGBA")
-    ov = Image.open("assets/overlays/qotd.png").convert("RGBA")
-    a = ov.split()[3].point(lambda p: int(p * 0.65))
-    ov.putalpha(a)
-    bg.alpha_composite(ov)
-
-    draw = ImageDraw.Draw(bg)
-
     # 3) fonts
     heavy_fp = get_font_path(pillow_conf.get("font_name_ttf", "Nexa-Heavy.ttf")) \
                or get_font_path("Nexa-Heavy.ttf")
     extra_fp = get_font_path("Nexa-ExtraLight.ttf") or heavy_fp
 
-    title_font  = ImageFont.truetype(heavy_fp, 30)
-    question_font = ImageFont.truetype(extra_fp, 30)
-    footer_font = ImageFont.truetype(heavy_fp, 20)
+    title_font  = asset_cache.get_font(heavy_fp, 30)
+    question_font = asset_cache.get_font(extra_fp, 30)
+    footer_font = asset_cache.get_font(heavy_fp, 20)
+    footer = pillow_conf.get("footer", "")
+    overlay_path = "assets/overlays/qotd.png"
+
+    def bake_template():
+        # 2) bg + overlay, and 6) footer: static, baked once per config/asset version
+        layer = asset_cache.load_image(bg_path)
+        ov = asset_cache.load_image(overlay_path, opacity=0.65)
+        layer.alpha_composite(ov)
+
+        fw, fh = text_size(footer, footer_font)
+        draw_text_with_blurred_shadow(layer,
+            ((layer.width - fw)//2, 500),
+            footer,
+            font=footer_font
+        )
+        return layer
+
+    bg = asset_cache.get_layer(
+        ("qotd", bg_path, heavy_fp, footer),
+        bake_template,
+        deps=(bg_path, overlay_path, heavy_fp),
+    )
+    draw = ImageDraw.Draw(bg)
 
     # 4) title
     today = date.today().strftime("%B %d, %Y")
     title = pillow_conf.get("title", "").format(formatted_current_date=today)
-    w, h = draw.textsize(title, font=title_font)
+    w, h = text_size(title, title_font)
     draw_text_with_blurred_shadow(bg,
         ((bg.width - w)//2, 24),
         title,
@@ -363,11 +380,11 @@ def generate_qotd_image(question: str, pillow_conf: dict) -> str:
     # 5) question text in box
     x0, y0, w0, h0 = 21, 86, 818, 402
     lines = wrap_text(question, question_font, w0)
-    line_h = question_font.getsize("Ay")[1]
+    line_h = text_size("Ay", question_font)[1]
     total_h = len(lines) * line_h + (len(lines)-1)*10
     cur_y = y0 + (h0 - total_h)//2
     for line in lines:
-        lw = question_font.getsize(line)[0]
+        lw = text_size(line, question_font)[0]
         draw_text_with_blurred_shadow(bg,
             (x0 + (w0 - lw)//2, cur_y),
             line,
@@ -376,30 +393,21 @@ def generate_qotd_image(question: str, pillow_conf: dict) -> str:
         )
         cur_y += line_h + 10
 
-    # 6) footer
-    footer = pillow_conf.get("footer", "")
-    fw, fh = draw.textsize(footer, font=footer_font)
-    draw_text_with_blurred_shadow(bg,
-        ((bg.width - fw)//2, 500),
-        footer,
-        font=footer_font
-    )
-
-    # 7) save
-    os.makedirs("assets/outputs", exist_ok=True)
-    out = "assets/outputs/qotd.png"
-    bg.save(out)
-    return out
+    # 7) encode
+    return encode_image(bg, "qotd")
 
 
 async def generate_family_leaderboard_image(
     families: list[dict],
     pillow_conf: dict,
     config_family: dict,
-    fallback_logo_url: str = None
-) -> str:
+    fallback_logo_url: str = None,
+    output_path: str | None = None,
+    priority: int = render_scheduler.PRIORITY_INTERACTIVE,
+) -> BytesIO:
     """
-    Generates and saves a “family points” leaderboard PNG and returns its path.
+    Generates a “family points” leaderboard PNG and returns it as a BytesIO
+    (also persisted to output_path when given).
 
     families: list of dicts, each with keys:
       - "family" (full name)
@@ -409,51 +417,62 @@ async def generate_family_leaderboard_image(
     pillow_conf: config["features"]["leaderboards"]["pillow_image_template"]["leaderboards"]
     config_family: config["family_settings"]
     fallback_logo_url: if a family has no logo (or fetch fails), use this URL instead
+    output_path: optional file to persist the page to
+    priority: render_scheduler priority for the compose step
+
+    Logos are fetched concurrently on the event loop; only the drawing is
+    done on a render slot (compose_family_leaderboard_image).
     """
+    logo_urls = [
+        (config_family.get(fam.get("family", ""), {}) or {}).get("logo_image_url") or fallback_logo_url
+        for fam in families
+    ]
+    unique_urls = [u for u in dict.fromkeys(logo_urls) if u]
+    fetched = dict(zip(unique_urls, await asyncio.gather(*(_load_image_async(u) for u in unique_urls))))
+    logos = [fetched.get(u) for u in logo_urls]
+    if fallback_logo_url and any(logo is None for logo in logos):
+        if fallback_logo_url in fetched:
+            fallback = fetched[fallback_logo_url]
+        else:
+            fallback = await _load_image_async(fallback_logo_url)
+        logos = [fallback if logo is None else logo for logo in logos]
+
+    return await render_scheduler.submit(
+        compose_family_leaderboard_image,
+        families,
+        logos,
+        pillow_conf,
+        output_path=output_path,
+        priority=priority,
+    )
+
+
+def compose_family_leaderboard_image(
+    families: list[dict],
+    logos: list,
+    pillow_conf: dict,
+    output_path: str | None = None
+) -> BytesIO:
+    """Draws and encodes the family leaderboard from already-fetched logos (one per family, or None)."""
     # 1) pick background
     prefix = pillow_conf.get("background_prefix", "650_470")
     bg_path = pick_background(prefix, pillow_conf.get("random_background", False))
-    bg = Image.open(bg_path).convert("RGBA")
-
-    # 2a) darken with 40% black overlay
-    dark = Image.new("RGBA", bg.size, (0, 0, 0, int(255 * 0.25)))
-    bg = Image.alpha_composite(bg, dark)
-
-    # 2b) apply the family‐leaderboard overlay at 55%
     overlay_path = os.path.join("assets", "overlays", "leaderboards_family_overlay.png")
-    if os.path.isfile(overlay_path):
-        ov = Image.open(overlay_path).convert("RGBA")
-        alpha = ov.split()[3].point(lambda p: int(p * 0.65))
-        ov.putalpha(alpha)
-        bg = Image.alpha_composite(bg, ov)
-
-    draw = ImageDraw.Draw(bg)
-    w, h = bg.size
 
     # 3) fonts
     heavy_fp = get_font_path(pillow_conf.get("font_name_ttf", "Nexa-Heavy.ttf"))
     light_fp = get_font_path(pillow_conf.get("font_name_light_ttf", "Nexa-ExtraLight.ttf")) or heavy_fp
 
-    title_font  = ImageFont.truetype(heavy_fp, 36)  # 33px title
-    footer_font = ImageFont.truetype(heavy_fp, 13)  # 13px footer
-    header_font = ImageFont.truetype(heavy_fp, 18)  # 17px column headers
-    row_font    = ImageFont.truetype(light_fp, 18)  # 18px row values
+    title_font  = asset_cache.get_font(heavy_fp, 36)  # 33px title
+    footer_font = asset_cache.get_font(heavy_fp, 13)  # 13px footer
+    header_font = asset_cache.get_font(heavy_fp, 18)  # 17px column headers
+    row_font    = asset_cache.get_font(light_fp, 18)  # 18px row values
 
-    # 4) title (moved up 5px → y=21)
-    title_y_coord = 30
     title_tmpl = pillow_conf.get("title", "Leaderboards | {category}")
     title = title_tmpl.format(category="Top Families Pts/Mem")
-    x_title = (w - draw.textsize(title, font=title_font)[0]) // 2
-    draw_text_with_blurred_shadow(bg, (x_title, title_y_coord), title, font=title_font, shadow_color=(255, 255, 255, 50))
-
-    # 5) footer (moved up 1px → y=431)
-    footer_y_coord = 433
     footer = pillow_conf.get("footer", "")
-    x_foot = (w - draw.textsize(footer, font=footer_font)[0]) // 2
-    draw_text_with_blurred_shadow(bg, (x_foot, footer_y_coord), footer, font=footer_font, shadow_color=(255, 255, 255, 50))
-
 
-    # 6) column headers at updated x-offsets
+    # column headers at updated x-offsets
     headers = [
         ("Pos",    18),     
         ("Family", 176),
@@ -461,10 +480,46 @@ async def generate_family_leaderboard_image(
         ("Members",447),  
         ("Pts/Mem",546), 
     ]
-    y_header = 100
-    for text, cx in headers:
-        draw_text_with_blurred_shadow(bg, (cx, y_header), text, font=header_font, shadow_color=(255, 255, 255, 50))
 
+    def bake_template():
+        # Everything but the rows is static: rendered once per config/asset version
+        layer = asset_cache.load_image(bg_path)
+
+        # 2a) darken with 40% black overlay
+        dark = Image.new("RGBA", layer.size, (0, 0, 0, int(255 * 0.25)))
+        layer = Image.alpha_composite(layer, dark)
+
+        # 2b) apply the family‐leaderboard overlay at 55%
+        if os.path.isfile(overlay_path):
+            ov = asset_cache.load_image(overlay_path, opacity=0.65)
+            layer = Image.alpha_composite(layer, ov)
+
+        ldraw = ImageDraw.Draw(layer)
+        lw = layer.width
+
+        # 4) title (moved up 5px → y=21)
+        title_y_coord = 30
+        x_title = (lw - text_size(title, title_font)[0]) // 2
+        draw_text_with_blurred_shadow(layer, (x_title, title_y_coord), title, font=title_font, shadow_color=(255, 255, 255, 50))
+
+        # 5) footer (moved up 1px → y=431)
+        footer_y_coord = 433
+        x_foot = (lw - text_size(footer, footer_font)[0]) // 2
+        draw_text_with_blurred_shadow(layer, (x_foot, footer_y_coord), footer, font=footer_font, shadow_color=(255, 255, 255, 50))
+
+        # 6) column headers
+        y_header = 100
+        for text, cx in headers:
+            draw_text_with_blurred_shadow(layer, (cx, y_header), text, font=header_font, shadow_color=(255, 255, 255, 50))
+        return layer
+
+    bg = asset_cache.get_layer(
+        ("family_leaderboard", bg_path, heavy_fp, title, footer),
+        bake_template,
+        deps=(bg_path, overlay_path, heavy_fp),
+    )
+    draw = ImageDraw.Draw(bg)
+    w, h = bg.size
 
     # 7) rows
     y0, step = 139, 41
@@ -472,24 +527,9 @@ async def generate_family_leaderboard_image(
         y = y0 + (idx - 1) * step
 
         # a) logo (family or fallback), 35×35px with 10px rounded corners
-        meta = config_family.get(fam.get("family", ""), {})
-        logo_url = meta.get("logo_image_url") or fallback_logo_url
-        logo = None
-
-        # inside generate_family_leaderboard_image()
-        if logo_url:
+        logo = logos[idx - 1]
+        if logo is not None:
             try:
-                if os.path.isfile(logo_url):
-                    logo = Image.open(logo_url).convert("RGBA")
-                else:
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(logo_url, timeout=5) as resp:
-                            resp.raise_for_status()
-                            data = await resp.read()
-                            logo = Image.open(BytesIO(data)).convert("RGBA")
-
-
-
                 # resize and round corners
                 logo = logo.resize((35, 35), Image.LANCZOS)
                 mask = Image.new("L", (35, 35), 0)
@@ -501,13 +541,12 @@ async def generate_family_leaderboard_image(
                 bg.alpha_composite(logo, dest=(x_logo, y_logo))
                 logo.close()
             except Exception as e:
-                print(f"❌ Failed to load logo {logo_url}: {e}")
-
+                print(f"❌ Failed to paste logo for {fam.get('family', 'N/A')}: {e}")
 
         # b) Pos
         pos_txt = f"#{idx}"
-        pw = draw.textsize(pos_txt, font=row_font)[0]
-        center_x = 17 + (draw.textsize("Pos", font=header_font)[0] // 2)
+        pw = text_size(pos_txt, row_font)[0]
+        center_x = 17 + (text_size("Pos", header_font)[0] // 2)
         draw_text_with_blurred_shadow(
             bg,
             (center_x - pw // 2, y),
@@ -535,8 +574,8 @@ async def generate_family_leaderboard_image(
         for key, hdr, cx in stats_cols:
             val = fam.get(key, 0)
             val_str = f"{val:,}"
-            tw  = draw.textsize(val_str,  font=row_font)[0]
-            hw  = draw.textsize(hdr, font=header_font)[0]
+            tw  = text_size(val_str,  row_font)[0]
+            hw  = text_size(hdr, header_font)[0]
             draw_text_with_blurred_shadow(
                 bg,
                 (cx + hw // 2 - tw // 2, y),
@@ -546,14 +585,23 @@ async def generate_family_leaderboard_image(
             )
 
     # 8) save
-    out_dir = os.path.join("assets", "outputs")
-    os.makedirs(out_dir, exist_ok=True)
-    out_path = os.path.join(out_dir, "family_points_per_member_leaderboards.png")
-    bg.save(out_path, "PNG")
-    return out_path
+    return encode_image(bg, "family_points_per_member_leaderboards", fmt="png", save_to=output_path)
+
+
+async def _load_image_async(url: str | None, timeout: float = 5) -> Image.Image | None:
+    """Local path or URL -> RGBA image (shared session + download cache); None on failure."""
+    if not url:
+        return None
+    try:
+        if os.path.isfile(url):
+            return asset_cache.load_image(url)
+        return await http_client.fetch_image(url, timeout=timeout)
+    except Exception as e:
+        print(f"❌ Failed to load image from {url}: {e}")
+        return None
 
 
-def generate_family_info_image(
+async def generate_family_info_image(
     family_name: str,
     family_description: str,
     family_abbreviation: str,
@@ -563,44 +611,58 @@ def generate_family_info_image(
     leads: list[dict],
     pillow_conf: dict,
     fallback_banner_url: str = None
-) -> str:
+) -> BytesIO:
     """
-    Generates and saves a “family info” card (600×240) and returns its path.
+    Generates a “family info” card (600×240) and returns it as an encoded buffer.
+
+    Banner and logo are fetched concurrently on the event loop; the card is
+    then drawn by compose_family_info_image on a render slot (worker thread).
     """
-    WIDTH, HEIGHT = 600, 240
+    banner, logo = await asyncio.gather(
+        _load_image_async(banner_url),
+        _load_image_async(logo_url),
+    )
+    if banner is None:
+        banner = await _load_image_async(fallback_banner_url)
+
+    return await render_scheduler.submit(
+        compose_family_info_image,
+        family_name,
+        family_description,
+        family_abbreviation,
+        banner,
+        logo,
+        stats,
+        leads,
+        pillow_conf,
+        priority=render_scheduler.PRIORITY_INTERACTIVE,
+    )
 
-    # helper to load/resize from URL
-    # helper to load/resize from URL (sync)
-    def _load_image_from_url(url: str, size: tuple[int, int] | None = None) -> Image.Image:
-        try:
-            if os.path.isfile(url):
-                img = Image.open(url).convert("RGBA")
-            else:
-                resp = requests.get(url, timeout=5)
-                resp.raise_for_status()
-                img = Image.open(BytesIO(resp.content)).convert("RGBA")
-
-            if size:
-                img = img.resize(size, Image.LANCZOS)
-            return img
-        except Exception as e:
-            print(f"❌ Failed to load image from {url}: {e}")
-            return None
+
+def compose_family_info_image(
+    family_name: str,
+    family_description: str,
+    family_abbreviation: str,
+    banner: Image.Image | None,
+    logo: Image.Image | None,
+    stats: dict,
+    leads: list[dict],
+    pillow_conf: dict,
+) -> BytesIO:
+    """Draws and encodes the family info card from already-fetched images."""
+    WIDTH, HEIGHT = 600, 240
 
     # 1) Background or fallback to black
-    bg = _load_image_from_url(banner_url, (WIDTH, HEIGHT))
-    if bg is None:
-        bg = _load_image_from_url(fallback_banner_url, (WIDTH, HEIGHT))
-    if bg is None:
+    if banner is not None:
+        bg = banner.resize((WIDTH, HEIGHT), Image.LANCZOS)
+    else:
         bg = Image.new("RGBA", (WIDTH, HEIGHT), "black")
 
     # 2) Overlay at 55%
     ov_path = os.path.join("assets", "overlays", "family_info_overlay.png")
     if os.path.isfile(ov_path):
-        with Image.open(ov_path).convert("RGBA") as ov:
-            alpha = ov.split()[3].point(lambda p: int(p * 0.65))
-            ov.putalpha(alpha)
-            bg = Image.alpha_composite(bg, ov)
+        ov = asset_cache.load_image(ov_path, opacity=0.65)
+        bg = Image.alpha_composite(bg, ov)
 
     draw = ImageDraw.Draw(bg)
 
@@ -610,23 +672,24 @@ def generate_family_info_image(
     light_fp = get_font_path(pillow_conf.get("font_name_light_ttf", "Nexa-ExtraLight.ttf")) or heavy_fp
 
     TITLE_SIZE = 25
-    title_font    = ImageFont.truetype(heavy_fp, TITLE_SIZE)
-    subtitle_font = ImageFont.truetype(heavy_fp, 12)
-    footer_font   = ImageFont.truetype(heavy_fp, max(TITLE_SIZE - 15, 1))
-    name_font     = ImageFont.truetype(light_fp, 12)
-    handle_font   = ImageFont.truetype(heavy_fp, 12)
-    text_light    = ImageFont.truetype(light_fp, 10)
+    title_font    = asset_cache.get_font(heavy_fp, TITLE_SIZE)
+    subtitle_font = asset_cache.get_font(heavy_fp, 12)
+    footer_font   = asset_cache.get_font(heavy_fp, max(TITLE_SIZE - 15, 1))
+    name_font     = asset_cache.get_font(light_fp, 12)
+    handle_font   = asset_cache.get_font(heavy_fp, 12)
+    text_light    = asset_cache.get_font(light_fp, 10)
 
     # 4) Logo (40×40 rounded corners radius=10 at 7,7)
-    try:
-        logo = _load_image_from_url(logo_url, (40, 40))
-        mask = Image.new("L", (40, 40), 0)
-        m = ImageDraw.Draw(mask)
-        m.rounded_rectangle((0, 0, 40, 40), radius=10, fill=255)
-        logo.putalpha(mask)
-        bg.alpha_composite(logo, dest=(7, 7))
-    except Exception as e:
-        print(f"❌ Failed to paste logo '{logo_url}': {e}")
+    if logo is not None:
+        try:
+            logo = logo.resize((40, 40), Image.LANCZOS)
+            mask = Image.new("L", (40, 40), 0)
+            m = ImageDraw.Draw(mask)
+            m.rounded_rectangle((0, 0, 40, 40), radius=10, fill=255)
+            logo.putalpha(mask)
+            bg.alpha_composite(logo, dest=(7, 7))
+        except Exception as e:
+            print(f"❌ Failed to paste family logo: {e}")
 
 
     # 5) Title (in box 508×33 at 67,11, moved up by 3px)
@@ -635,7 +698,7 @@ def generate_family_info_image(
         family_abbreviation=family_abbreviation
     )
     tx, ty, tw, th = 67, 11, 508, 33
-    w_txt = draw.textsize(title_txt, font=title_font)[0]
+    w_txt = text_size(title_txt, title_font)[0]
     x_txt = tx + (tw - w_txt)//2
     draw_text_with_blurred_shadow(
         bg, (x_txt, ty + (th - TITLE_SIZE)//2 - 3),
@@ -645,7 +708,7 @@ def generate_family_info_image(
 
     # 6) Footer (y=218, size = TITLE_SIZE-10)
     footer_txt = pillow_conf.get("footer", "")
-    fw = draw.textsize(footer_txt, font=footer_font)[0]
+    fw = text_size(footer_txt, footer_font)[0]
     fx = (WIDTH - fw)//2
     draw_text_with_blurred_shadow(
         bg, (fx, 218),
@@ -656,7 +719,7 @@ def generate_family_info_image(
     # 7) Subtitles centered in their boxes
     # 7a) Family Info. box 181×15 at 26,52
     si_txt = "Family Info."
-    fw, fh = draw.textsize(si_txt, font=subtitle_font)
+    fw, fh = text_size(si_txt, subtitle_font)
     draw_text_with_blurred_shadow(
         bg,
         (26 + (181 - fw)//2, 52 + (15 - fh)//2),
@@ -665,7 +728,7 @@ def generate_family_info_image(
     )
     # 7b) Family Description 230×15 at 296,52
     sd_txt = "Family Description"
-    fw, fh = draw.textsize(sd_txt, font=subtitle_font)
+    fw, fh = text_size(sd_txt, subtitle_font)
     draw_text_with_blurred_shadow(
         bg,
         (296 + (230 - fw)//2, 52 + (15 - fh)//2),
@@ -674,7 +737,7 @@ def generate_family_info_image(
     )
     # 7c) Family Leads 352×15 at 124,130
     sl_txt = f"Family Leads ({len(leads)})"
-    fw, fh = draw.textsize(sl_txt, font=subtitle_font)
+    fw, fh = text_size(sl_txt, subtitle_font)
     draw_text_with_blurred_shadow(
         bg,
         (124 + (352 - fw)//2, 130 + (15 - fh)//2),
@@ -698,15 +761,7 @@ def generate_family_info_image(
 
     # 9) Description box 345×46 at 236,75 (wrap/truncate)
     desc_x, desc_y, desc_w, desc_h = 236, 75, 345, 46
-    words, out, cur = family_description.split(), [], ""
-    for w in words:
-        test = (cur + " " + w).strip()
-        if draw.textsize(test, font=text_light)[0] <= desc_w:
-            cur = test
-        else:
-            out.append(cur); cur = w
-            if len(out) == 2: break
-    if cur and len(out) < 2: out.append(cur)
+    out = wrap_text(family_description, text_light, desc_w, max_lines=2)
     for i, line in enumerate(out):
         y = desc_y + i * (text_light.size + 2)
         draw_text_with_blurred_shadow(
@@ -724,7 +779,7 @@ def generate_family_info_image(
         fn = lead.get("first_name") or "N/A"
         ln = lead.get("last_name")  or ""
         full = f"{fn} {ln}" or "None"
-        w_full = draw.textsize(full, font=name_font)[0]
+        w_full = text_size(full, name_font)[0]
         draw_text_with_blurred_shadow(
             bg,
             (cols[idx] + (171 - w_full)//2, 151),
@@ -736,7 +791,7 @@ def generate_family_info_image(
         ig = lead.get("instagram_tag") or "N/A"
         dc = lead.get("discord_tag")    or "N/A"
         for j, h in enumerate((f"Insta: @{ig}", f"Disc: {dc}")):
-            w_h = draw.textsize(h, font=handle_font)[0]
+            w_h = text_size(h, handle_font)[0]
             y_h = 169 + j * (handle_font.size + 2)
             draw_text_with_blurred_shadow(
                 bg,
@@ -746,9 +801,5 @@ def generate_family_info_image(
             )
 
 
-    # 11) Save and return
-    out_dir = os.path.join("assets", "outputs")
-    os.makedirs(out_dir, exist_ok=True)
-    out_path = os.path.join(out_dir, "family_info.png")
-    bg.save(out_path, "PNG")
-    return out_path
+    # 11) Encode and return
+    return encode_image(bg, "family_info")
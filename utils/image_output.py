@@ -0,0 +1,88 @@
+"""
+image_output.py
+
+Encodes rendered Pillow images into in-memory buffers for discord.File.
+
+Renderers return the BytesIO from encode_image() instead of saving to a
+fixed file under assets/outputs/, so concurrent renders don't overwrite each
+other and sending an image doesn't go through the disk. The buffer's
+`.name` is set ("welcome.png", "qotd.webp", ...), so discord.File(buf)
+and "attachment://" + buf.name just work.
+
+Encoding settings come from config["features"]["image_output"]:
+    format             "png" (default) or "webp"
+    png_compress_level 0-9, default 6 (lower = faster, bigger files)
+    webp_quality       0-100, default 90
+    webp_lossless      default false
+Renderers whose output is persisted under a fixed .png name (leaderboard
+pages) pass fmt="png" explicitly.
+"""
+import json
+import os
+from io import BytesIO
+
+from PIL import Image
+
+DEFAULT_FORMAT = "png"
+DEFAULT_PNG_COMPRESS_LEVEL = 6
+DEFAULT_WEBP_QUALITY = 90
+
+_settings: dict | None = None
+
+
+def output_settings() -> dict:
+    """config["features"]["image_output"], read once."""
+    global _settings
+    if _settings is None:
+        try:
+            with open("config.json", "r") as f:
+                cfg = json.load(f)
+            _settings = cfg.get("features", {}).get("image_output", {}) or {}
+        except Exception:
+            _settings = {}
+    return _settings
+
+
+def output_format(fmt: str | None = None) -> str:
+    """Normalized output format: the given one, else the configured default."""
+    fmt = (fmt or output_settings().get("format") or DEFAULT_FORMAT).lower()
+    return "webp" if fmt == "webp" else "png"
+
+
+def encode_image(image: Image.Image, name: str, fmt: str | None = None, save_to: str | None = None) -> BytesIO:
+    """
+    Encode `image` and return it as a rewound BytesIO named "<name>.<ext>".
+    With `save_to`, the same bytes are also persisted there (atomically, via
+    a temp file), e.g. for pages that are re-sent later.
+    """
+    fmt = output_format(fmt)
+    settings = output_settings()
+    buf = BytesIO()
+    if fmt == "webp":
+        image.save(
+            buf, "WEBP",
+            quality=int(settings.get("webp_quality", DEFAULT_WEBP_QUALITY)),
+            lossless=bool(settings.get("webp_lossless", False)),
+        )
+    else:
+        image.save(buf, "PNG", compress_level=int(settings.get("png_compress_level", DEFAULT_PNG_COMPRESS_LEVEL)))
+    buf.name = f"{name}.{fmt}"
+
+    if save_to:
+        directory = os.path.dirname(save_to)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{save_to}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(buf.getbuffer())
+        os.replace(tmp, save_to)
+
+    buf.seek(0)
+    return buf
+
+
+def buffer_from_bytes(data: bytes, name: str, fmt: str | None = None) -> BytesIO:
+    """Wrap already-encoded bytes (e.g. from a render cache) like encode_image does."""
+    buf = BytesIO(data)
+    buf.name = f"{name}.{output_format(fmt)}"
+    return buf
@@ -0,0 +1,103 @@
+"""
+json_cache.py
+
+Memoized JSON file reader shared by cache_utils / stats_utils.
+
+Each file is parsed once and kept as an immutable snapshot keyed on
+(absolute path, mtime, size). Readers only stat() the file; it is re-read
+when either value changes. Writers that already hold the data (e.g.
+SheetsCacheUpdater after a refresh) push it in with put_json_snapshot(),
+so in steady state nothing is read from disk at all.
+
+Snapshots are frozen: dicts become FrozenDict (a dict that rejects writes,
+still JSON-serializable) and lists become tuples. Callers that need to
+mutate must copy first.
+"""
+import os
+import json
+import threading
+
+
+class FrozenDict(dict):
+    """Read-only dict. Still a dict for isinstance checks and json.dumps."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("JSON snapshot is read-only; copy it before modifying")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __hash__(self):
+        return id(self)
+
+
+def freeze(obj):
+    """Recursively convert dicts/lists into FrozenDict/tuples."""
+    if isinstance(obj, dict):
+        return FrozenDict((k, freeze(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+_EMPTY = FrozenDict()
+_snapshots: dict[str, tuple[int, int, FrozenDict]] = {}
+_lock = threading.Lock()
+
+
+def _stat_key(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def load_json_snapshot(path: str) -> FrozenDict:
+    """
+    Return the frozen contents of `path`, re-parsing only if the file's
+    (mtime, size) changed since the last load. Empty FrozenDict on failure.
+    """
+    abs_path = os.path.abspath(path)
+    key = _stat_key(abs_path)
+    if key is None:
+        return _EMPTY
+
+    cached = _snapshots.get(abs_path)
+    if cached is not None and cached[:2] == key:
+        return cached[2]
+
+    try:
+        with open(abs_path, "r") as f:
+            data = freeze(json.load(f))
+    except Exception:
+        return _EMPTY
+
+    with _lock:
+        _snapshots[abs_path] = (key[0], key[1], data)
+    return data
+
+
+def put_json_snapshot(path: str, data) -> FrozenDict:
+    """
+    Seed the cache with `data` for a file that was just written to `path`,
+    so the next reader skips the disk. Returns the frozen snapshot.
+    """
+    abs_path = os.path.abspath(path)
+    frozen = data if isinstance(data, FrozenDict) else freeze(data)
+    key = _stat_key(abs_path)
+    with _lock:
+        if key is None:
+            _snapshots.pop(abs_path, None)
+        else:
+            _snapshots[abs_path] = (key[0], key[1], frozen)
+    return frozen
+
+
+def invalidate(path: str | None = None):
+    """Drop one cached snapshot (or all of them)."""
+    with _lock:
+        if path is None:
+            _snapshots.clear()
+        else:
+            _snapshots.pop(os.path.abspath(path), None)
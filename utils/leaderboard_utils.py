@@ -1,14 +1,156 @@
 # utils/leaderboard_utils.py
 
 import os
+import re
+import json
+import hashlib
 import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from utils.image_generator import generate_leaderboard_image, generate_family_leaderboard_image
+from utils import render_scheduler
+
+MEMBERS_PER_PAGE = 10
+# page file name -> content hash of the data it was rendered from; kept next
+# to the images so a restart doesn't re-render pages that are still current
+PAGE_HASHES_FILE = "page_hashes.json"
+MEMBER_PAGE_RE = re.compile(r"^member_points_page_(\d+)\.png$")
+
+
+def _content_hash(payload) -> str:
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _load_page_hashes(out_dir: str) -> dict:
+    try:
+        with open(os.path.join(out_dir, PAGE_HASHES_FILE), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _remove_stale_member_pages(out_dir: str, total_pages: int):
+    """Delete member page images past total_pages so paging can't reach them."""
+    for name in os.listdir(out_dir):
+        match = MEMBER_PAGE_RE.match(name)
+        if match and int(match.group(1)) > total_pages:
+            try:
+                os.remove(os.path.join(out_dir, name))
+            except FileNotFoundError:
+                pass
+
+
+def _save_page_hashes(out_dir: str, hashes: dict):
+    path = os.path.join(out_dir, PAGE_HASHES_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(hashes, f, indent=2)
+    os.replace(tmp, path)
+
+
+# ─── Render pool ─────────────────────────────────────────
+# Pillow page rendering is CPU-bound and holds the GIL, so member pages are
+# rendered on a process pool. Worker count comes from
+# config["features"]["leaderboards"]["render_workers"] (default: CPUs, max 4);
+# 0 renders on a thread instead, one page at a time.
+_render_pool: ProcessPoolExecutor | None = None
+
+
+def _render_worker_count() -> int:
+    try:
+        with open("config.json", "r") as f:
+            cfg = json.load(f)
+        workers = cfg.get("features", {}).get("leaderboards", {}).get("render_workers")
+    except Exception:
+        workers = None
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+    return max(0, int(workers))
+
+
+def _get_render_pool() -> ProcessPoolExecutor | None:
+    global _render_pool
+    if _render_pool is None:
+        workers = _render_worker_count()
+        if workers == 0:
+            return None
+        _render_pool = ProcessPoolExecutor(max_workers=workers)
+    return _render_pool
+
+
+def shutdown_render_pool():
+    """Stop the render workers (SheetsCacheUpdater calls this on unload)."""
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(wait=False, cancel_futures=True)
+        _render_pool = None
+
+
+def _render_page_file(*args, **kwargs):
+    # runs in a render worker: the page is persisted there, so don't ship the
+    # encoded buffer back to the parent process
+    generate_leaderboard_image(*args, **kwargs)
+
+
+async def _render_member_page(page_members, pillow_conf, family_conf, start, total_pages, out_path):
+    """Render one page straight into out_path (written atomically)."""
+    global _render_pool
+    job = functools.partial(
+        _render_page_file,
+        # plain dicts: read-only cache snapshots don't survive pickling
+        [dict(m) for m in page_members],
+        "points",
+        pillow_conf,
+        family_conf,
+        start,
+        total_pages,
+        output_path=out_path,
+    )
+    # background priority: interactive renders queued meanwhile go first
+    try:
+        await render_scheduler.submit(job, priority=render_scheduler.PRIORITY_BACKGROUND, executor=_get_render_pool())
+    except BrokenProcessPool:
+        # a worker died (e.g. OOM); drop the pool and render this page locally
+        print("[Leaderboards] Render pool broke, falling back to a thread.")
+        _render_pool = None
+        await render_scheduler.submit(job, priority=render_scheduler.PRIORITY_BACKGROUND)
+
+
+def member_page_hash(page: int, total_pages: int, page_members: list[dict], pillow_conf: dict, family_conf: dict) -> str:
+    """Hash of exactly what a member page shows: rank, name, role, points, family (+ page/template)."""
+    start = (page - 1) * MEMBERS_PER_PAGE
+    rows = []
+    for idx, m in enumerate(page_members):
+        fam = m.get("family_name") or "No Family"
+        short_name = ((family_conf or {}).get(fam) or {}).get("short_name")
+        rows.append([
+            start + idx + 1,
+            m.get("first_name", ""),
+            m.get("last_name", ""),
+            m.get("role_key", ""),
+            m.get("points", 0),
+            fam,
+            short_name,
+        ])
+    return _content_hash({"page": page, "total_pages": total_pages, "rows": rows, "template": pillow_conf})
+
+
+def family_page_hash(ordered_families: list[dict], pillow_conf: dict, family_conf: dict, fallback_logo_url) -> str:
+    """Hash of the families page: ordered family stats plus each family's display settings."""
+    settings = {f.get("family"): (family_conf or {}).get(f.get("family")) for f in ordered_families}
+    return _content_hash({
+        "families": ordered_families,
+        "settings": settings,
+        "fallback_logo": fallback_logo_url,
+        "template": pillow_conf,
+    })
+
 
 async def regenerate_leaderboard_pages(
-    old_mem_psids:    list[str],
     new_mem_psids:    list[str],
     members_map:      dict[str,dict],
-    old_fam_names:    list[str],
     new_fam_names:    list[str],
     family_stats_map: dict[str,dict],
     pillow_conf:      dict,
@@ -17,63 +159,86 @@ async def regenerate_leaderboard_pages(
     fallback_logo_url: str | None = None,
 ):
     """
-    Recompute and save only those leaderboard pages whose data changed
-    (or whose file is missing) for both members‐points and families‐pts/mem.
+    Recompute and save only those leaderboard pages whose rendered content
+    changed (or whose file is missing) for both members‐points and families‐pts/mem.
+
+    Every page is keyed by a hash of the exact data it displays; the hashes
+    are persisted in out_dir/page_hashes.json across restarts.
     """
     os.makedirs(out_dir, exist_ok=True)
+    old_hashes = _load_page_hashes(out_dir)
+    new_hashes = {}
 
     # ─── Members ─────────────────────────────────────────
-    per_page    = 10
+    per_page    = MEMBERS_PER_PAGE
     total       = len(new_mem_psids)
     total_pages = (total - 1) // per_page + 1
 
+    pending = []  # (out_name, page_hash, render coroutine)
     for page in range(1, total_pages + 1):
         start       = (page - 1) * per_page
         end         = start + per_page
         slice_psids = new_mem_psids[start:end]
-        old_slice   = old_mem_psids[start:end]
-        out_path    = os.path.join(out_dir, f"member_points_page_{page}.png")
-
-        # if ranking changed on this page, or file missing, regenerate
-        if slice_psids != old_slice or not os.path.isfile(out_path):
-            page_members = [members_map[psid] for psid in slice_psids if psid in members_map]
-
-            # run sync image generator in a thread
-            await asyncio.to_thread(
-                generate_leaderboard_image,
-                page_members,
-                "points",
-                pillow_conf,
-                family_conf,
-                start,
-                total_pages
-            )
-
-            # move the “latest” default output into its page slot
-            os.replace(
-                "assets/outputs/leaderboard.png",
-                out_path
-            )
+        out_name    = f"member_points_page_{page}.png"
+        out_path    = os.path.join(out_dir, out_name)
+
+        page_members = [members_map[psid] for psid in slice_psids if psid in members_map]
+        page_hash    = member_page_hash(page, total_pages, page_members, pillow_conf, family_conf)
+        new_hashes[out_name] = page_hash
+
+        # if anything shown on this page changed, or file missing, regenerate
+        if old_hashes.get(out_name) != page_hash or not os.path.isfile(out_path):
+            pending.append((
+                out_name,
+                page_hash,
+                _render_member_page(page_members, pillow_conf, family_conf, start, total_pages, out_path),
+            ))
+
+    async def render(out_name, page_hash, job):
+        try:
+            await job
+        except Exception as e:
+            print(f"[Leaderboards] Failed rendering {out_name}: {e}")
+            return False
+        # persist as we go so an interrupted rebuild keeps finished pages
+        old_hashes[out_name] = page_hash
+        _save_page_hashes(out_dir, old_hashes)
+        return True
+
+    # changed pages render concurrently, each worker into its own file
+    try:
+        results = await asyncio.gather(*(render(*p) for p in pending))
+    finally:
+        # drop page files past the new page count even if a render (or the
+        # families page below) fails
+        _remove_stale_member_pages(out_dir, total_pages)
+    failed = [out_name for (out_name, _, _), ok in zip(pending, results) if not ok]
+    for out_name in failed:
+        new_hashes.pop(out_name, None)  # re-rendered on the next run
 
     # ─── Families ────────────────────────────────────────
-    fam_out = os.path.join(out_dir, "families_pts_mem_page_1.png")
-    if new_fam_names != old_fam_names or not os.path.isfile(fam_out):
-        ordered_families = [
-            family_stats_map[name]
-            for name in new_fam_names
-            if name in family_stats_map
-        ]
-
-        # directly await async generator (returns the path)
-        fam_path = await generate_family_leaderboard_image(
+    fam_name = "families_pts_mem_page_1.png"
+    fam_out  = os.path.join(out_dir, fam_name)
+    ordered_families = [
+        family_stats_map[name]
+        for name in new_fam_names
+        if name in family_stats_map
+    ]
+    fam_hash = family_page_hash(ordered_families, pillow_conf, family_conf, fallback_logo_url)
+
+    if old_hashes.get(fam_name) != fam_hash or not os.path.isfile(fam_out):
+        # logos are fetched on the loop; only the compose step takes a render slot
+        await generate_family_leaderboard_image(
             ordered_families,
             pillow_conf,
             family_conf,
-            fallback_logo_url=fallback_logo_url
-        )
-
-        os.replace(
-            fam_path,
-            fam_out
+            fallback_logo_url=fallback_logo_url,
+            output_path=fam_out,
+            priority=render_scheduler.PRIORITY_BACKGROUND,
         )
+    new_hashes[fam_name] = fam_hash
 
+    if new_hashes != old_hashes:
+        _save_page_hashes(out_dir, new_hashes)
+    if failed:
+        raise RuntimeError(f"{len(failed)} leaderboard page(s) failed to render: {', '.join(failed)}")
@@ -0,0 +1,258 @@
+"""
+message_dispatch.py
+
+Single on_message pipeline for the bot.
+
+MyBot.on_message hands every message to the dispatcher, which:
+
+ - builds one immutable MessageContext per message (author / webhook flags,
+   channel kind, command-prefix check, verification status from the user
+   store, and lazily the normalized content) that every handler shares
+   instead of re-deriving it
+ - looks up the handlers that apply to the channel in a routing table
+   (built once per channel from each handler's channels / exclude_channels
+   and rebuilt when handlers change), so e.g. the Instagram bridge is never
+   called outside its sync channel
+ - runs gate handlers (the chat filter) first and in order; a gate that
+   returns STOP ends the pipeline, so a removed message is neither
+   processed as a command nor rewarded with XP
+ - then processes commands once and runs the remaining handlers
+   concurrently, timing each one (stats() / summary(); MemoryMonitor
+   reports them)
+
+Cogs register in cog_load and unregister in cog_unload:
+
+    get_message_dispatcher().register("leveling", self._on_message, skip_commands=True)
+"""
+import asyncio
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Awaitable, Callable, Iterable, Optional
+
+import discord
+
+from utils.users_utils import get_verified_users
+
+STOP = object()  # returned by a gate handler to end the pipeline
+
+# common zero-width characters used to split words invisibly
+_ZERO_WIDTH = {"\u200b", "\u200c", "\u200d", "\ufeff", "\u2060"}
+
+
+def normalize_content(s: str) -> str:
+    """
+    Normalize text to catch obfuscations:
+      - remove zero-width chars
+      - Unicode NFKD
+      - strip diacritics (á -> a)
+    """
+    s = "".join(ch for ch in s if ch not in _ZERO_WIDTH)
+    nfkd = unicodedata.normalize("NFKD", s)
+    return "".join(ch for ch in nfkd if not unicodedata.combining(ch))
+
+
+@dataclass(frozen=True)
+class MessageContext:
+    message: discord.Message
+    author_id: int
+    channel_id: int
+    guild_id: Optional[int]
+    content: str              # message.content, "" when missing
+    is_bot: bool
+    is_webhook: bool
+    in_guild_channel: bool    # TextChannel or Thread (not a DM / voice chat)
+    is_thread: bool
+    is_command: bool          # starts with the bot's prefix
+    user_record: Optional[dict] = field(default=None, compare=False)  # live verified-user record
+
+    @property
+    def is_verified(self) -> bool:
+        return self.user_record is not None
+
+    @cached_property
+    def normalized(self) -> str:
+        """normalize_content(content), computed on first use and shared."""
+        return normalize_content(self.content)
+
+
+def _starts_with_prefix(content: str, prefix) -> bool:
+    if isinstance(prefix, str):
+        return content.startswith(prefix)
+    if isinstance(prefix, (list, tuple)):
+        return content.startswith(tuple(prefix))
+    return False  # callable prefixes: leave command detection to process_commands
+
+
+def build_message_context(message: discord.Message, bot=None) -> MessageContext:
+    channel = message.channel
+    author = message.author
+    is_bot = bool(getattr(author, "bot", False))
+    content = message.content or ""
+    return MessageContext(
+        message=message,
+        author_id=author.id,
+        channel_id=channel.id,
+        guild_id=message.guild.id if message.guild else None,
+        content=content,
+        is_bot=is_bot,
+        is_webhook=message.webhook_id is not None,
+        in_guild_channel=isinstance(channel, (discord.TextChannel, discord.Thread)),
+        is_thread=isinstance(channel, discord.Thread),
+        is_command=bool(content) and bot is not None and _starts_with_prefix(content, bot.command_prefix),
+        user_record=None if is_bot else get_verified_users().get(str(author.id)),
+    )
+
+
+@dataclass(frozen=True)
+class MessageHandler:
+    name: str
+    callback: Callable[[MessageContext], Awaitable]
+    channels: Optional[frozenset] = None     # None = every channel
+    exclude_channels: frozenset = frozenset()
+    gate: bool = False                       # runs first, in order; may return STOP
+    include_bots: bool = False               # also bots and webhooks
+    guild_only: bool = True
+    skip_commands: bool = False
+    verified_only: bool = False
+    requires_content: bool = False
+
+    def routes_to(self, channel_id: int) -> bool:
+        if channel_id in self.exclude_channels:
+            return False
+        return self.channels is None or channel_id in self.channels
+
+    def accepts(self, ctx: MessageContext) -> bool:
+        if not self.include_bots and (ctx.is_bot or ctx.is_webhook):
+            return False
+        if self.guild_only and not ctx.in_guild_channel:
+            return False
+        if self.skip_commands and ctx.is_command:
+            return False
+        if self.verified_only and ctx.user_record is None:
+            return False
+        if self.requires_content and not ctx.content:
+            return False
+        return True
+
+
+class _HandlerStats:
+    __slots__ = ("calls", "errors", "total", "max")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+def _channel_ids(ids: Optional[Iterable]) -> Optional[frozenset]:
+    # config.json stores channel IDs as strings
+    if ids is None:
+        return None
+    return frozenset(int(cid) for cid in ids if str(cid).strip().isdigit())
+
+
+class MessageDispatcher:
+    def __init__(self):
+        self._handlers: dict[str, MessageHandler] = {}
+        self._routes: dict[int, tuple[tuple, tuple]] = {}   # channel id -> (gates, handlers)
+        self._stats: dict[str, _HandlerStats] = {}
+        self.messages = 0
+
+    # --- Registration ---
+    def register(self, name: str, callback, *, channels=None, exclude_channels=None, gate: bool = False,
+                 include_bots: bool = False, guild_only: bool = True, skip_commands: bool = False,
+                 verified_only: bool = False, requires_content: bool = False):
+        """
+        Add (or replace) the handler `name`. `callback(ctx)` is awaited for
+        every message in `channels` (all when None) minus `exclude_channels`
+        that passes the flag filters.
+        """
+        self._handlers[name] = MessageHandler(
+            name=name,
+            callback=callback,
+            channels=_channel_ids(channels),
+            exclude_channels=_channel_ids(exclude_channels) or frozenset(),
+            gate=gate,
+            include_bots=include_bots,
+            guild_only=guild_only,
+            skip_commands=skip_commands,
+            verified_only=verified_only,
+            requires_content=requires_content,
+        )
+        self._stats.setdefault(name, _HandlerStats())
+        self._routes.clear()
+
+    def unregister(self, name: str):
+        if self._handlers.pop(name, None) is not None:
+            self._routes.clear()
+
+    def _route(self, channel_id: int) -> tuple[tuple, tuple]:
+        route = self._routes.get(channel_id)
+        if route is None:
+            applicable = [h for h in self._handlers.values() if h.routes_to(channel_id)]
+            route = (tuple(h for h in applicable if h.gate), tuple(h for h in applicable if not h.gate))
+            self._routes[channel_id] = route
+        return route
+
+    # --- Dispatch ---
+    async def _call(self, handler: MessageHandler, ctx: MessageContext):
+        stats = self._stats[handler.name]
+        start = time.perf_counter()
+        try:
+            return await handler.callback(ctx)
+        except Exception as e:
+            stats.errors += 1
+            print(f"[MessageDispatch] Handler '{handler.name}' failed on message {ctx.message.id}: {e!r}")
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.calls += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+
+    async def dispatch(self, bot, message: discord.Message):
+        """Run every applicable handler for `message` and process its commands once."""
+        self.messages += 1
+        ctx = build_message_context(message, bot)
+        gates, handlers = self._route(ctx.channel_id)
+
+        for handler in gates:
+            if handler.accepts(ctx) and await self._call(handler, ctx) is STOP:
+                return
+
+        jobs = [self._call(h, ctx) for h in handlers if h.accepts(ctx)]
+        await asyncio.gather(bot.process_commands(message), *jobs)
+
+    # --- Metrics ---
+    def stats(self) -> dict:
+        return {
+            name: {
+                "calls": s.calls,
+                "errors": s.errors,
+                "avg_ms": round(s.total / s.calls * 1000, 2) if s.calls else 0.0,
+                "max_ms": round(s.max * 1000, 1),
+                "registered": name in self._handlers,
+            }
+            for name, s in self._stats.items()
+        }
+
+    def summary(self) -> str:
+        parts = [
+            f"{name} {s['calls']} calls, avg {s['avg_ms']} ms / max {s['max_ms']} ms"
+            + (f", {s['errors']} errors" if s["errors"] else "")
+            for name, s in self.stats().items()
+        ]
+        return f"[MESSAGE DISPATCH] {self.messages} messages; " + ("; ".join(parts) or "no handlers")
+
+
+_dispatcher: MessageDispatcher | None = None
+
+
+def get_message_dispatcher() -> MessageDispatcher:
+    """The bot-wide dispatcher, created on first use."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = MessageDispatcher()
+    return _dispatcher
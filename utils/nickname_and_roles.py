@@ -2,6 +2,8 @@ import discord
 import json
 import os
 
+from utils.nickname_sync import request_nickname
+
 from dotenv import load_dotenv
 import os
 
@@ -19,6 +21,9 @@ except (FileNotFoundError, json.JSONDecodeError) as e:
 async def rename_user(member: discord.Member, user_id_str: str, points: int, first_name: str, last_name: str):
     """
     Rename a member using a nickname template from config.json.
+    The edit is queued on the nickname sync service (utils/nickname_sync.py),
+    which skips it if the nickname already matches; returns the wanted
+    nickname, or None when the feature is off.
     """
     try:
         nick_config = config.get("nickname_templates", {})
@@ -37,20 +42,66 @@ async def rename_user(member: discord.Member, user_id_str: str, points: int, fir
                 .replace("{last_name}", last_name)
         )
 
-        if member.nick != nickname:
-            try:
-                await member.edit(nick=nickname, reason="Auto-renamed via verification system")
-            except discord.Forbidden:
-                print(f"[Rename] Permission denied renaming user {user_id_str}.")
-            except discord.HTTPException as http_err:
-                print(f"[Rename] HTTP error renaming {user_id_str}: {http_err}")
+        request_nickname(member, nickname, reason="Auto-renamed via verification system")
+        return nickname
     except Exception as e:
         print(f"[Rename] Unexpected error in rename_user for {user_id_str}: {e}")
 
+async def reconcile_roles(member: discord.Member, role_ids, remove_extra: bool = False, reason: str = "Verified VSA Member") -> bool:
+    """
+    Bring the member's roles in line with role_ids in one request.
+
+    Diffs role_ids against member.roles: roles they're missing are added and,
+    with remove_extra, roles not in role_ids are removed. All changes go out
+    as a single member.edit(roles=...); nothing is sent when nothing differs.
+    Roles the bot can't manage (missing, managed/integration roles, or above
+    the bot's top role) are left alone. Returns True if the roles were edited.
+    """
+    guild = member.guild
+    current = {role.id: role for role in member.roles if not role.is_default()}
+
+    wanted = {}
+    for role_id in role_ids:
+        try:
+            role = guild.get_role(int(role_id))
+        except (TypeError, ValueError):
+            role = None
+        if role is None:
+            print(f"[Roles] Role ID {role_id} not found in guild {guild.id}. For member: {member.name}")
+            continue
+        wanted[role.id] = role
+
+    to_add = [role for rid, role in wanted.items() if rid not in current and role.is_assignable()]
+    skipped = [rid for rid, role in wanted.items() if rid not in current and not role.is_assignable()]
+    if skipped:
+        print(f"[Roles] Can't assign roles {skipped} to {member.id} (managed or above the bot's top role).")
+
+    to_remove = []
+    if remove_extra:
+        to_remove = [role for rid, role in current.items() if rid not in wanted and role.is_assignable()]
+
+    if not to_add and not to_remove:
+        return False
+
+    removed_ids = {role.id for role in to_remove}
+    new_roles = [role for rid, role in current.items() if rid not in removed_ids] + to_add
+    try:
+        await member.edit(roles=new_roles, reason=reason)
+        return True
+    except discord.Forbidden:
+        print(f"[Roles] Permission denied updating roles of {member.id}.")
+    except discord.HTTPException as http_err:
+        print(f"[Roles] HTTP error updating roles of {member.id}: {http_err}")
+    except Exception as e:
+        print(f"[Roles] Unexpected error updating roles of {member.id}: {e}")
+    return False
+
+
 async def assign_roles(member: discord.Member, role_ids, ignore_ids=None):
     """
-    Assign each role in role_ids to the member, ignoring any missing roles,
-    permission errors, or if the member is in the ignore list.
+    Make sure the member has each role in role_ids (add only), ignoring any
+    missing roles, permission errors, or if the member is in the ignore list.
+    Roles the member already has cost no request; see reconcile_roles.
     """
     if ignore_ids is None:
         ignore_ids = []
@@ -61,25 +112,13 @@ async def assign_roles(member: discord.Member, role_ids, ignore_ids=None):
         return
 
     # Ensure we're only working with the configured guild
-    guild = member.guild
-    if guild.id != SERVER_GUILD_ID:
+    if member.guild.id != SERVER_GUILD_ID:
         guild = member._state._get_guild(SERVER_GUILD_ID)
+        if guild is None:
+            print(f"[Roles] Guild {SERVER_GUILD_ID} not found in bot cache.")
+            return
+        member = guild.get_member(member.id)
+        if member is None:
+            return
 
-    if guild is None:
-        print(f"[Roles] Guild {SERVER_GUILD_ID} not found in bot cache.")
-        return
-
-    # Assign roles
-    for role_id in role_ids:
-        try:
-            role = guild.get_role(int(role_id))
-            if role:
-                await member.add_roles(role, reason="Verified VSA Member")
-            else:
-                print(f"[Roles] Role ID {role_id} not found in guild {guild.id}. For member: {member.name}")
-        except discord.Forbidden:
-            print(f"[Roles] Permission denied adding role {role_id} to {member.id}.")
-        except discord.HTTPException as http_err:
-            print(f"[Roles] HTTP error adding role {role_id} to {member.id}: {http_err}")
-        except Exception as e:
-            print(f"[Roles] Unexpected error for role {role_id}, member {member.id}: {e}")
\ No newline at end of file
+    return await reconcile_roles(member, role_ids)
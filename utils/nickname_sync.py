@@ -0,0 +1,176 @@
+"""
+nickname_sync.py
+
+Single writer for automatic nickname changes.
+
+Producers (level-ups in LevelingCog, the periodic VerifiedUserDataUpdater,
+rejoins via rename_user) call request_nickname() instead of member.edit():
+
+ - desired state: the service keeps one wanted nickname per member; a newer
+   request replaces an older pending one, so a burst of updates for the same
+   member costs at most one PATCH
+ - skip if matching: requests (and queued edits, re-checked right before
+   they're sent) for members whose nickname already matches are dropped
+ - pacing: edits go out one at a time, at least `min_interval` seconds apart
+   (config["features"]["nickname_sync"]["min_interval_seconds"], default 1s),
+   which keeps the member-PATCH route well under Discord's rate limit
+ - a nickname the bot isn't allowed to set (403, e.g. the server owner or a
+   member above the bot's role) isn't retried until a different one is wanted;
+   at most MAX_FORBIDDEN_ENTRIES such refusals are remembered (LRU)
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+
+import discord
+
+MAX_NICKNAME_LENGTH = 32
+DEFAULT_MIN_INTERVAL_SECONDS = 1.0
+MAX_FORBIDDEN_ENTRIES = 1024
+
+
+def _current_nickname(member: discord.Member) -> str:
+    return member.nick or member.name
+
+
+class NicknameSyncService:
+    def __init__(self, min_interval: float):
+        self.min_interval = max(0.0, float(min_interval))
+        # (guild id, member id) -> (member, nickname, reason); insertion order = send order
+        self._pending: "OrderedDict[tuple[int, int], tuple[discord.Member, str, str | None]]" = OrderedDict()
+        # last nickname refused with 403, least recently refused first
+        self._forbidden: "OrderedDict[tuple[int, int], str]" = OrderedDict()
+        self._wakeup: asyncio.Event | None = None
+        self._worker: asyncio.Task | None = None
+        self._last_edit = 0.0
+
+        # metrics
+        self.requested = 0
+        self.coalesced = 0
+        self.skipped = 0
+        self.applied = 0
+        self.failed = 0
+
+    # --- Producers ---
+    def request(self, member: discord.Member, nickname: str, reason: str | None = None) -> bool:
+        """
+        Ask for `member`'s nickname to become `nickname` (truncated to 32
+        chars). Returns False when nothing needs to be sent.
+        """
+        self.requested += 1
+        nickname = nickname.strip()[:MAX_NICKNAME_LENGTH]
+        key = (member.guild.id, member.id)
+
+        forbidden = self._forbidden.get(key)
+        if forbidden is not None and (forbidden != nickname or _current_nickname(member) == nickname):
+            # a different nickname is wanted, or it's already set: the refusal no longer applies
+            del self._forbidden[key]
+            forbidden = None
+
+        if _current_nickname(member) == nickname or forbidden == nickname:
+            # already there (or can't be done): a queued edit to something else is stale too
+            if self._pending.pop(key, None) is not None:
+                self.coalesced += 1
+            self.skipped += 1
+            return False
+
+        if key in self._pending:
+            self.coalesced += 1
+            # keep its place in line, just update what it will send
+        self._pending[key] = (member, nickname, reason)
+        self._ensure_worker()
+        self._wakeup.set()
+        return True
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    # --- Worker ---
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            delay = self._last_edit + self.min_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue  # the head of the queue may have changed meanwhile
+
+            key, (member, nickname, reason) = self._pending.popitem(last=False)
+            # use the freshest cached member state, the queued object may be stale
+            member = member.guild.get_member(member.id) or member
+            if _current_nickname(member) == nickname:
+                self.skipped += 1
+                continue
+
+            self._last_edit = time.monotonic()
+            try:
+                await member.edit(nick=nickname, reason=reason)
+                self.applied += 1
+                self._forbidden.pop(key, None)
+            except discord.Forbidden:
+                self.failed += 1
+                self._forbidden[key] = nickname
+                self._forbidden.move_to_end(key)
+                while len(self._forbidden) > MAX_FORBIDDEN_ENTRIES:
+                    self._forbidden.popitem(last=False)
+                print(f"[NicknameSync] Permission denied renaming user {member.id}.")
+            except discord.NotFound:
+                self.failed += 1  # left the server
+                self._forbidden.pop(key, None)
+            except discord.HTTPException as http_err:
+                self.failed += 1
+                print(f"[NicknameSync] HTTP error renaming {member.id}: {http_err}")
+            except Exception as e:
+                self.failed += 1
+                print(f"[NicknameSync] Unexpected error renaming {member.id}: {e}")
+
+    async def stop(self):
+        """Cancel the worker; pending edits are dropped (re-requested on the next sync)."""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        self._pending.clear()
+
+    def summary(self) -> str:
+        return (f"[NICKNAME SYNC] queued {self.queue_depth}, requested {self.requested}, applied {self.applied}, "
+                f"skipped {self.skipped}, coalesced {self.coalesced}, failed {self.failed}")
+
+
+_service: NicknameSyncService | None = None
+
+
+def _configured_min_interval() -> float:
+    try:
+        with open("config.json", "r") as f:
+            cfg = json.load(f)
+        value = cfg.get("features", {}).get("nickname_sync", {}).get("min_interval_seconds")
+    except Exception:
+        value = None
+    return DEFAULT_MIN_INTERVAL_SECONDS if value is None else float(value)
+
+
+def get_nickname_sync() -> NicknameSyncService:
+    """The bot-wide nickname service, created on first use."""
+    global _service
+    if _service is None:
+        _service = NicknameSyncService(_configured_min_interval())
+    return _service
+
+
+def request_nickname(member: discord.Member, nickname: str, reason: str | None = None) -> bool:
+    """Shortcut for get_nickname_sync().request(...)."""
+    return get_nickname_sync().request(member, nickname, reason)
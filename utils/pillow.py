@@ -1,14 +1,19 @@
 from PIL import Image, ImageFont, ImageDraw, ImageFilter
 from io import BytesIO
-import requests
 import os
 import pytz
 from datetime import datetime, date
 
+from utils import asset_cache, http_client, text_metrics, render_scheduler
+from utils.image_generator import composite_blurred_shadow
+from utils.image_output import encode_image
+
+WELCOME_AVATAR_TIMEOUT_SECONDS = 5
+
 def center(x, text, font):
     text = str(text)
     try:
-        _, _, text_width, _ = ImageDraw.Draw(Image.new("RGB", (1, 1))).textbbox((0, 0), text, font=font)
+        text_width = text_metrics.text_width(text, font)
         centered_x = x - (text_width / 2)
         return centered_x
     except Exception as e:
@@ -18,14 +23,14 @@ def center(x, text, font):
 
 # Function to calculate the width of text
 def get_text_width(draw, text, font):
-    return draw.textbbox((0, 0), text, font=font)[2]
+    return text_metrics.text_width(text, font)
 
     
     
 def right_align(x, text, font):
     text = str(text)
     try:
-        _, _, text_width, _ = ImageDraw.Draw(Image.new("RGB", (1, 1))).textbbox((0, 0), text, font=font)
+        text_width = text_metrics.text_width(text, font)
         right_aligned_x = x - text_width
         return right_aligned_x
     except Exception as e:
@@ -34,31 +39,58 @@ def right_align(x, text, font):
     
 
 
-def create_welcome_image(member, member_count, family_name):
+async def create_welcome_image(member, member_count, family_name):
+    """
+    Builds the welcome banner for `member` and returns it as an encoded
+    buffer (BytesIO named welcome.png / welcome.webp).
+
+    The avatar is fetched on the event loop (shared session, timed out);
+    compose_welcome_image then draws the banner on a render slot (worker
+    thread), so a burst of joins doesn't block the gateway.
+    """
+    pfp_asset = member.avatar or member.guild.icon or member.default_avatar
+    try:
+        member_pfp = await http_client.fetch_image(pfp_asset.url, timeout=WELCOME_AVATAR_TIMEOUT_SECONDS)
+    except Exception as e:
+        print(f"[Welcome] Failed to fetch avatar for {member}: {e}")
+        member_pfp = None
+
+    return await render_scheduler.submit(
+        compose_welcome_image,
+        member_pfp,
+        str(member),
+        member.created_at,
+        member_count,
+        family_name,
+        priority=render_scheduler.PRIORITY_INTERACTIVE,
+    )
+
+
+def compose_welcome_image(member_pfp, member_name, created_at, member_count, family_name):
+    """Draws and encodes the welcome banner from already-fetched inputs (no I/O)."""
     # Background
-    background_image = Image.open("./assets/backgrounds/welcome_banner.png").convert("RGBA")
+    background_image = asset_cache.load_image("./assets/backgrounds/welcome_banner.png")
     image_width, image_height = background_image.size
 
     # Fonts
     font_path = "./assets/fonts/georgiaref.ttf"
-    font_header = ImageFont.truetype(font_path, 60)
-    font_main = ImageFont.truetype(font_path, 50)
-    font_footer = ImageFont.truetype(font_path, 32)
+    font_header = asset_cache.get_font(font_path, 60)
+    font_main = asset_cache.get_font(font_path, 50)
+    font_footer = asset_cache.get_font(font_path, 32)
 
     # Profile picture
-    pfp_url = member.avatar.url if member.avatar else member.guild.icon.url
-    pfp_response = requests.get(pfp_url)
-    member_pfp = Image.open(BytesIO(pfp_response.content)).convert("RGBA").resize((556, 556))
+    avatar_x, avatar_y = 722, 222
+    if member_pfp is not None:
+        member_pfp = member_pfp.resize((556, 556))
 
-    # Circular mask
-    mask = Image.new("L", (556, 556), 0)
-    draw_mask = ImageDraw.Draw(mask)
-    draw_mask.ellipse((0, 0, 556, 556), fill=255)
-    member_pfp.putalpha(mask)
+        # Circular mask
+        mask = Image.new("L", (556, 556), 0)
+        draw_mask = ImageDraw.Draw(mask)
+        draw_mask.ellipse((0, 0, 556, 556), fill=255)
+        member_pfp.putalpha(mask)
 
-    # Paste PFP at (722, 222)
-    avatar_x, avatar_y = 722, 222
-    background_image.paste(member_pfp, (avatar_x, avatar_y), member_pfp)
+        # Paste PFP at (722, 222)
+        background_image.paste(member_pfp, (avatar_x, avatar_y), member_pfp)
 
     draw = ImageDraw.Draw(background_image)
 
@@ -66,8 +98,6 @@ def create_welcome_image(member, member_count, family_name):
     # Helper: draw text with shadow
     def draw_text_with_shadow(draw, position, text, font, fill=(255, 255, 255), letter_spacing=0, anchor="mm", shadow_opacity=100, shadow_blur=4):
         x, y = position
-        shadow_layer = Image.new("RGBA", background_image.size, (0, 0, 0, 0))
-        shadow_draw = ImageDraw.Draw(shadow_layer)
         shadow_distance = 4
         
         alpha_value = int(shadow_opacity / 100 * 255)
@@ -75,20 +105,29 @@ def create_welcome_image(member, member_count, family_name):
 
         bold_offsets = [(0,0), (1,0), (0,1), (1,1)]
 
-        # Draw shadow first
+        # Shadow pieces: (position, text) before the bold offsets
         if letter_spacing > 0:
+            pieces = []
             x_offset = 0
             for char in text:
-                for dx, dy in bold_offsets:
-                    shadow_draw.text((x + x_offset + shadow_distance + dx, y + shadow_distance + dy), char, font=font, fill=shadow_color, anchor=anchor)
-                x_offset += font.getlength(char) + letter_spacing
+                pieces.append(((x + x_offset + shadow_distance, y + shadow_distance), char))
+                x_offset += text_metrics.text_length(char, font) + letter_spacing
         else:
-            for dx, dy in bold_offsets:
-                shadow_draw.text((x + shadow_distance + dx, y + shadow_distance + dy), text, font=font, fill=shadow_color, anchor=anchor)
+            pieces = [((x + shadow_distance, y + shadow_distance), text)]
 
-        # Apply blur and paste shadow
-        shadow_layer = shadow_layer.filter(ImageFilter.GaussianBlur(radius=shadow_blur))
-        background_image.alpha_composite(shadow_layer)
+        def paint_shadow(shadow_draw, ox, oy):
+            for (px, py), piece in pieces:
+                for dx, dy in bold_offsets:
+                    shadow_draw.text((px + dx - ox, py + dy - oy), piece, font=font, fill=shadow_color, anchor=anchor)
+
+        # Draw shadow first, blurred only within the text's bounding box
+        boxes = []
+        for (px, py), piece in pieces:
+            left, top, right, bottom = text_metrics.text_bbox(piece, font, anchor)
+            boxes.append((left + px, top + py, right + px, bottom + py))
+        box = (min(b[0] for b in boxes), min(b[1] for b in boxes),
+               max(b[2] for b in boxes) + 1, max(b[3] for b in boxes) + 1)
+        composite_blurred_shadow(background_image, box, paint_shadow, shadow_blur)
 
         # Draw main text on top
         if letter_spacing > 0:
@@ -96,7 +135,7 @@ def create_welcome_image(member, member_count, family_name):
             for char in text:
                 for dx, dy in bold_offsets:
                     draw.text((x + x_offset + dx, y + dy), char, font=font, fill=fill, anchor=anchor)
-                x_offset += font.getlength(char) + letter_spacing
+                x_offset += text_metrics.text_length(char, font) + letter_spacing
         else:
             for dx, dy in bold_offsets:
                 draw.text((x + dx, y + dy), text, font=font, fill=fill, anchor=anchor)
@@ -124,9 +163,9 @@ def create_welcome_image(member, member_count, family_name):
 
     # --- Left text: member name and acc age ---
     # --- Left text: member name and acc age ---
-    total_days = (datetime.now(pytz.utc) - member.created_at).days
+    total_days = (datetime.now(pytz.utc) - created_at).days
 
-    left_top_text = str(member).upper()
+    left_top_text = member_name.upper()
     left_bottom_text = f"ACC AGE: {total_days:,} DAY(S)"
 
     left_center_x = avatar_x // 2
@@ -156,12 +195,8 @@ def create_welcome_image(member, member_count, family_name):
     draw_text_with_shadow(draw, (right_center_x, image_height // 2 - 30), right_top_text, font_main, (255, 255, 255), anchor="mm")
     draw_text_with_shadow(draw, (right_center_x, image_height // 2 + 30), right_bottom_text, font_main, (255, 255, 255), anchor="mm")
 
-    # --- Save output ---
-    os.makedirs("./assets/outputs", exist_ok=True)
-    output_path = "./assets/outputs/welcome.png"
-    background_image.save(output_path)
-
-    return output_path
+    # --- Encode output ---
+    return encode_image(background_image, "welcome")
 
 
 
@@ -173,7 +208,7 @@ from PIL import ImageDraw, Image, ImageFilter
 def generate_fam_weekly_stats_report(
     start_date: date,
     end_date: date,
-    output_path: str = "./assets/outputs/weekly_report.png",
+    output_path: str | None = None,
     # Weekly stats
     weekly_points: int = 0,
     weekly_contributors: int = 0,
@@ -197,44 +232,37 @@ def generate_fam_weekly_stats_report(
     overall_pts_per_member_rank: int = 0,
     overall_pts_per_member_rank_total: int = 0,
     overall_top5: list[dict] = None,  # [{"abbr": str, "first_name": str, "last_name": str, "points": int}]
-) -> str | None:
+) -> BytesIO | None:
     """
     Generate a weekly family stats report image.
 
     Returns:
-        str | None: Path of saved image if successful, None otherwise.
+        BytesIO | None: Encoded image (also saved to output_path if given), None on failure.
     """
     try:
-        # --- Load images ---
-        background = Image.open("./assets/backgrounds/810_670.png").convert("RGBA")
-        overlay = Image.open("./assets/overlays/weekly_reports_overlay.png").convert("RGBA")
-        background = background.resize((810, 670))
-        overlay = overlay.resize((810, 670))
+        # --- Template: background + 50% overlay, composited once per asset version ---
+        bg_path = "./assets/backgrounds/810_670.png"
+        overlay_path = "./assets/overlays/weekly_reports_overlay.png"
 
-        # --- Add semi-transparent black layer ---
-        # New code
-        background = background.convert("RGBA")
-        #black_layer = Image.new("RGBA", background.size, (0, 0, 0, int(255 * 0.35)))
-        #background = Image.alpha_composite(background, black_layer)
+        def bake_template():
+            layer = asset_cache.load_image(bg_path, size=(810, 670))
 
+            # --- Add semi-transparent black layer ---
+            #black_layer = Image.new("RGBA", layer.size, (0, 0, 0, int(255 * 0.35)))
+            #layer = Image.alpha_composite(layer, black_layer)
 
-        # --- Set overlay opacity to 35% ---
-        alpha = overlay.split()[3]  # get alpha channel
-        alpha = alpha.point(lambda p: int(p * 0.50))  # reduce overlay opacity to 35%
-        overlay.putalpha(alpha)
+            # Paste overlay with 50% opacity on top of background
+            overlay = asset_cache.load_image(overlay_path, opacity=0.50, size=(810, 670))
+            return Image.alpha_composite(layer, overlay)
 
-        # Paste overlay with new opacity on top of background+black layer
-        background = Image.alpha_composite(background, overlay)
+        background = asset_cache.get_layer(("weekly_report",), bake_template, deps=(bg_path, overlay_path))
 
         draw = ImageDraw.Draw(background)
         font_path = "./assets/fonts/georgiaref.ttf"
 
-        # --- Font cache helper ---
-        fonts = {}
+        # --- Font helper (fonts come from the shared asset cache) ---
         def get_font(size: int) -> ImageFont.FreeTypeFont:
-            if size not in fonts:
-                fonts[size] = ImageFont.truetype(font_path, size)
-            return fonts[size]
+            return asset_cache.get_font(font_path, size)
         
         
 
@@ -263,30 +291,32 @@ def generate_fam_weekly_stats_report(
             font = get_font(font_size)
 
             # Calculate total text width with letter spacing
-            text_width = sum(font.getlength(char) + letter_spacing for char in text) - letter_spacing
+            text_width = sum(text_metrics.text_length(char, font) + letter_spacing for char in text) - letter_spacing
             x = (image.width - text_width) // 2 if x_override is None else x_override
 
             # --- Draw shadow if requested ---
             if shadow_opacity > 0:
-                shadow_layer = Image.new("RGBA", image.size, (0, 0, 0, 0))
-                shadow_draw = ImageDraw.Draw(shadow_layer)
                 shadow_alpha = int(shadow_opacity / 100 * 255)
                 shadow_fill = (*shadow_color, shadow_alpha)
 
-                x_offset = 0
                 shadow_distance = 4
                 offsets = [(0,0)]
                 if bold:
                     offsets += [(1,0),(0,1),(1,1)]  # only add extra offsets if bold
 
-                for char in text:
-                    for dx, dy in offsets:
-                        shadow_draw.text((x + x_offset + shadow_distance + dx, y + shadow_distance + dy),
-                                        char, font=font, fill=shadow_fill)
-                    x_offset += font.getlength(char) + letter_spacing
+                def paint_shadow(shadow_draw, ox, oy):
+                    x_offset = 0
+                    for char in text:
+                        for dx, dy in offsets:
+                            shadow_draw.text((x + x_offset + shadow_distance + dx - ox, y + shadow_distance + dy - oy),
+                                            char, font=font, fill=shadow_fill)
+                        x_offset += text_metrics.text_length(char, font) + letter_spacing
 
-                shadow_layer = shadow_layer.filter(ImageFilter.GaussianBlur(radius=shadow_blur))
-                image.alpha_composite(shadow_layer)
+                # blurred only within the text's bounding box, not the whole canvas
+                _, top, _, bottom = font.getbbox(text)
+                box = (x + shadow_distance, y + shadow_distance + top,
+                       x + shadow_distance + text_width + 2, y + shadow_distance + bottom + 2)
+                composite_blurred_shadow(image, box, paint_shadow, shadow_blur)
 
             # --- Draw main text ---
             x_offset = 0
@@ -297,7 +327,7 @@ def generate_fam_weekly_stats_report(
             for char in text:
                 for dx, dy in offsets:
                     draw.text((x + x_offset + dx, y + dy), char, font=font, fill=fill)
-                x_offset += font.getlength(char) + letter_spacing
+                x_offset += text_metrics.text_length(char, font) + letter_spacing
 
 
 
@@ -352,11 +382,11 @@ def generate_fam_weekly_stats_report(
 
         font_sub = get_font(16)
         left_text = "TOP 5 WEEKLY MEMBERS"
-        lw = draw.textbbox((0, 0), left_text, font=font_sub)[2]
+        lw = text_metrics.text_width(left_text, font_sub)
         draw.text((left_x_line - lw // 2, 347), left_text, font=font_sub, fill="white")
 
         right_text = "TOP 5 OVERALL MEMBERS"
-        rw = draw.textbbox((0, 0), right_text, font=font_sub)[2]
+        rw = text_metrics.text_width(right_text, font_sub)
         draw.text((right_x_line - rw // 2, 347), right_text, font=font_sub, fill="white")
 
         # --- Top 5 weekly members ---
@@ -386,7 +416,7 @@ def generate_fam_weekly_stats_report(
             y_pos = y_start + idx * y_spacing
             draw.text((x_left_weekly, y_pos), prefix_text, font=font_member, fill="white")
 
-            points_bbox = draw.textbbox((0, 0), points, font=font_member)
+            points_bbox = text_metrics.text_bbox(points, font_member)
             points_width = points_bbox[2] - points_bbox[0]
             draw.text((x_points_weekly - points_width, y_pos), points, font=font_member, fill="white")
 
@@ -417,21 +447,18 @@ def generate_fam_weekly_stats_report(
             y_pos = y_start + idx * y_spacing
             draw.text((x_left_overall, y_pos), prefix_text, font=font_member, fill="white")
 
-            points_bbox = draw.textbbox((0, 0), points, font=font_member)
+            points_bbox = text_metrics.text_bbox(points, font_member)
             points_width = points_bbox[2] - points_bbox[0]
             draw.text((x_points_overall - points_width, y_pos), points, font=font_member, fill="white")
 
             
         # Open base image (assuming you have it as `base_img`)
-        overlay = Image.open("./assets/resources/kuromi_logo_with_white_bg.png").convert("RGBA")
-        overlay = overlay.resize((73, 73))
+        overlay = asset_cache.load_image("./assets/resources/kuromi_logo_with_white_bg.png", size=(73, 73))
         background.paste(overlay, (725, 585), overlay)  # use overlay as mask for transparency
 
 
-        # --- Save image ---
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        background.save(output_path)
-        return output_path if os.path.exists(output_path) else None
+        # --- Encode image (persisted too when output_path is given) ---
+        return encode_image(background, "weekly_report", save_to=output_path)
 
     except Exception as e:
         print(f"[ERROR] Failed to generate weekly stats report: {e}")
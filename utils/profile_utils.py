@@ -1,43 +1,133 @@
 import os
-import aiohttp
 from io import BytesIO
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
-from utils.image_generator import draw_text_with_blurred_shadow
-
-import json
+from utils.image_generator import draw_text_with_blurred_shadow, composite_blurred_shadow
+from utils import asset_cache, http_client, render_scheduler
+from utils.psid_index import get_user_id_by_psid
+from utils.render_cache import RenderCache, render_key_digest
+from utils.image_output import encode_image, buffer_from_bytes, output_format
+from utils.text_metrics import text_size
+
+PROFILE_BG_PATH = "assets/backgrounds/860_538_1.png"
+PROFILE_OVERLAY_PATH = "assets/overlays/profile_overlay.png"
+PROFILE_FONT_HEAVY_PATH = "assets/fonts/Nexa-Heavy.ttf"
+PROFILE_FONT_EXTRA_LIGHT_PATH = "assets/fonts/Nexa-ExtraLight.ttf"
+
+# Bump whenever the card's layout / drawing code changes, so cached cards re-render
+PROFILE_TEMPLATE_VERSION = 1
+
+PROFILE_STAT_COORDS = {
+    "Total Points": (149, 230),
+    "Events Attended": (432, 230),
+    "Missed Events": (707, 230),
+    "Global Points Ranking": (149, 315),
+    "Family Points Ranking": (432, 315),
+    "Mem. Type Points Ranking": (707, 315),
+    "GM Attendance": (149, 403),
+    "TLP Attendance": (432, 403),
+    "Sales Events": (707, 403)
+}
+PROFILE_INFO_FIELDS = ("Family", "Mem. Type", "Birthday", "Graduation Year", "Verified On")
+# every stats key the card draws (the render cache key covers exactly these)
+PROFILE_STAT_FIELDS = tuple(PROFILE_STAT_COORDS) + PROFILE_INFO_FIELDS
+
+# Encoded cards: 16 MB in memory, 128 MB on disk
+PROFILE_RENDER_CACHE = RenderCache(
+    os.path.join("assets", "outputs", "render_cache", "profile"),
+    ext=".img",
+    max_memory_bytes=16 * 1024 * 1024,
+    max_disk_bytes=128 * 1024 * 1024,
+)
+
+
+async def generate_profile_image(stats: dict, title_text: str, footer_text: str, config: dict, interaction) -> BytesIO:
+    """
+    Returns the profile card for `stats` as an encoded buffer (profile_card.png
+    / .webp). Cards are served from PROFILE_RENDER_CACHE when nothing they
+    show (template, stats, title / footer, avatar) changed; otherwise
+    rendered and cached.
 
-async def generate_profile_image(stats: dict, title_text: str, footer_text: str, config: dict, interaction) -> str:
+    Not wired into a command yet: /profile still replies with an embed, so
+    the cache only serves traffic once a caller builds this stats dict.
+    """
     #print(f"Users stats dict: {stats}")
-    bg_path = "assets/backgrounds/860_538_1.png"
-    overlay_path = "assets/overlays/profile_overlay.png"
-    font_heavy_path = "assets/fonts/Nexa-Heavy.ttf"
-    font_extra_light_path = "assets/fonts/Nexa-ExtraLight.ttf"
-    output_dir = "assets/outputs"
-    os.makedirs(output_dir, exist_ok=True)
-    out_path = os.path.join(output_dir, "profile_card.png")
+    avatar_url = await _resolve_avatar_url(stats, interaction)
+    key = _profile_render_key(stats, title_text, footer_text, avatar_url)
+
+    data = await PROFILE_RENDER_CACHE.get(key)
+    if data is None:
+        data, complete = await _render_profile_card(
+            stats, title_text, footer_text, avatar_url,
+            # identical requests arriving together share one render
+            coalesce_key=("profile_card", render_key_digest(key)),
+        )
+        # a card missing its avatar (fetch failed) is not cached
+        if complete:
+            await PROFILE_RENDER_CACHE.put(key, data)
+    return buffer_from_bytes(data, "profile_card")
+
+
+def _profile_render_key(stats: dict, title_text: str, footer_text: str, avatar_url: str | None) -> list:
+    # Discord avatar / icon URLs embed the image hash, so the URL identifies the avatar
+    return [
+        PROFILE_TEMPLATE_VERSION,
+        output_format(),
+        asset_cache.asset_versions(PROFILE_BG_PATH, PROFILE_OVERLAY_PATH, PROFILE_FONT_HEAVY_PATH, PROFILE_FONT_EXTRA_LIGHT_PATH),
+        title_text,
+        footer_text,
+        [[field, stats.get(field, "N/A")] for field in PROFILE_STAT_FIELDS],
+        avatar_url,
+    ]
+
+
+async def _render_profile_card(stats: dict, title_text: str, footer_text: str, avatar_url: str | None,
+                               coalesce_key=None) -> tuple[bytes, bool]:
+    """Fetches the avatar, then draws the card on a render slot; returns (encoded bytes, whether the avatar made it in)."""
+    avatar_img = None
+    complete = True
+    if avatar_url:
+        try:
+            avatar_img = await http_client.fetch_image(avatar_url)
+        except Exception as e:
+            print(f"[Profile] Failed to fetch avatar {avatar_url}: {e}")
+            complete = False
+
+    data = await render_scheduler.submit(
+        _compose_profile_card, stats, title_text, footer_text, avatar_img,
+        priority=render_scheduler.PRIORITY_INTERACTIVE,
+        key=coalesce_key,
+    )
+    return data, complete
 
-    # Load base image and overlay
-    bg = Image.open(bg_path).convert("RGBA")
-    overlay = Image.open(overlay_path).convert("RGBA")
 
-    # Reduce overlay opacity to 50% safely
-    alpha = overlay.split()[3]  # Get the alpha channel
-    alpha = alpha.point(lambda p: int(p * 0.55))  # Cast to int
-    overlay.putalpha(alpha)
+def _compose_profile_card(stats: dict, title_text: str, footer_text: str, avatar_img) -> bytes:
+    """Draws and encodes the card from already-fetched inputs (no I/O)."""
+    bg_path = PROFILE_BG_PATH
+    overlay_path = PROFILE_OVERLAY_PATH
+    font_heavy_path = PROFILE_FONT_HEAVY_PATH
+    font_extra_light_path = PROFILE_FONT_EXTRA_LIGHT_PATH
 
-    bg.paste(overlay, (0, 0), overlay)
+    # Load base image and overlay
+    # Background + 55% overlay, composited once per asset version
+    def bake_template():
+        layer = asset_cache.load_image(bg_path)
+        overlay = asset_cache.load_image(overlay_path, opacity=0.55)
+        layer.paste(overlay, (0, 0), overlay)
+        return layer
+
+    bg = asset_cache.get_layer(("profile_card",), bake_template, deps=(bg_path, overlay_path))
 
     draw = ImageDraw.Draw(bg)
 
     # Font setup
-    font_label = ImageFont.truetype(font_extra_light_path, 15)
-    font_value = ImageFont.truetype(font_heavy_path, 26)  # Use ExtraLight for stat values
-    font_title = ImageFont.truetype(font_heavy_path, 40)
-    font_footer = ImageFont.truetype(font_heavy_path, 14)
-    font_info = ImageFont.truetype(font_extra_light_path, 18)  # For additional info lines
+    font_label = asset_cache.get_font(font_extra_light_path, 15)
+    font_value = asset_cache.get_font(font_heavy_path, 26)  # Use ExtraLight for stat values
+    font_title = asset_cache.get_font(font_heavy_path, 40)
+    font_footer = asset_cache.get_font(font_heavy_path, 14)
+    font_info = asset_cache.get_font(font_extra_light_path, 18)  # For additional info lines
 
     # TITLE (moved 20 px right)
-    title_w, _ = draw.textsize(title_text, font=font_title)
+    title_w, _ = text_size(title_text, font_title)
     draw_text_with_blurred_shadow(
         bg,
         (567 - title_w // 2, 14),
@@ -48,99 +138,47 @@ async def generate_profile_image(stats: dict, title_text: str, footer_text: str,
         bold=False  # title normal
     )
 
-    # AVATAR / SERVER ICON logic
-    # AVATAR / SERVER ICON logic
-    avatar_box = (63, 25, 63 + 180, 25 + 180)
-    avatar_url = None
+    # AVATAR / SERVER ICON
+    if avatar_img is not None:
+        mask_width, mask_height = 263, 201
 
-    # Try Discord user ID from stats first
-    discord_user_id = stats.get("discord_user_id")
+        # Calculate resize scale to cover the rectangle without stretching
+        avatar_w, avatar_h = avatar_img.size
+        scale = max(mask_width / avatar_w, mask_height / avatar_h)
+        new_w = int(avatar_w * scale)
+        new_h = int(avatar_h * scale)
 
-    # If no discord_user_id but PSID exists, look it up in verification DB JSON
-    if not discord_user_id and stats.get("psid"):
-        try:
-            db_path = config.get("verification", {}).get("member_database_file_path", "vsa_user_database.json")
-            with open(db_path, "r") as f:
-                verified_data = json.load(f)
-            for uid_str, data in verified_data.items():
-                if data.get("student_info", {}).get("people_soft_id") == stats["psid"]:
-                    discord_user_id = int(uid_str)
-                    break
-        except Exception:
-            pass
+        # Resize while preserving aspect ratio
+        avatar_img = avatar_img.resize((new_w, new_h), Image.LANCZOS)
 
-    avatar_url = None
-    #print(f"Uers discord id: {discord_user_id}")
+        # Center crop to exact size
+        left = (new_w - mask_width) // 2
+        top = (new_h - mask_height) // 2
+        right = left + mask_width
+        bottom = top + mask_height
+        avatar_img = avatar_img.crop((left, top, right, bottom))
 
-    if discord_user_id and interaction.guild:
-        try:
-            user = interaction.guild.get_member(discord_user_id)
-            if user is None:
-                user = await interaction.guild.fetch_member(discord_user_id)
+        # Create shadow behind avatar (blurred rounded rectangle, blurred locally)
+        rect_xy = (21, 14, 21 + mask_width, 14 + mask_height)
 
-            if user and user.display_avatar:
-                avatar_url = user.display_avatar.url
-        except Exception:
-            pass
+        def paint_shadow(temp_draw, ox, oy):
+            temp_draw.rounded_rectangle(
+                (rect_xy[0] - ox, rect_xy[1] - oy, rect_xy[2] - ox, rect_xy[3] - oy),
+                radius=10, fill=(0, 0, 0, 128)
+            )
 
-    if avatar_url is None:
-        if interaction.guild and interaction.guild.icon:
-            avatar_url = interaction.guild.icon.url
+        composite_blurred_shadow(bg, rect_xy, paint_shadow, 6)
 
+        # Create rounded rectangle mask
+        mask = Image.new("L", (mask_width, mask_height), 0)
+        mask_draw = ImageDraw.Draw(mask)
+        mask_draw.rounded_rectangle((0, 0, mask_width, mask_height), radius=10, fill=255)
 
-    if avatar_url:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(avatar_url) as resp:
-                if resp.status == 200:
-                    avatar_bytes = await resp.read()
-                    avatar_img = Image.open(BytesIO(avatar_bytes)).convert("RGBA")
-
-                    mask_width, mask_height = 263, 201
-
-                    # Calculate resize scale to cover the rectangle without stretching
-                    avatar_w, avatar_h = avatar_img.size
-                    scale = max(mask_width / avatar_w, mask_height / avatar_h)
-                    new_w = int(avatar_w * scale)
-                    new_h = int(avatar_h * scale)
-
-                    # Resize while preserving aspect ratio
-                    avatar_img = avatar_img.resize((new_w, new_h), Image.LANCZOS)
-
-                    # Center crop to exact size
-                    left = (new_w - mask_width) // 2
-                    top = (new_h - mask_height) // 2
-                    right = left + mask_width
-                    bottom = top + mask_height
-                    avatar_img = avatar_img.crop((left, top, right, bottom))
-
-                    # Create shadow behind avatar (blurred rounded rectangle)
-                    shadow = Image.new("RGBA", bg.size, (0, 0, 0, 0))
-                    temp_draw = ImageDraw.Draw(shadow)
-                    rect_xy = (21, 14, 21 + mask_width, 14 + mask_height)
-                    temp_draw.rounded_rectangle(rect_xy, radius=10, fill=(0, 0, 0, 128))
-                    blurred_shadow = shadow.filter(ImageFilter.GaussianBlur(6))
-                    bg = Image.alpha_composite(bg, blurred_shadow)
-
-                    # Create rounded rectangle mask
-                    mask = Image.new("L", (mask_width, mask_height), 0)
-                    mask_draw = ImageDraw.Draw(mask)
-                    mask_draw.rounded_rectangle((0, 0, mask_width, mask_height), radius=10, fill=255)
-
-                    # Paste avatar onto background using the rounded rectangle mask
-                    bg.paste(avatar_img, (21, 14), mask)
+        # Paste avatar onto background using the rounded rectangle mask
+        bg.paste(avatar_img, (21, 14), mask)
 
     # STAT TEXT COORDS
-    coords = {
-        "Total Points": (149, 230),
-        "Events Attended": (432, 230),
-        "Missed Events": (707, 230),
-        "Global Points Ranking": (149, 315),
-        "Family Points Ranking": (432, 315),
-        "Mem. Type Points Ranking": (707, 315),
-        "GM Attendance": (149, 403),
-        "TLP Attendance": (432, 403),
-        "Sales Events": (707, 403)
-    }
+    coords = PROFILE_STAT_COORDS
 
     def ordinalize(n):
         try:
@@ -169,8 +207,8 @@ async def generate_profile_image(stats: dict, title_text: str, footer_text: str,
         label_y = cy + 3
         value_y = label_y + 25
 
-        lw, _ = draw.textsize(label, font=font_label)
-        vw, _ = draw.textsize(value, font=font_value)
+        lw, _ = text_size(label, font_label)
+        vw, _ = text_size(value, font_value)
 
         draw_text_with_blurred_shadow(
             bg,
@@ -219,7 +257,7 @@ async def generate_profile_image(stats: dict, title_text: str, footer_text: str,
 
     # FOOTER
     if footer_text:
-        fw, _ = draw.textsize(footer_text, font=font_footer)
+        fw, _ = text_size(footer_text, font_footer)
         draw_text_with_blurred_shadow(
             bg,
             ((bg.width - fw) // 2, 498),
@@ -230,9 +268,40 @@ async def generate_profile_image(stats: dict, title_text: str, footer_text: str,
             bold=False  # footer normal
         )
 
-    # SAVE output
-    bg.save(out_path)
-    return out_path
+    # ENCODE output
+    return encode_image(bg, "profile_card").getvalue()
+
+
+async def _resolve_avatar_url(stats: dict, interaction) -> str | None:
+    """Member's display avatar (via discord_user_id or the PSID index), else the server icon."""
+    # Try Discord user ID from stats first
+    discord_user_id = stats.get("discord_user_id")
+
+    # If no discord_user_id but PSID exists, look it up in the PSID index
+    if not discord_user_id and stats.get("psid"):
+        uid_str = get_user_id_by_psid(stats["psid"])
+        if uid_str:
+            discord_user_id = int(uid_str)
+
+    avatar_url = None
+    #print(f"Uers discord id: {discord_user_id}")
+
+    if discord_user_id and interaction.guild:
+        try:
+            user = interaction.guild.get_member(discord_user_id)
+            if user is None:
+                user = await interaction.guild.fetch_member(discord_user_id)
+
+            if user and user.display_avatar:
+                avatar_url = user.display_avatar.url
+        except Exception:
+            pass
+
+    if avatar_url is None:
+        if interaction.guild and interaction.guild.icon:
+            avatar_url = interaction.guild.icon.url
+
+    return avatar_url
 
 
 
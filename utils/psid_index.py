@@ -0,0 +1,132 @@
+"""
+psid_index.py
+
+Secondary index over the verified users in the shared user store:
+ - psid            -> Discord user id
+ - Discord user id -> psid
+ - instagram handle (lowercase, no "@") -> psid
+
+Built lazily on first lookup, then kept in sync through the user store's
+change listener: single-record changes update the maps in O(1), whole-section
+replacements or reloads just drop the index so the next lookup rebuilds it.
+"""
+from utils.user_store import user_store
+
+VERIFIED = "verified_users"
+
+
+def _normalize_psid(psid) -> str | None:
+    if psid is None:
+        return None
+    psid = str(psid).strip()
+    return psid or None
+
+
+def _normalize_instagram(handle) -> str | None:
+    if not handle:
+        return None
+    handle = str(handle).strip().lstrip("@").lower()
+    if not handle or handle in ("null", "none", "n/a"):
+        return None
+    return handle
+
+
+class PsidIndex:
+    def __init__(self, store):
+        self._store = store
+        self._built = False
+        self._psid_to_user: dict[str, str] = {}
+        self._user_to_psid: dict[str, str] = {}
+        self._instagram_to_psid: dict[str, str] = {}
+        self._user_to_instagram: dict[str, str] = {}
+        store.add_listener(self._on_store_change)
+
+    # --- Maintenance ---
+    def _on_store_change(self, section, user_id):
+        if not self._built or section not in (None, VERIFIED):
+            return
+        if user_id is None:
+            self._built = False  # rebuilt on next lookup
+            return
+        self._drop_user(user_id)
+        record = self._store.section(VERIFIED).get(user_id)
+        if record is not None:
+            self._add_user(user_id, record)
+
+    def _add_user(self, user_id: str, record: dict):
+        general = record.get("general", {}) or {}
+        psid = _normalize_psid(general.get("psid"))
+        if psid is None:
+            return
+        self._psid_to_user[psid] = user_id
+        self._user_to_psid[user_id] = psid
+        handle = _normalize_instagram(general.get("instagram"))
+        if handle:
+            self._instagram_to_psid[handle] = psid
+            self._user_to_instagram[user_id] = handle
+
+    def _drop_user(self, user_id: str):
+        psid = self._user_to_psid.pop(user_id, None)
+        if psid is not None and self._psid_to_user.get(psid) == user_id:
+            del self._psid_to_user[psid]
+        handle = self._user_to_instagram.pop(user_id, None)
+        if handle is not None and self._instagram_to_psid.get(handle) == psid:
+            del self._instagram_to_psid[handle]
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        self._psid_to_user.clear()
+        self._user_to_psid.clear()
+        self._instagram_to_psid.clear()
+        self._user_to_instagram.clear()
+        for user_id, record in self._store.section(VERIFIED).items():
+            self._add_user(user_id, record)
+        self._built = True
+
+    # --- Lookups ---
+    def user_id_for_psid(self, psid) -> str | None:
+        self._ensure_built()
+        return self._psid_to_user.get(_normalize_psid(psid))
+
+    def psid_for_user_id(self, user_id) -> str | None:
+        self._ensure_built()
+        return self._user_to_psid.get(str(user_id))
+
+    def psid_for_instagram(self, handle) -> str | None:
+        self._ensure_built()
+        return self._instagram_to_psid.get(_normalize_instagram(handle))
+
+    def record_for_psid(self, psid) -> dict | None:
+        user_id = self.user_id_for_psid(psid)
+        if user_id is None:
+            return None
+        return self._store.section(VERIFIED).get(user_id)
+
+
+psid_index = PsidIndex(user_store)
+
+
+# --- Module-level helpers ---
+def get_user_id_by_psid(psid) -> str | None:
+    """Discord user id (str) of the verified user with this PSID, or None."""
+    return psid_index.user_id_for_psid(psid)
+
+
+def get_psid_by_user_id(user_id) -> str | None:
+    """PSID linked to a Discord user id, or None if not verified."""
+    return psid_index.psid_for_user_id(user_id)
+
+
+def get_psid_by_instagram(handle) -> str | None:
+    """PSID linked to an Instagram handle (case-insensitive, "@" optional), or None."""
+    return psid_index.psid_for_instagram(handle)
+
+
+def get_verified_record_by_psid(psid) -> dict | None:
+    """Full verified user record for a PSID, or None."""
+    return psid_index.record_for_psid(psid)
+
+
+def is_psid_verified(psid) -> bool:
+    return get_user_id_by_psid(psid) is not None
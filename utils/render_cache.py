@@ -0,0 +1,169 @@
+"""
+render_cache.py
+
+Encoded-image result cache for renderers whose output depends only on a
+small set of inputs (profile cards: template version + stats + avatar).
+
+RenderCache keeps finished, encoded image bytes in two tiers, both keyed by
+a hash of the caller's render key:
+
+ - memory: byte-bounded LRU
+ - disk:   one <sha256><ext> per key under `disk_dir`, byte-bounded; the
+           least recently used files are deleted first. Survives restarts:
+           the directory is scanned once (LRU order from mtimes, touched on
+           every hit), after that usage is tracked as a running total.
+
+get() / put() are coroutines: memory hits are answered on the loop, disk
+reads, writes and evictions run in a worker thread.
+
+A render key must include everything that affects the pixels; anything
+else (e.g. a template edit) is handled by putting a version in the key.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+def render_key_digest(key) -> str:
+    """Stable hex digest of a JSON-serializable render key."""
+    blob = json.dumps(key, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    def __init__(self, disk_dir: str | None, max_memory_bytes: int, max_disk_bytes: int, ext: str = ".png"):
+        self.disk_dir = disk_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.ext = ext
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_total = 0
+        self._lock = threading.Lock()
+        # digest -> file size, least recently used first; None until the first disk access
+        self._disk_index: "OrderedDict[str, int] | None" = None
+        self._disk_total = 0
+        self._disk_lock = threading.Lock()
+
+    # --- Memory tier ---
+    def _memory_get(self, digest: str) -> bytes | None:
+        with self._lock:
+            data = self._memory.get(digest)
+            if data is not None:
+                self._memory.move_to_end(digest)
+            return data
+
+    def _memory_put(self, digest: str, data: bytes):
+        if len(data) > self.max_memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(digest, None)
+            if old is not None:
+                self._memory_total -= len(old)
+            self._memory[digest] = data
+            self._memory_total += len(data)
+            while self._memory_total > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_total -= len(evicted)
+
+    # --- Disk tier ---
+    def _disk_path(self, digest: str) -> str:
+        return os.path.join(self.disk_dir, digest + self.ext)
+
+    def _load_disk_index(self):
+        """Build the LRU index from one directory scan (caller holds _disk_lock)."""
+        if self._disk_index is not None:
+            return
+        entries = []
+        try:
+            with os.scandir(self.disk_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(self.ext):
+                        st = entry.stat()
+                        entries.append((st.st_mtime_ns, entry.name[:-len(self.ext)], st.st_size))
+        except FileNotFoundError:
+            pass
+        self._disk_index = OrderedDict((digest, size) for _, digest, size in sorted(entries))
+        self._disk_total = sum(size for _, _, size in entries)
+
+    def _disk_get(self, digest: str) -> bytes | None:
+        path = self._disk_path(digest)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # keeps the LRU order across restarts
+        except OSError:
+            with self._disk_lock:
+                if self._disk_index is not None and digest in self._disk_index:
+                    self._disk_total -= self._disk_index.pop(digest)  # removed behind our back
+            return None
+        with self._disk_lock:
+            self._load_disk_index()
+            if digest not in self._disk_index:
+                self._disk_index[digest] = len(data)
+                self._disk_total += len(data)
+            self._disk_index.move_to_end(digest)
+        return data
+
+    def _disk_put(self, digest: str, data: bytes):
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self._disk_path(digest)
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[RenderCache] Failed to write {self.disk_dir}: {e}")
+            return
+        with self._disk_lock:
+            self._load_disk_index()
+            self._disk_total -= self._disk_index.pop(digest, 0)
+            self._disk_index[digest] = len(data)
+            self._disk_total += len(data)
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Delete least recently used files until under max_disk_bytes (caller holds _disk_lock)."""
+        while self._disk_total > self.max_disk_bytes and self._disk_index:
+            digest, size = self._disk_index.popitem(last=False)
+            self._disk_total -= size
+            try:
+                os.remove(self._disk_path(digest))
+            except OSError:
+                pass
+
+    # --- Public API ---
+    async def get(self, key) -> bytes | None:
+        """Encoded image for `key`, from memory or disk; None on a miss."""
+        digest = render_key_digest(key)
+        data = self._memory_get(digest)
+        if data is None and self.disk_dir:
+            data = await asyncio.to_thread(self._disk_get, digest)
+            if data is not None:
+                self._memory_put(digest, data)
+        return data
+
+    async def put(self, key, data: bytes):
+        digest = render_key_digest(key)
+        self._memory_put(digest, data)
+        if self.disk_dir:
+            await asyncio.to_thread(self._disk_put, digest, data)
+
+    def clear(self, disk: bool = False):
+        """Drop the memory tier (and every cached file, with disk=True)."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_total = 0
+        if disk and self.disk_dir and os.path.isdir(self.disk_dir):
+            with self._disk_lock:
+                self._disk_index = None
+                self._disk_total = 0
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(self.ext):
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
@@ -0,0 +1,193 @@
+"""
+render_scheduler.py
+
+Central admission control for Pillow renders.
+
+Every image producer (profile cards, welcome banners, family cards, weekly
+reports, leaderboard pages) submits its CPU-bound compose step here instead
+of calling asyncio.to_thread / run_in_executor directly:
+
+ - concurrency cap: at most `max_concurrency` renders run at once
+   (config["features"]["rendering"]["max_concurrent_renders"], default:
+   CPUs, max 4); the rest wait
+ - priority: waiting renders are started lowest PRIORITY_* first, so an
+   interactive /profile jumps ahead of queued leaderboard regeneration;
+   FIFO within a priority
+ - coalescing: submits with the same `key` while one is queued or running
+   share its result instead of rendering twice
+ - metrics: queue depth per priority, running count, peak depth, wait
+   times (stats() / summary(); MemoryMonitor reports them)
+"""
+import asyncio
+import heapq
+import inspect
+import itertools
+import json
+import os
+import time
+
+PRIORITY_INTERACTIVE = 0   # a user is waiting on the reply (commands, member join)
+PRIORITY_SCHEDULED = 5     # periodic posts (weekly report)
+PRIORITY_BACKGROUND = 10   # cache regeneration (leaderboard pages)
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_SCHEDULED: "scheduled",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+class RenderScheduler:
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._running = 0
+        self._waiters: list = []            # heap of [priority, seq, future]
+        self._seq = itertools.count()
+        self._inflight: dict = {}           # coalescing key -> future of the shared result
+
+        # metrics
+        self._queued_by_priority: dict[int, int] = {}
+        self.peak_queue_depth = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.coalesced = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # --- Slots ---
+    async def _acquire(self, priority: int):
+        if self._running < self.max_concurrency and self.queue_depth == 0:
+            self._running += 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._seq), fut]
+        heapq.heappush(self._waiters, entry)
+        self._queued_by_priority[priority] = self._queued_by_priority.get(priority, 0) + 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        try:
+            await fut  # resolved by _release, which hands its slot over
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release()  # slot was handed to us just as we got cancelled
+            else:
+                entry[2] = None  # skipped when popped
+                self._queued_by_priority[priority] -= 1
+            raise
+
+    def _release(self):
+        while self._waiters:
+            priority, _, fut = heapq.heappop(self._waiters)
+            if fut is not None and not fut.done():
+                self._queued_by_priority[priority] -= 1
+                fut.set_result(None)  # slot passes straight to the next waiter
+                return
+        self._running -= 1
+
+    async def _run(self, fn, args, kwargs, priority: int, executor):
+        queued_at = time.monotonic()
+        await self._acquire(priority)
+        waited = time.monotonic() - queued_at
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        try:
+            if executor is not None:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(executor, lambda: fn(*args, **kwargs))
+            else:
+                result = await asyncio.to_thread(fn, *args, **kwargs)
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self._release()
+        self.completed += 1
+        return result
+
+    # --- Public API ---
+    async def submit(self, fn, *args, priority: int = PRIORITY_INTERACTIVE, key=None, executor=None, **kwargs):
+        """
+        Run `fn(*args, **kwargs)` once a render slot is free and return its
+        result. Plain functions run on a worker thread (or on `executor`,
+        e.g. the leaderboard process pool). Coroutine functions are rejected:
+        fetch inputs on the event loop first and submit only the compose
+        step, so network latency never holds a slot. With `key`, concurrent
+        submits of the same key share one run. Results may be shared, so don't mutate them
+        (BytesIO results: use getvalue(), not read()).
+        """
+        if inspect.iscoroutinefunction(fn):
+            raise TypeError(f"render jobs must be synchronous; fetch inputs before submitting {fn.__qualname__}")
+        self.submitted += 1
+        if key is None:
+            return await self._run(fn, args, kwargs, priority, executor)
+
+        shared = self._inflight.get(key)
+        if shared is not None:
+            self.coalesced += 1
+            return await asyncio.shield(shared)
+
+        task = asyncio.ensure_future(self._run(fn, args, kwargs, priority, executor))
+        self._inflight[key] = task
+        # shielded: a cancelled caller doesn't abort the render others are sharing
+        task.add_done_callback(lambda t: self._inflight.pop(key, None) if self._inflight.get(key) is t else None)
+        return await asyncio.shield(task)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(self._queued_by_priority.values())
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def stats(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "running": self._running,
+            "max_concurrency": self.max_concurrency,
+            "queued": {PRIORITY_NAMES.get(p, str(p)): n for p, n in sorted(self._queued_by_priority.items()) if n},
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "avg_wait_ms": round(self._wait_total / finished * 1000, 1) if finished else 0.0,
+            "max_wait_ms": round(self._wait_max * 1000, 1),
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        queued = ", ".join(f"{name}={n}" for name, n in s["queued"].items()) or "none"
+        return (f"[RENDER QUEUE] running {s['running']}/{s['max_concurrency']}, queued {s['queue_depth']} ({queued}), "
+                f"peak {s['peak_queue_depth']}, done {s['completed']} (+{s['coalesced']} coalesced, {s['failed']} failed), "
+                f"wait avg {s['avg_wait_ms']} ms / max {s['max_wait_ms']} ms")
+
+
+_scheduler: RenderScheduler | None = None
+
+
+def _configured_concurrency() -> int:
+    try:
+        with open("config.json", "r") as f:
+            cfg = json.load(f)
+        value = cfg.get("features", {}).get("rendering", {}).get("max_concurrent_renders")
+    except Exception:
+        value = None
+    if value is None:
+        value = min(4, os.cpu_count() or 1)
+    return max(1, int(value))
+
+
+def get_render_scheduler() -> RenderScheduler:
+    """The bot-wide scheduler, created on first use."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RenderScheduler(_configured_concurrency())
+    return _scheduler
+
+
+async def submit(fn, *args, priority: int = PRIORITY_INTERACTIVE, key=None, executor=None, **kwargs):
+    """Shortcut for get_render_scheduler().submit(...)."""
+    return await get_render_scheduler().submit(fn, *args, priority=priority, key=key, executor=executor, **kwargs)
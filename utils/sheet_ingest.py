@@ -0,0 +1,196 @@
+"""
+sheet_ingest.py
+
+Incremental ingest of the "Master Sheet" member rows.
+
+SheetIngestor keeps the previous raw row of every PSID. A refresh re-parses
+only rows whose cells differ and returns a SheetChangeSet describing what
+moved (members added / removed / updated, point deltas, new events, family
+tracker changes). If the event columns change other than by appending new
+ones, every row is re-parsed (full_rebuild).
+
+Consumers subscribe() to change sets instead of recomputing everything after
+each refresh; SheetsCacheUpdater publish()es one per changed fetch.
+"""
+import inspect
+
+
+def parse_member_row(row, n_events: int) -> dict:
+    """One deduped Master Sheet row -> parsed member dict (parsed cache layout)."""
+    psid   = row[0].strip()
+    first  = row[1].strip() if len(row) > 1 else ""
+    last   = row[2].strip() if len(row) > 2 else ""
+    role   = row[3].strip() if len(row) > 3 else ""
+    family = row[4].strip() if len(row) > 4 else "No Family"
+    try:
+        total_pts = int(row[5].strip())
+    except:
+        total_pts = 0
+
+    raw_vals     = row[6:]
+    event_points = [
+        int(raw_vals[i].strip()) if i < len(raw_vals) and raw_vals[i].strip().isdigit() else 0
+        for i in range(n_events)
+    ]
+
+    return {
+        "psid":         psid or "N/A",
+        "first_name":   first or "N/A",
+        "last_name":    last or "N/A",
+        "role_key":     role or "N/A",
+        "family_name":  family or "No Family",
+        "points":       total_pts,
+        "event_points": event_points
+    }
+
+
+# fields that matter to anything but point totals (names, role, family)
+PROFILE_FIELDS = ("first_name", "last_name", "role_key", "family_name")
+
+
+class SheetChangeSet:
+    """What changed between two ingests. PSIDs are strings."""
+
+    def __init__(self):
+        self.added: list[str] = []
+        self.removed: list[str] = []
+        self.updated: list[str] = []            # row cells changed (points and/or profile)
+        self.profile_changed: list[str] = []    # subset of updated: name / role / family changed
+        self.point_deltas: dict[str, int] = {}  # total-points change, incl. added (+) and removed (-)
+        self.new_events: list[str] = []
+        self.removed_events: list[str] = []
+        self.families_changed = False           # Family Tracker rows differ
+        self.full_rebuild = False               # first ingest or event columns re-ordered
+
+    @property
+    def members_changed(self) -> bool:
+        return bool(self.added or self.removed or self.updated)
+
+    @property
+    def roster_changed(self) -> bool:
+        """Members joined/left or had their name, role or family edited."""
+        return bool(self.added or self.removed or self.profile_changed)
+
+    @property
+    def changed_psids(self) -> set[str]:
+        return set(self.added) | set(self.removed) | set(self.updated)
+
+    def is_empty(self) -> bool:
+        return not (self.members_changed or self.new_events or self.removed_events
+                    or self.families_changed or self.full_rebuild)
+
+    def summary(self) -> str:
+        return (f"+{len(self.added)} -{len(self.removed)} ~{len(self.updated)} members, "
+                f"{len(self.new_events)} new event(s), families_changed={self.families_changed}, "
+                f"full_rebuild={self.full_rebuild}")
+
+
+class SheetIngestor:
+    def __init__(self):
+        self._rows: dict[str, tuple] = {}
+        self._members: dict[str, dict] = {}
+        self._event_titles: list[str] | None = None
+        self._family_rows: list | None = None
+
+    def ingest(self, member_rows, event_titles: list[str], family_rows) -> tuple[dict, SheetChangeSet]:
+        """
+        member_rows: deduped Master Sheet rows (one per PSID)
+        event_titles: valid event titles in column order
+        family_rows: raw Family Tracker rows
+        Returns (parsed_members_map, change_set).
+        """
+        cs = SheetChangeSet()
+        n_events = len(event_titles)
+
+        old_titles = self._event_titles
+        if old_titles is None or event_titles[:len(old_titles)] != old_titles:
+            # first run, or columns removed / re-ordered: positions no longer line up
+            cs.full_rebuild = True
+            old_set = set(old_titles or ())
+            new_set = set(event_titles)
+            cs.new_events = [t for t in event_titles if t not in old_set]
+            cs.removed_events = [t for t in (old_titles or ()) if t not in new_set]
+        else:
+            cs.new_events = list(event_titles[len(old_titles):])
+
+        cs.families_changed = family_rows != self._family_rows
+
+        old_rows, old_members = self._rows, self._members
+        new_rows: dict[str, tuple] = {}
+        members: dict[str, dict] = {}
+
+        for row in member_rows:
+            key = tuple(row)
+            psid = row[0].strip() or "N/A"
+            prev = old_members.get(psid)
+
+            if not cs.full_rebuild and prev is not None and old_rows.get(psid) == key:
+                # untouched row: reuse, padding event_points for appended events
+                member = prev
+                missing = n_events - len(prev["event_points"])
+                if missing > 0:
+                    member = {**prev, "event_points": prev["event_points"] + [0] * missing}
+            else:
+                member = parse_member_row(row, n_events)
+                if prev is None:
+                    cs.added.append(psid)
+                    if member["points"]:
+                        cs.point_deltas[psid] = member["points"]
+                elif old_rows.get(psid) != key:
+                    cs.updated.append(psid)
+                    delta = member["points"] - prev["points"]
+                    if delta:
+                        cs.point_deltas[psid] = delta
+                    if any(member[f] != prev[f] for f in PROFILE_FIELDS):
+                        cs.profile_changed.append(psid)
+
+            new_rows[psid] = key
+            members[psid] = member
+
+        for psid, prev in old_members.items():
+            if psid not in members:
+                cs.removed.append(psid)
+                if prev["points"]:
+                    cs.point_deltas[psid] = -prev["points"]
+
+        self._rows = new_rows
+        self._members = members
+        self._event_titles = list(event_titles)
+        self._family_rows = family_rows
+        return members, cs
+
+    def reset(self):
+        """Forget the previous state; the next ingest is a full rebuild."""
+        self.__init__()
+
+
+# --- Change set subscribers ---
+_subscribers = []
+
+
+def subscribe(callback):
+    """
+    Register `callback(change_set, parsed_cache)`, called after every refresh
+    that changed the sheet. May be a coroutine function.
+    """
+    if callback not in _subscribers:
+        _subscribers.append(callback)
+
+
+def unsubscribe(callback):
+    if callback in _subscribers:
+        _subscribers.remove(callback)
+
+
+async def publish(change_set: SheetChangeSet, parsed_cache: dict) -> bool:
+    """Run every subscriber; returns False if any of them raised."""
+    ok = True
+    for callback in list(_subscribers):
+        try:
+            result = callback(change_set, parsed_cache)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            ok = False
+            print(f"[SheetIngest] Subscriber {getattr(callback, '__qualname__', callback)} failed: {e}")
+    return ok
@@ -8,15 +8,15 @@ Shared functions for:
  - parsing Family‐Tracker data
  - parsing event titles
 """
-from datetime import datetime
 from utils import cache_utils
+from utils.psid_index import get_verified_record_by_psid
+from utils.event_matrix import get_event_matrix
 import json
 
 
 with open("config.json", "r") as f:
     config = json.load(f)
 VSA_PARSED_ALL_MEMBER_DATA_JSON_PATH = config["file_paths"]["parsed_vsa_member_data_and_events_info_file"]
-DISCORD_VERIFIED_MEMBERS_DB = config["file_paths"]["all_discord_user_member_database_json_path"]
 CONFIG_JSON_PATH = "config.json"
 
 
@@ -36,16 +36,13 @@ def get_instagram_by_psid(psid: str) -> str | None:
     Returns:
         str | None: The Instagram username if available, else None.
     """
-    data = load_json(DISCORD_VERIFIED_MEMBERS_DB)
-    verified_users = data.get("verified_users", {})
+    user = get_verified_record_by_psid(psid)
+    if user is None:
+        return None
 
-    for user in verified_users.values():
-        general = user.get("general", {})
-        if str(general.get("psid")) == str(psid):
-            ig = general.get("instagram")
-            if ig and str(ig).strip().lower() != "null":
-                return ig.strip()
-            return None
+    ig = user.get("general", {}).get("instagram")
+    if ig and str(ig).strip().lower() != "null":
+        return ig.strip()
     return None
     
 def get_pseudo_family_members() -> list[dict]:
@@ -199,8 +196,8 @@ def get_family_members(family_name: str) -> list[dict]:
     """
     Get all member records belonging to a specific family.
 
-    This function loads the parsed VSA member data JSON (defined by
-    VSA_PARSED_ALL_MEMBER_DATA_JSON_PATH) and searches the "parsed_members"
+    This function reads the parsed VSA member data snapshot (defined by
+    VSA_PARSED_ALL_MEMBER_DATA_JSON_PATH, via cache_utils) and searches the "parsed_members"
     section. It collects the full member dictionaries for all members whose
     "family_name" matches the provided family_name argument.
 
@@ -215,7 +212,7 @@ def get_family_members(family_name: str) -> list[dict]:
         - Members with empty or null "family_name" are ignored.
         - Family name comparison is case-insensitive.
     """
-    data = load_json(VSA_PARSED_ALL_MEMBER_DATA_JSON_PATH)
+    data = cache_utils.load_parsed_cache()
     parsed_members = data.get("parsed_members", {})
 
     results = []
@@ -242,7 +239,7 @@ def get_family_total_points(family_name: str) -> int:
 
 def is_vsa_officer(psid: int) -> bool:
 
-    vsa_db = load_json(VSA_PARSED_ALL_MEMBER_DATA_JSON_PATH)
+    vsa_db = cache_utils.load_parsed_cache()
 
     members = vsa_db.get("parsed_members", {})
 
@@ -253,29 +250,124 @@ def is_vsa_officer(psid: int) -> bool:
     role_key = members[psid_str].get("role_key", "")
     return role_key.lower() == "officer"
 
-# ── NEW FUNCTIONS FOR TIMEFRAME-BASED FAMILY RANKINGS ─────────────────────────
+# ── PRECOMPUTED RANKING INDEX ─────────────────────────────────────────────────
+#
+# Built once per sheet refresh (SheetsCacheUpdater) and shipped in the parsed
+# cache under "rankings", so rank lookups are dict hits instead of re-sorting
+# the population. Layout:
+#   rankings["families"][metric] = {"order": [family, ...], "rank": {family: n}}
+#       metric: total_points | pts_per_member | member_count | contributors
+#   rankings["family_values"][family] = {metric: value}
+#   rankings["members"]["points"] = {"order": [psid, ...], "rank": {psid: n}}
+#   rankings["members"]["by_name"] = {"first|last" (lowercase): psid}
+# Ranks are 1-based sort positions (stable sort, same order as the old helpers).
+# Member sort keys outside MEMBER_RANK_KEYS fall back to sorting the roster.
 
-def get_family_size_rank():
+FAMILY_RANK_METRICS = ("total_points", "pts_per_member", "member_count", "contributors")
+MEMBER_RANK_KEYS = ("points",)
+
+
+def _ranked(keys_and_values) -> dict:
+    order = [k for k, _ in sorted(keys_and_values, key=lambda kv: kv[1], reverse=True)]
+    return {"order": order, "rank": {k: i for i, k in enumerate(order, start=1)}}
+
+
+def _member_name_key(first, last) -> str:
+    return f"{(first or '').lower()}|{(last or '').lower()}"
+
+
+def build_ranking_index(family_stats: dict, parsed_members: dict) -> dict:
     """
-    Returns the rank (1-based) of your family based on total number of members
-    compared to all families in the family_stats.
+    Sorted orders + rank-by-key maps for families and members.
+    family_stats / parsed_members use the parsed cache layout.
     """
-    data = load_json(VSA_PARSED_ALL_MEMBER_DATA_JSON_PATH)
-    families = data.get("family_stats", {})
+    contributors = {}
+    for member in parsed_members.values():
+        if member.get("points", 0) > 0:
+            fam = member.get("family_name", "")
+            contributors[fam] = contributors.get(fam, 0) + 1
 
-    # Create list of (family_name, member_count)
-    family_counts = [(f["family"], f["member_count"]) for f in families.values()]
+    families = {}
+    for fam_name, stats in family_stats.items():
+        member_count = stats.get("member_count", 1)
+        total_points = stats.get("total_points", 0)
+        families[fam_name] = {
+            "total_points":   total_points,
+            "pts_per_member": total_points / member_count if member_count > 0 else 0,
+            "member_count":   member_count,
+            "contributors":   contributors.get(fam_name, 0),
+        }
 
-    # Sort descending by member_count
-    sorted_families = sorted(family_counts, key=lambda x: x[1], reverse=True)
+    member_points = _ranked((psid, m.get("points", 0)) for psid, m in parsed_members.items())
+    by_name = {}
+    for psid in member_points["order"]:
+        m = parsed_members[psid]
+        by_name.setdefault(_member_name_key(m.get("first_name"), m.get("last_name")), psid)
 
-    # Get my family name
-    my_family = load_json(CONFIG_JSON_PATH)["general"]["google_sheets_fam_name"]
+    return {
+        "families": {
+            metric: _ranked((fam, vals[metric]) for fam, vals in families.items())
+            for metric in FAMILY_RANK_METRICS
+        },
+        "family_values": families,
+        "members": {
+            "points":  member_points,
+            "by_name": by_name,
+        },
+    }
 
-    # Find rank (1-based)
-    rank = next((i + 1 for i, (fam, _) in enumerate(sorted_families) if fam == my_family), None)
 
-    return rank
+_ranking_fallback = (None, None)
+
+
+def get_ranking_index() -> dict:
+    """
+    Ranking index of the current parsed cache. Older cache files without a
+    "rankings" key get one built once per snapshot.
+    """
+    global _ranking_fallback
+    data = cache_utils.load_parsed_cache()
+    rankings = data.get("rankings")
+    if rankings:
+        return rankings
+    snapshot, built = _ranking_fallback
+    if snapshot is not data:
+        built = build_ranking_index(data.get("family_stats", {}), data.get("parsed_members", {}))
+        _ranking_fallback = (data, built)
+    return built
+
+
+def get_family_rank(family_name: str, metric: str = "total_points"):
+    """1-based rank of a family for one of FAMILY_RANK_METRICS, or None."""
+    return get_ranking_index()["families"][metric]["rank"].get(family_name)
+
+
+def _all_parsed_members() -> list[dict]:
+    return list(cache_utils.load_parsed_cache().get("parsed_members", {}).values())
+
+
+def get_member_rank_by_psid(psid, sort_key="points"):
+    """1-based overall rank of a member by PSID, or None."""
+    if sort_key in MEMBER_RANK_KEYS:
+        return get_ranking_index()["members"][sort_key]["rank"].get(str(psid))
+
+    # not indexed: sort the whole roster
+    sorted_list = get_sorted_leaderboard(_all_parsed_members(), sort_key=sort_key)
+    for idx, m in enumerate(sorted_list, start=1):
+        if str(m.get("psid")) == str(psid):
+            return idx
+    return None
+
+
+# ── NEW FUNCTIONS FOR TIMEFRAME-BASED FAMILY RANKINGS ─────────────────────────
+
+def get_family_size_rank():
+    """
+    Returns the rank (1-based) of your family based on total number of members
+    compared to all families in the family_stats.
+    """
+    my_family = load_json(CONFIG_JSON_PATH)["general"]["google_sheets_fam_name"]
+    return get_family_rank(my_family, "member_count")
 
 
 def get_family_pts_per_member_ranking():
@@ -283,24 +375,17 @@ def get_family_pts_per_member_ranking():
     Returns a sorted list of families by total points / member_count (descending),
     along with each family's pts_per_member value.
     """
-    data = load_json(VSA_PARSED_ALL_MEMBER_DATA_JSON_PATH)
-    family_stats = data.get("family_stats", {})
-
-    ranking = []
-    for fam_name, stats in family_stats.items():
-        member_count = stats.get("member_count", 1)  # avoid division by zero
-        total_points = stats.get("total_points", 0)
-        pts_per_member = total_points / member_count if member_count > 0 else 0
-        ranking.append({
+    rankings = get_ranking_index()
+    values = rankings["family_values"]
+    return [
+        {
             "family": fam_name,
-            "pts_per_member": pts_per_member,
-            "total_points": total_points,
-            "member_count": member_count
-        })
-
-    # Sort descending by pts_per_member
-    ranking_sorted = sorted(ranking, key=lambda f: f["pts_per_member"], reverse=True)
-    return ranking_sorted
+            "pts_per_member": values[fam_name]["pts_per_member"],
+            "total_points": values[fam_name]["total_points"],
+            "member_count": values[fam_name]["member_count"]
+        }
+        for fam_name in rankings["families"]["pts_per_member"]["order"]
+    ]
 
 
 def get_my_family_overall_rank():
@@ -321,12 +406,8 @@ def get_family_points_rank_in_timeframe(start_date: str, end_date: str):
     Returns a list of tuples (family_name, points) ranked descending by total points
     earned within the timeframe.
     """
-    contributors = get_contributors_in_timeframe(start_date, end_date)
-    family_points = {}
-    for member in contributors:
-        fam = member.get("family_name", "")
-        pts = sum(member["event_points"])
-        family_points[fam] = family_points.get(fam, 0) + pts
+    stats = get_event_matrix().family_timeframe_stats(start_date, end_date)
+    family_points = {fam: s["total_points"] for fam, s in stats.items() if s["contributors"]}
     return sorted(family_points.items(), key=lambda x: x[1], reverse=True)
 
 
@@ -335,11 +416,8 @@ def get_family_contributor_rank_in_timeframe(start_date: str, end_date: str):
     Returns a list of tuples (family_name, num_contributors) ranked descending
     by number of contributing members within the timeframe.
     """
-    contributors = get_contributors_in_timeframe(start_date, end_date)
-    family_counts = {}
-    for member in contributors:
-        fam = member.get("family_name", "")
-        family_counts[fam] = family_counts.get(fam, 0) + 1
+    stats = get_event_matrix().family_timeframe_stats(start_date, end_date)
+    family_counts = {fam: s["contributors"] for fam, s in stats.items() if s["contributors"]}
     return sorted(family_counts.items(), key=lambda x: x[1], reverse=True)
 
 
@@ -348,16 +426,11 @@ def get_family_pts_per_member_rank_in_timeframe(start_date: str, end_date: str):
     Returns a list of tuples (family_name, pts_per_member) ranked descending by
     average points per contributing member within the timeframe.
     """
-    contributors = get_contributors_in_timeframe(start_date, end_date)
-    family_points = {}
-    family_members = {}
-    for member in contributors:
-        fam = member.get("family_name", "")
-        pts = sum(member["event_points"])
-        family_points[fam] = family_points.get(fam, 0) + pts
-        family_members[fam] = family_members.get(fam, 0) + 1
-
-    pts_per_member = {fam: family_points[fam]/family_members[fam] for fam in family_points}
+    stats = get_event_matrix().family_timeframe_stats(start_date, end_date)
+    pts_per_member = {
+        fam: s["total_points"] / s["contributors"]
+        for fam, s in stats.items() if s["contributors"]
+    }
     return sorted(pts_per_member.items(), key=lambda x: x[1], reverse=True)
 
 
@@ -366,21 +439,18 @@ def get_overall_family_rank(family_name: str):
     Returns the rank and total_points of a specific family based on
     overall family_stats from the parsed JSON.
     """
-    data = load_json(VSA_PARSED_ALL_MEMBER_DATA_JSON_PATH)
-    family_stats = data.get("family_stats", {})
-    sorted_families = sorted(family_stats.items(), key=lambda x: x[1]["total_points"], reverse=True)
-
-    for idx, (fam, stats) in enumerate(sorted_families, start=1):
-        if fam == family_name:
-            return idx, stats["total_points"]
-    return None, 0
+    rankings = get_ranking_index()
+    rank = rankings["families"]["total_points"]["rank"].get(family_name)
+    if rank is None:
+        return None, 0
+    return rank, rankings["family_values"][family_name]["total_points"]
 
 
 def get_full_family_leaderboard():
     """
     Returns the full family_stats dictionary from parsed JSON.
     """
-    data = load_json(VSA_PARSED_ALL_MEMBER_DATA_JSON_PATH)
+    data = cache_utils.load_parsed_cache()
     return data.get("family_stats", {})
 
 
@@ -392,30 +462,7 @@ def get_contributors_in_timeframe(start_date: str, end_date: str):
         start_date (str): "MM/DD/YYYY"
         end_date (str): "MM/DD/YYYY"
     """
-    data = load_json(VSA_PARSED_ALL_MEMBER_DATA_JSON_PATH)
-    events_info = data["events_info"]
-    parsed_members = data["parsed_members"]
-
-    # Convert dates to datetime
-    start_dt = datetime.strptime(start_date, "%m/%d/%Y")
-    end_dt = datetime.strptime(end_date, "%m/%d/%Y")
-
-    # Map event indices to dates
-    event_list = list(events_info.items())
-    event_indices_in_range = []
-    for idx, (event_key, event) in enumerate(event_list):
-        event_dt = datetime.strptime(event["date"], "%m/%d/%Y")
-        if start_dt <= event_dt <= end_dt:
-            event_indices_in_range.append(idx)
-
-    # Find members with points > 0 in any event in range
-    contributors = []
-    for member in parsed_members.values():
-        for idx in event_indices_in_range:
-            if member["event_points"][idx] > 0:
-                contributors.append(member)
-                break  # only need one event to count
-    return contributors
+    return get_event_matrix().contributors(start_date, end_date)
 
 
 def get_family_contributors_in_timeframe(start_date: str, end_date: str):
@@ -530,7 +577,19 @@ def get_member_rank(members, target_first, target_last, sort_key="points"):
     """
     Return 1-based rank of the member matching (first, last).
     If not found, returns None.
+
+    Pass members=None to rank against the whole roster via the precomputed
+    ranking index (O(1) for MEMBER_RANK_KEYS, a sort otherwise); a list
+    ranks within that list only.
     """
+    if members is None:
+        if sort_key not in MEMBER_RANK_KEYS:
+            members = _all_parsed_members()
+        else:
+            rankings = get_ranking_index()["members"]
+            psid = rankings["by_name"].get(_member_name_key(target_first, target_last))
+            return rankings[sort_key]["rank"].get(psid) if psid is not None else None
+
     sorted_list = get_sorted_leaderboard(members, sort_key=sort_key)
     target = (target_first.lower(), target_last.lower())
     for idx, m in enumerate(sorted_list, start=1):
@@ -0,0 +1,139 @@
+"""
+text_metrics.py
+
+Cached text measurement for the Pillow layout helpers.
+
+ - one scratch ImageDraw per thread (compose phases run on worker threads),
+   instead of a throwaway Image.new((1, 1)) + ImageDraw per measurement
+ - LRU of (font, text) -> size / bbox / advance length; fonts come from
+   asset_cache and are identified by (path, size, face index)
+ - wrap_text() measures word by word: line widths are built from cached
+   per-word advances and only a line close to the limit is measured exactly
+
+text_size() returns exactly what draw.textsize() does (Pillow 8.x), so
+swapping it in doesn't move any pixels.
+"""
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw, ImageFont
+
+METRICS_CACHE_SIZE = 8192
+
+_cache: "OrderedDict[tuple, object]" = OrderedDict()
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _scratch() -> ImageDraw.ImageDraw:
+    draw = getattr(_local, "draw", None)
+    if draw is None:
+        draw = _local.draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    return draw
+
+
+def _font_key(font):
+    path = getattr(font, "path", None)
+    if not path:
+        return None  # not a file-backed font: don't cache, id() could be reused
+    return path, font.size, getattr(font, "index", 0)
+
+
+def _cached(kind: str, font, text: str, extra, measure):
+    font_key = _font_key(font)
+    if font_key is None:
+        return measure()
+    key = (kind, font_key, text, extra)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    value = measure()
+    with _lock:
+        _cache[key] = value
+        while len(_cache) > METRICS_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+
+def text_size(text: str, font: ImageFont.FreeTypeFont) -> tuple[int, int]:
+    """Cached draw.textsize(text, font=font)."""
+    text = str(text)
+
+    def measure():
+        draw = _scratch()
+        if hasattr(draw, "textsize"):
+            return draw.textsize(text, font=font)
+        _, _, right, bottom = draw.textbbox((0, 0), text, font=font)  # Pillow 10+
+        return right, bottom
+
+    return _cached("size", font, text, None, measure)
+
+
+def text_bbox(text: str, font: ImageFont.FreeTypeFont, anchor: str | None = None) -> tuple[int, int, int, int]:
+    """Cached draw.textbbox((0, 0), text, font=font, anchor=anchor)."""
+    text = str(text)
+    return _cached("bbox", font, text, anchor, lambda: _scratch().textbbox((0, 0), text, font=font, anchor=anchor))
+
+
+def text_width(text: str, font: ImageFont.FreeTypeFont) -> int:
+    """Right edge of the text's bbox when drawn at x=0."""
+    return text_bbox(text, font)[2]
+
+
+def text_length(text: str, font: ImageFont.FreeTypeFont) -> float:
+    """Cached font.getlength(text): the advance width, additive across words."""
+    text = str(text)
+    return _cached("length", font, text, None, lambda: font.getlength(text))
+
+
+def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int, max_lines: int | None = None) -> list[str]:
+    """
+    Greedy word wrap: a word joins the current line if text_size(line + " "
+    + word) still fits in max_width. Each word's advance is measured once;
+    the running line width is the sum of those, and only when that estimate
+    lands within `slack` px of the limit is the candidate line measured
+    exactly. Stops after max_lines lines when given.
+    """
+    words = str(text).split()
+    if not words:
+        return []
+
+    space = text_length(" ", font)
+    # ink overhang / kerning can move the exact width a few px off the sum of advances
+    slack = max(2, font.size // 4)
+
+    lines: list[str] = []
+    cur: list[str] = []
+    cur_len = 0.0
+    for word in words:
+        word_len = text_length(word, font)
+        if not cur:
+            cur, cur_len = [word], word_len
+            continue
+
+        estimate = cur_len + space + word_len
+        if estimate <= max_width - slack:
+            fits = True
+        elif estimate > max_width + slack:
+            fits = False
+        else:
+            fits = text_size(" ".join(cur + [word]), font)[0] <= max_width
+
+        if fits:
+            cur.append(word)
+            cur_len = estimate
+        else:
+            lines.append(" ".join(cur))
+            if max_lines is not None and len(lines) >= max_lines:
+                return lines
+            cur, cur_len = [word], word_len
+
+    lines.append(" ".join(cur))
+    return lines[:max_lines] if max_lines is not None else lines
+
+
+def clear():
+    """Drop every cached measurement."""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,220 @@
+"""
+user_backends.py
+
+Pluggable storage backends for the user store (utils/user_store.py).
+
+Every backend implements the same small interface:
+ - load_all()                -> {"verified_users": {...}, "unverified_users": {...}}
+ - prepare(data, dirty)      -> payload     (runs on the event loop, cheap snapshot)
+ - commit(payload)                          (runs in a worker thread, does the I/O)
+ - import_json(path) / export_json(path)    (JSON file stays the interchange format)
+
+Backends:
+ - JsonUserBackend:   the original single JSON file, rewritten on every flush.
+ - SqliteUserBackend: one row per Discord user in an SQLite DB (WAL mode),
+                      with indexed psid / level / coins / birthday columns and
+                      per-user UPSERTs, so a flush costs O(dirty records).
+"""
+import os
+import json
+import sqlite3
+import threading
+
+SECTIONS = ("verified_users", "unverified_users")
+
+
+def _empty_database() -> dict:
+    return {section: {} for section in SECTIONS}
+
+
+def _write_text_atomic(path: str, text: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _read_json_database(path: str) -> dict:
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {}
+    for section in SECTIONS:
+        data.setdefault(section, {})
+    return data
+
+
+# ── JSON FILE BACKEND ─────────────────────────────────────────────────────────
+
+class JsonUserBackend:
+    """Original layout: the whole database lives in one JSON file."""
+    name = "json"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load_all(self) -> dict:
+        return _read_json_database(self.path)
+
+    def prepare(self, data: dict, dirty: dict[str, set[str]]) -> str:
+        # Any change means rewriting the file, so serialize the whole thing
+        return json.dumps(data, indent=2)
+
+    def commit(self, payload: str):
+        with self._lock:
+            _write_text_atomic(self.path, payload)
+
+    def import_json(self, path: str) -> int:
+        data = _read_json_database(path)
+        self.commit(json.dumps(data, indent=2))
+        return sum(len(data[s]) for s in SECTIONS)
+
+    def export_json(self, path: str) -> int:
+        data = self.load_all()
+        _write_text_atomic(path, json.dumps(data, indent=2))
+        return sum(len(data[s]) for s in SECTIONS)
+
+
+# ── SQLITE BACKEND ────────────────────────────────────────────────────────────
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    section   TEXT    NOT NULL,
+    user_id   TEXT    NOT NULL,
+    psid      TEXT,
+    level     INTEGER,
+    coins     INTEGER,
+    birthday  TEXT,
+    record    TEXT    NOT NULL,
+    PRIMARY KEY (section, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_users_psid     ON users (psid);
+CREATE INDEX IF NOT EXISTS idx_users_level    ON users (level);
+CREATE INDEX IF NOT EXISTS idx_users_coins    ON users (coins);
+CREATE INDEX IF NOT EXISTS idx_users_birthday ON users (birthday);
+"""
+
+_UPSERT = """
+INSERT INTO users (section, user_id, psid, level, coins, birthday, record)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (section, user_id) DO UPDATE SET
+    psid     = excluded.psid,
+    level    = excluded.level,
+    coins    = excluded.coins,
+    birthday = excluded.birthday,
+    record   = excluded.record
+"""
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _row_for(section: str, user_id: str, record: dict) -> tuple:
+    """Flatten a user record into an UPSERT row (indexed columns + JSON blob)."""
+    general = record.get("general", {}) or {}
+    stats = record.get("stats", {}) or {}
+    psid = general.get("psid")
+    return (
+        section,
+        str(user_id),
+        str(psid) if psid not in (None, "") else None,
+        _to_int(stats.get("level")),
+        _to_int(stats.get("coins")),
+        general.get("birthday") or None,
+        json.dumps(record),
+    )
+
+
+class SqliteUserBackend:
+    """One row per Discord user in an SQLite database running in WAL mode."""
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Shared between the event loop (loads) and worker threads (commits);
+        # every access goes through self._lock.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def load_all(self) -> dict:
+        data = _empty_database()
+        with self._lock:
+            rows = self._conn.execute("SELECT section, user_id, record FROM users").fetchall()
+        for section, user_id, record in rows:
+            data.setdefault(section, {})[user_id] = json.loads(record)
+        return data
+
+    def prepare(self, data: dict, dirty: dict[str, set[str]]) -> tuple[list, list]:
+        """Serialize only the dirty records into (upserts, deletes)."""
+        upserts, deletes = [], []
+        for section, ids in dirty.items():
+            records = data.get(section, {})
+            for user_id in ids:
+                record = records.get(user_id)
+                if record is None:
+                    deletes.append((section, user_id))
+                else:
+                    upserts.append(_row_for(section, user_id, record))
+        return upserts, deletes
+
+    def commit(self, payload: tuple[list, list]):
+        upserts, deletes = payload
+        with self._lock, self._conn:
+            if deletes:
+                self._conn.executemany("DELETE FROM users WHERE section = ? AND user_id = ?", deletes)
+            if upserts:
+                self._conn.executemany(_UPSERT, upserts)
+
+    def import_json(self, path: str) -> int:
+        """Replace the table contents with the records from a JSON database file."""
+        data = _read_json_database(path)
+        rows = [
+            _row_for(section, user_id, record)
+            for section in SECTIONS
+            for user_id, record in data[section].items()
+        ]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM users")
+            self._conn.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def export_json(self, path: str) -> int:
+        data = self.load_all()
+        _write_text_atomic(path, json.dumps(data, indent=2))
+        return sum(len(data[s]) for s in SECTIONS)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+BACKENDS = {
+    JsonUserBackend.name:   JsonUserBackend,
+    SqliteUserBackend.name: SqliteUserBackend,
+}
+
+
+def create_backend(name: str, json_path: str, sqlite_path: str):
+    """Build the configured backend ("json" or "sqlite")."""
+    name = (name or "json").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown user store backend '{name}' (expected one of {sorted(BACKENDS)})")
+    if name == SqliteUserBackend.name:
+        return SqliteUserBackend(sqlite_path)
+    return JsonUserBackend(json_path)
@@ -0,0 +1,239 @@
+"""
+user_store.py
+
+Process-wide, in-memory copy of the Discord user database
+(config["file_paths"]["all_discord_user_member_database_json_path"]).
+
+ - The file is parsed once, on first access, and then kept resident.
+ - Callers mutate the shared dicts and mark the touched records dirty.
+ - Dirty records are flushed in batches by the UserStoreFlusher task cog
+   (tasks/user_store_flusher.py) and once more at shutdown.
+
+utils/users_utils.py exposes the usual get_/save_ helpers as views over
+this store, so every cog shares the same copy of the data.
+
+Where the data lives on disk is decided by a backend (utils/user_backends.py),
+picked with config["features"]["user_store"]["backend"]: "json" (default) or
+"sqlite" (config["file_paths"]["user_database_sqlite_path"]).
+"""
+import os
+import json
+import atexit
+import asyncio
+import itertools
+import threading
+
+from utils.user_backends import SECTIONS, create_backend
+
+with open("config.json", "r") as f:
+    _config = json.load(f)
+
+USER_DATABASE_PATH = _config["file_paths"]["all_discord_user_member_database_json_path"]
+USER_DATABASE_SQLITE_PATH = _config["file_paths"].get(
+    "user_database_sqlite_path",
+    os.path.splitext(USER_DATABASE_PATH)[0] + ".sqlite3"
+)
+USER_STORE_BACKEND = _config.get("features", {}).get("user_store", {}).get("backend", "json")
+
+
+class UserStore:
+    """
+    Resident user database with per-record dirty tracking.
+
+    self._data mirrors the JSON file layout:
+        { "verified_users": {user_id: record}, "unverified_users": {user_id: record}, ... }
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._data: dict | None = None
+        self._dirty: dict[str, set[str]] = {s: set() for s in SECTIONS}
+        self._listeners = []
+
+        # Flush ordering: every prepared payload gets a sequence number and
+        # commits are serialized by _commit_lock; a payload older than the
+        # last one written is skipped. Prepared-but-uncommitted dirty sets stay
+        # in _in_flight and are folded into every newer payload, so a newer
+        # commit always covers whatever an older, skipped one would have written.
+        self._flush_seq = itertools.count(1)
+        self._committed_seq = 0
+        self._commit_lock = threading.Lock()
+        self._in_flight: dict[int, dict[str, set[str]]] = {}
+
+    # --- Loading ---
+    def _ensure_loaded(self) -> dict:
+        if self._data is None:
+            self.reload()
+        return self._data
+
+    def reload(self):
+        """(Re)read the database from the backend, discarding any unflushed changes."""
+        data = self.backend.load_all()
+        for section in SECTIONS:
+            data.setdefault(section, {})
+            # Keep the existing section dicts so views handed out earlier stay live
+            if self._data is not None and section in self._data:
+                live = self._data[section]
+                live.clear()
+                live.update(data[section])
+                data[section] = live
+        self._data = data
+        for dirty in self._dirty.values():
+            dirty.clear()
+        self._notify(None, None)
+
+    # --- Change listeners ---
+    def add_listener(self, callback):
+        """
+        Register `callback(section, user_id)`, called after every change.
+        user_id is None when a whole section changed; section is None on reload.
+        Used by secondary indexes (utils/psid_index.py) to stay in sync.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, section, user_id):
+        for callback in self._listeners:
+            try:
+                callback(section, user_id)
+            except Exception as e:
+                print(f"[UserStore] Change listener failed: {e}")
+
+    # --- Views ---
+    def section(self, section: str) -> dict:
+        """Return the live dict for a section ("verified_users" / "unverified_users")."""
+        return self._ensure_loaded()[section]
+
+    def get_record(self, section: str, user_id: str) -> dict | None:
+        return self.section(section).get(str(user_id))
+
+    # --- Mutations ---
+    def mark_dirty(self, section: str, user_id: str):
+        """Flag one record as changed so the next flush persists it."""
+        self._dirty[section].add(str(user_id))
+        self._notify(section, str(user_id))
+
+    def set_record(self, section: str, user_id: str, record: dict):
+        self.section(section)[str(user_id)] = record
+        self.mark_dirty(section, user_id)
+
+    def delete_record(self, section: str, user_id: str):
+        if self.section(section).pop(str(user_id), None) is not None:
+            self.mark_dirty(section, user_id)
+
+    def replace_section(self, section: str, records: dict):
+        """
+        Replace a whole section (legacy save_* path). Every key that was added,
+        removed or possibly changed is marked dirty.
+        """
+        current = self.section(section)
+        touched = set(current.keys()) | set(records.keys())
+        if records is not current:
+            current.clear()
+            current.update(records)
+        self._dirty[section].update(touched)
+        self._notify(section, None)
+
+    @property
+    def is_dirty(self) -> bool:
+        return any(self._dirty.values())
+
+    # --- Persistence ---
+    def _take_dirty(self) -> dict[str, set[str]]:
+        taken = {s: set(ids) for s, ids in self._dirty.items()}
+        for dirty in self._dirty.values():
+            dirty.clear()
+        return taken
+
+    def _prepare(self) -> tuple[int, dict[str, set[str]], object]:
+        """Take the dirty set and serialize it (plus anything still in flight) on the caller's thread."""
+        self._forget_committed()
+        taken = self._take_dirty()
+        covered = {s: set(ids) for s, ids in taken.items()}
+        for earlier in self._in_flight.values():
+            for section, ids in earlier.items():
+                covered[section].update(ids)
+        seq = next(self._flush_seq)
+        payload = self.backend.prepare(self._data, covered)
+        self._in_flight[seq] = taken
+        return seq, taken, payload
+
+    def _commit(self, seq: int, payload) -> bool:
+        """Write `payload` unless a newer one already landed. Safe to call from a worker thread."""
+        with self._commit_lock:
+            if seq <= self._committed_seq:
+                return False
+            self.backend.commit(payload)
+            self._committed_seq = seq
+            return True
+
+    def _forget_committed(self):
+        for seq in [s for s in self._in_flight if s <= self._committed_seq]:
+            del self._in_flight[seq]
+
+    def _commit_failed(self, seq: int, taken: dict[str, set[str]]):
+        self._in_flight.pop(seq, None)
+        self._restore_dirty(taken)
+
+    def flush(self) -> int:
+        """
+        Synchronously persist pending changes. Returns number of dirty records written.
+        An async flush still writing in a worker thread is waited for (commit
+        lock) and superseded: this payload includes its records.
+        """
+        self._forget_committed()
+        if self._data is None or not (self.is_dirty or self._in_flight):
+            return 0
+        seq, taken, payload = self._prepare()
+        try:
+            self._commit(seq, payload)
+        except Exception:
+            self._commit_failed(seq, taken)
+            raise
+        self._forget_committed()
+        return sum(len(ids) for ids in taken.values())
+
+    async def flush_async(self) -> int:
+        """
+        Persist pending changes without blocking the event loop on disk I/O.
+        Serialization happens on the loop (so no cog mutates the dicts mid-dump);
+        only the backend write is offloaded.
+        """
+        if self._data is None or not self.is_dirty:
+            return 0
+        seq, taken, payload = self._prepare()
+        try:
+            # if this task is cancelled the thread keeps going; its records
+            # stay in _in_flight so the next flush rewrites them either way
+            await asyncio.to_thread(self._commit, seq, payload)
+        except Exception:
+            self._commit_failed(seq, taken)
+            raise
+        self._forget_committed()
+        return sum(len(ids) for ids in taken.values())
+
+    def _restore_dirty(self, taken: dict[str, set[str]]):
+        for section, ids in taken.items():
+            self._dirty[section].update(ids)
+
+    # --- JSON import / export ---
+    def export_json(self, path: str = USER_DATABASE_PATH) -> int:
+        """Flush, then write the whole database to `path` in the JSON file layout."""
+        self.flush()
+        return self.backend.export_json(path)
+
+    def import_json(self, path: str = USER_DATABASE_PATH) -> int:
+        """Replace the backend contents with a JSON database file and reload."""
+        count = self.backend.import_json(path)
+        self.reload()
+        return count
+
+
+user_store = UserStore(create_backend(USER_STORE_BACKEND, USER_DATABASE_PATH, USER_DATABASE_SQLITE_PATH))
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        user_store.flush()
+    except Exception as e:
+        print(f"[UserStore] Failed to flush user database on exit: {e}")
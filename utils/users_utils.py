@@ -1,52 +1,53 @@
 # users_utils.py
-import json
-import os
+#
+# Views over the process-wide user store (utils/user_store.py).
+# get_* returns the live, shared dict; save_* marks records dirty and the
+# UserStoreFlusher task writes them to the configured backend in batches.
+# Prefer the per-user helpers: with the SQLite backend they cost one UPSERT,
+# while save_verified_users()/save_unverified_users() re-write every record.
+from utils.user_store import user_store, USER_DATABASE_PATH
+
+VERIFIED_UNVERIFIED_USER_DATA_PATH = USER_DATABASE_PATH
 
-# Open the JSON file and read in the data
-with open('config.json') as json_file:
-    data = json.load(json_file)
-    
-VERIFIED_UNVERIFIED_USER_DATA_PATH = data['file_paths']['all_discord_user_member_database_json_path']
 
 def get_verified_users():
-    with open(VERIFIED_UNVERIFIED_USER_DATA_PATH, 'r') as f:
-        data = json.load(f)
     # Return only the dictionary under "verified_users"
-    #print(data.get("verified_users", {}))
-    return data.get("verified_users", {})
+    return user_store.section("verified_users")
 
 
 def save_verified_users(verified_users_dict):
-    # Load entire file if it exists
-    if os.path.exists(VERIFIED_UNVERIFIED_USER_DATA_PATH):
-        with open(VERIFIED_UNVERIFIED_USER_DATA_PATH, 'r') as f:
-            full_data = json.load(f)
-    else:
-        full_data = {}
-
-    full_data["verified_users"] = verified_users_dict
-
-    with open(VERIFIED_UNVERIFIED_USER_DATA_PATH, 'w') as f:
-        json.dump(full_data, f, indent=2)
-        
-        
-        
+    user_store.replace_section("verified_users", verified_users_dict)
+
+
+def mark_verified_user_dirty(user_id):
+    """Flag a single verified user's record as changed (cheaper than save_verified_users)."""
+    user_store.mark_dirty("verified_users", user_id)
+
+
+def save_verified_user(user_id, record):
+    """Insert/replace one verified user's record (a single UPSERT on flush)."""
+    user_store.set_record("verified_users", user_id, record)
+
+
 def get_unverified_users():
-    with open(VERIFIED_UNVERIFIED_USER_DATA_PATH, 'r') as f:
-        data = json.load(f)
     # Return only the dictionary under "unverified_users"
-    return data.get("unverified_users", {})
+    return user_store.section("unverified_users")
 
 
 def save_unverified_users(unverified_users_dict):
-    # Load entire file if it exists
-    if os.path.exists(VERIFIED_UNVERIFIED_USER_DATA_PATH):
-        with open(VERIFIED_UNVERIFIED_USER_DATA_PATH, 'r') as f:
-            full_data = json.load(f)
-    else:
-        full_data = {}
+    user_store.replace_section("unverified_users", unverified_users_dict)
+
+
+def mark_unverified_user_dirty(user_id):
+    """Flag a single unverified user's record as changed."""
+    user_store.mark_dirty("unverified_users", user_id)
+
+
+def save_unverified_user(user_id, record):
+    """Insert/replace one unverified user's record."""
+    user_store.set_record("unverified_users", user_id, record)
 
-    full_data["unverified_users"] = unverified_users_dict
 
-    with open(VERIFIED_UNVERIFIED_USER_DATA_PATH, 'w') as f:
-        json.dump(full_data, f, indent=2)
+def delete_unverified_user(user_id):
+    """Drop one unverified user's record (e.g. once they verify)."""
+    user_store.delete_record("unverified_users", user_id)
@@ -0,0 +1,114 @@
+"""
+xp_accumulator.py
+
+Per-user message / XP / coin bookkeeping for the leveling system.
+
+ - spam tracking: a fixed-size ring of each user's last SPAM_MAX_MESSAGES + 1
+   message times; a message is spam when the oldest of those is still inside
+   SPAM_WINDOW_SECONDS (same rule as "more than 5 messages in 10s", without
+   rebuilding a list per message)
+ - award cooldown: one XP / coin award per AWARD_COOLDOWN_SECONDS
+ - deltas: message count, XP and coins accumulate here and are handed to the
+   caller in one batch by drain() (LevelingCog applies them to the user store
+   once per flush interval); take() hands over a single user early, e.g. on
+   level-up
+ - eviction: users idle for IDLE_EVICT_SECONDS with nothing pending are
+   dropped, so memory follows the number of recently active users
+
+Every operation on a single message is O(1). Only touched from the event
+loop, so there is no locking.
+"""
+SPAM_WINDOW_SECONDS = 10
+SPAM_MAX_MESSAGES = 5
+AWARD_COOLDOWN_SECONDS = 5
+IDLE_EVICT_SECONDS = 15 * 60
+
+_RING_SIZE = SPAM_MAX_MESSAGES + 1
+
+
+class _UserState:
+    __slots__ = ("stamps", "head", "last_award", "last_seen", "messages", "exp", "coins")
+
+    def __init__(self):
+        self.stamps = [float("-inf")] * _RING_SIZE
+        self.head = 0              # index of the oldest stamp
+        self.last_award = float("-inf")
+        self.last_seen = 0.0
+        self.messages = 0
+        self.exp = 0.0
+        self.coins = 0
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self.messages or self.exp or self.coins)
+
+
+class XPAccumulator:
+    def __init__(self):
+        self._users: dict[str, _UserState] = {}
+
+    def _state(self, user_id: str) -> _UserState:
+        state = self._users.get(user_id)
+        if state is None:
+            state = self._users[user_id] = _UserState()
+        return state
+
+    def record_message(self, user_id: str, now: float) -> bool:
+        """
+        Note one message from `user_id` at monotonic time `now`. Returns False
+        when it's over the spam limit (the message is then not counted).
+        """
+        state = self._state(user_id)
+        state.last_seen = now
+        # overwrite the oldest stamp; it now holds the newest
+        state.stamps[state.head] = now
+        state.head = (state.head + 1) % _RING_SIZE
+        if now - state.stamps[state.head] < SPAM_WINDOW_SECONDS:
+            return False
+        state.messages += 1
+        return True
+
+    def recent_messages(self, user_id: str, now: float) -> int:
+        """Messages (counted or not) in the last SPAM_WINDOW_SECONDS, up to the ring size."""
+        state = self._users.get(user_id)
+        if state is None:
+            return 0
+        return sum(1 for ts in state.stamps if now - ts < SPAM_WINDOW_SECONDS)
+
+    def award(self, user_id: str, now: float, exp: float, coins: int) -> bool:
+        """Add `exp` / `coins` unless the user is on award cooldown."""
+        state = self._state(user_id)
+        if now - state.last_award < AWARD_COOLDOWN_SECONDS:
+            return False
+        state.last_award = now
+        state.exp += exp
+        state.coins += coins
+        return True
+
+    def pending_exp(self, user_id: str) -> float:
+        state = self._users.get(user_id)
+        return state.exp if state else 0.0
+
+    def take(self, user_id: str) -> tuple[int, float, int]:
+        """Pending (messages, exp, coins) for one user, reset to zero."""
+        state = self._users.get(user_id)
+        if state is None:
+            return 0, 0.0, 0
+        deltas = (state.messages, state.exp, state.coins)
+        state.messages, state.exp, state.coins = 0, 0.0, 0
+        return deltas
+
+    def drain(self) -> dict[str, tuple[int, float, int]]:
+        """Every user's pending (messages, exp, coins), reset to zero."""
+        return {user_id: self.take(user_id) for user_id, state in self._users.items() if state.has_pending}
+
+    def evict_idle(self, now: float) -> int:
+        """Forget users idle for IDLE_EVICT_SECONDS with nothing pending; returns how many."""
+        idle = [user_id for user_id, state in self._users.items()
+                if now - state.last_seen > IDLE_EVICT_SECONDS and not state.has_pending]
+        for user_id in idle:
+            del self._users[user_id]
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._users)